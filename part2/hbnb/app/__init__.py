@@ -4,16 +4,25 @@ from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
+from app.services import facade
+from config import config
 
 
-def create_app():
+def create_app(config_class=None):
     """
     Create and configure the Flask application.
 
+    Args:
+        config_class (type): The configuration class to use. Defaults to
+            config['default'].
+
     Returns:
         Flask: The configured Flask application instance.
     """
     app = Flask(__name__)
+    app.config.from_object(config_class or config['default'])
+    facade.init_models(app.config)
+    facade.init_persistence(app.config)
     api = Api(
         app,
         version='1.0',
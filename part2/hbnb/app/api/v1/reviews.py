@@ -143,9 +143,7 @@ class ReviewResource(Resource):
             return {"error": "Review not found"}, 404
 
         # Update place.reviews persistance after review removal
-        associated_place = facade.get_place(review_to_delete.place_id)
-        associated_place.remove_review(review_id)
-        facade.update_place(associated_place.id, {"reviews": associated_place.reviews})
+        facade.remove_place_review(review_to_delete.place_id, review_id)
 
         facade.delete_review(review_id)
         return {"message": "Review deleted successfully"}, 200
@@ -15,6 +15,19 @@ class BaseModel:
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
+    def __copy__(self):
+        """
+        Copy the object, giving the copy its own lists of related IDs so
+        that changes made to the copy never reach the original.
+
+        Returns:
+            BaseModel: The copy.
+        """
+        clone = object.__new__(type(self))
+        for key, value in vars(self).items():
+            clone.__dict__[key] = list(value) if isinstance(value, list) else value
+        return clone
+
     def save(self):
         """
         Update the updated_at timestamp whenever the object is modified.
@@ -0,0 +1,215 @@
+"""
+Compact variants of the models for large in-memory data sets.
+
+The compact models declare __slots__, so their instances carry no
+per-instance __dict__. They also store the ID as 16 raw bytes instead of a
+36-character string, and the timestamps as floats instead of datetime
+objects. The id, created_at and updated_at properties convert on access, so
+the compact models expose the same attributes, validation and methods as
+the regular ones, at the cost of a small conversion on every read.
+"""
+import uuid
+from datetime import datetime, timedelta
+from app.models.amenity import Amenity
+from app.models.basecls import BaseModel
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+# Timestamps are stored as seconds since this naive epoch, which avoids
+# time zone conversions of the naive datetimes the models use
+EPOCH = datetime(1970, 1, 1)
+
+
+def _adopt(compact_cls, model_cls):
+    """
+    Copy the properties and methods of a model class onto its compact
+    variant, keeping the ones the compact class defines itself.
+
+    Args:
+        compact_cls (type): The compact class to complete.
+        model_cls (type): The model class it mirrors.
+    """
+    skipped = {"__init__", "__dict__", "__weakref__", "__doc__", "__module__", "__qualname__"}
+    for name, value in vars(model_cls).items():
+        if name not in skipped and name not in vars(compact_cls):
+            setattr(compact_cls, name, value)
+
+
+class CompactBaseModel:
+    """
+    Slotted counterpart of BaseModel storing the ID as bytes and the
+    timestamps as floats.
+    """
+    __slots__ = ("_id", "_created_at", "_updated_at")
+
+    save = BaseModel.save
+    update = BaseModel.update
+
+    def __init__(self):
+        """
+        Initialize a new instance with a unique ID and timestamps, built
+        directly in their compact form.
+        """
+        self._id = uuid.uuid4().bytes
+        self._created_at = self._updated_at = (datetime.now() - EPOCH).total_seconds()
+
+    def __copy__(self):
+        """
+        Copy the object with its own lists of related IDs, see
+        BaseModel.__copy__.
+
+        Returns:
+            CompactBaseModel: The copy.
+        """
+        clone = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                try:
+                    value = getattr(self, name)
+                except AttributeError:
+                    continue
+                setattr(clone, name, list(value) if isinstance(value, list) else value)
+        return clone
+
+    @property
+    def id(self):
+        """
+        Get the ID of the object.
+
+        Returns:
+            str: The ID in its canonical UUID form.
+        """
+        hexa = self._id.hex()
+        return f"{hexa[:8]}-{hexa[8:12]}-{hexa[12:16]}-{hexa[16:20]}-{hexa[20:]}"
+
+    @id.setter
+    def id(self, obj_id):
+        """
+        Set the ID of the object.
+
+        Args:
+            obj_id (str): A UUID string.
+
+        Raises:
+            ValueError: If the ID is not a UUID.
+        """
+        self._id = uuid.UUID(obj_id).bytes
+
+    @property
+    def created_at(self):
+        """
+        Get the creation timestamp.
+
+        Returns:
+            datetime: The creation timestamp.
+        """
+        return EPOCH + timedelta(seconds=self._created_at)
+
+    @created_at.setter
+    def created_at(self, created_at):
+        """
+        Set the creation timestamp.
+
+        Args:
+            created_at (datetime): The creation timestamp.
+        """
+        self._created_at = (created_at - EPOCH).total_seconds()
+
+    @property
+    def updated_at(self):
+        """
+        Get the last update timestamp.
+
+        Returns:
+            datetime: The last update timestamp.
+        """
+        return EPOCH + timedelta(seconds=self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, updated_at):
+        """
+        Set the last update timestamp.
+
+        Args:
+            updated_at (datetime): The last update timestamp.
+        """
+        self._updated_at = (updated_at - EPOCH).total_seconds()
+
+
+class CompactUser(CompactBaseModel):
+    """
+    Compact variant of User.
+    """
+    __slots__ = ("_first_name", "_last_name", "_email", "_User__is_admin", "_places")
+
+    def __init__(self, first_name, last_name, email, is_admin=False):
+        """
+        Initialize a CompactUser instance, see User.
+        """
+        super().__init__()
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self._User__is_admin = is_admin
+        self._places = []
+
+
+class CompactAmenity(CompactBaseModel):
+    """
+    Compact variant of Amenity.
+    """
+    __slots__ = ("_name",)
+
+    def __init__(self, name):
+        """
+        Initialize a CompactAmenity instance, see Amenity.
+        """
+        super().__init__()
+        self.name = name
+
+
+class CompactPlace(CompactBaseModel):
+    """
+    Compact variant of Place.
+    """
+    __slots__ = ("_title", "_description", "_price", "_latitude", "_longitude",
+                 "_owner_id", "_reviews", "_amenities")
+
+    def __init__(self, title, description, price, latitude, longitude, owner_id):
+        """
+        Initialize a CompactPlace instance, see Place.
+        """
+        super().__init__()
+        self.title = title
+        self.description = description
+        self.price = price
+        self.latitude = latitude
+        self.longitude = longitude
+        self.owner_id = owner_id
+        self._reviews = []
+        self._amenities = []
+
+
+class CompactReview(CompactBaseModel):
+    """
+    Compact variant of Review.
+    """
+    __slots__ = ("_text", "_rating", "_place_id", "_user_id")
+
+    def __init__(self, text, rating, place_id, user_id):
+        """
+        Initialize a CompactReview instance, see Review.
+        """
+        super().__init__()
+        self.text = text
+        self.rating = rating
+        self.place_id = place_id
+        self.user_id = user_id
+
+
+_adopt(CompactUser, User)
+_adopt(CompactAmenity, Amenity)
+_adopt(CompactPlace, Place)
+_adopt(CompactReview, Review)
@@ -0,0 +1,306 @@
+"""
+Append-only log and snapshot persistence for the in-memory repositories.
+
+A repository stored under the path prefix "data/users" uses these files:
+
+    data/users.snapshot          every object as of the last snapshot
+    data/users.<generation>.log  the changes made since, one file per
+                                 generation
+
+Both file types hold a sequence of frames: a header with the payload length
+and CRC32, followed by a pickled payload. Log payloads are ("put", obj) or
+("delete", obj_id) records; both are idempotent, so replaying a log that is
+partly covered by the snapshot gives the same result. A torn frame at the
+end of a log, left by a crash, ends the replay of that file.
+"""
+import gc
+import mmap
+import os
+import pickle
+import re
+import struct
+import zlib
+from threading import Event, Lock, Thread
+from app.persistence.repository import ThreadSafeInMemoryRepository
+
+
+FRAME_HEADER = struct.Struct("<II")
+
+# The number of objects pickled together in one snapshot frame
+SNAPSHOT_CHUNK_SIZE = 10000
+
+
+def _frame(payload):
+    """
+    Prefix a payload with its frame header.
+
+    Args:
+        payload (bytes): The pickled payload.
+
+    Returns:
+        bytes: The framed payload.
+    """
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_frames(path):
+    """
+    Unpickle the payloads of a file's frames, reading it through a memory
+    map. Reading stops at the first incomplete or corrupted frame.
+
+    Args:
+        path (str): The path of the file to read.
+
+    Yields:
+        The unpickled payload of every valid frame, in file order.
+    """
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset = 0
+            while offset + FRAME_HEADER.size <= len(mapped):
+                length, crc = FRAME_HEADER.unpack_from(mapped, offset)
+                start = offset + FRAME_HEADER.size
+                if start + length > len(mapped):
+                    return
+                # Released before yielding so the map can be closed
+                with memoryview(mapped)[start:start + length] as payload:
+                    if zlib.crc32(payload) != crc:
+                        return
+                    record = pickle.loads(payload)
+                yield record
+                offset = start + length
+
+
+def _fsync_directory(path):
+    """
+    Flush a directory entry change, such as a rename, to disk.
+
+    Args:
+        path (str): The path of the directory.
+    """
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class DurableInMemoryRepository(ThreadSafeInMemoryRepository):
+    """
+    ThreadSafeInMemoryRepository that survives restarts.
+
+    Every add, update and delete is appended to a log before it is applied.
+    A background thread fsyncs the log at most every fsync_interval seconds,
+    so concurrent writes share an fsync and at most the last interval of
+    writes is lost on a crash; call sync() to make writes durable right
+    away. Once snapshot_every records are logged, the thread writes a
+    compacted snapshot and the covered logs are deleted.
+    """
+
+    def __init__(self, path, hash_indexes=(), sorted_indexes=(),
+                 fsync_interval=0.01, snapshot_every=100000):
+        """
+        Open the repository, loading the latest snapshot and replaying the
+        logs written after it.
+
+        Args:
+            path (str): The path prefix of the repository files.
+            hash_indexes (iterable): Attribute names to index for equality
+                lookups.
+            sorted_indexes (iterable): Attribute names to index for range
+                queries.
+            fsync_interval (float): The maximum number of seconds between
+                log fsyncs.
+            snapshot_every (int): The number of logged records after which a
+                snapshot is written, or None to only snapshot on request.
+        """
+        super().__init__(hash_indexes, sorted_indexes)
+        self._path = path
+        self._fsync_interval = fsync_interval
+        self._snapshot_every = snapshot_every
+        self._log_lock = Lock()
+        self._snapshot_lock = Lock()
+        self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Loading creates millions of long-lived objects; collecting while
+        # they are created only rescans them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._generation = self._recover()
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self._log = open(self._log_path(self._generation), "ab")
+        _fsync_directory(directory)
+
+        self._closed = Event()
+        self._flusher = Thread(target=self._flush_loop, daemon=True,
+                               name=f"wal-{os.path.basename(path)}")
+        self._flusher.start()
+
+    def _snapshot_path(self):
+        """
+        Build the path of the snapshot file.
+        """
+        return f"{self._path}.snapshot"
+
+    def _log_path(self, generation):
+        """
+        Build the path of the log file of a generation.
+        """
+        return f"{self._path}.{generation:08d}.log"
+
+    def _log_files(self):
+        """
+        List the existing log files.
+
+        Returns:
+            list: (generation, path) tuples ordered by generation.
+        """
+        directory = os.path.dirname(os.path.abspath(self._path))
+        pattern = re.compile(re.escape(os.path.basename(self._path)) + r"\.(\d{8})\.log$")
+        logs = []
+        for name in os.listdir(directory):
+            match = pattern.match(name)
+            if match:
+                logs.append((int(match.group(1)), os.path.join(directory, name)))
+        return sorted(logs)
+
+    def _recover(self):
+        """
+        Load the snapshot, replay the logs and fill the repository.
+
+        Returns:
+            int: The generation of the log to write next.
+
+        Raises:
+            ValueError: If the snapshot is corrupted.
+        """
+        objects = {}
+        generation = 0
+        if os.path.exists(self._snapshot_path()):
+            frames = _read_frames(self._snapshot_path())
+            header = next(frames, None)
+            if header is None:
+                raise ValueError(f"Corrupt snapshot {self._snapshot_path()}")
+            for chunk in frames:
+                for obj in chunk:
+                    objects[obj.id] = obj
+            if len(objects) != header["count"]:
+                raise ValueError(f"Corrupt snapshot {self._snapshot_path()}")
+            generation = header["generation"]
+
+        replayed = 0
+        next_generation = generation
+        for log_generation, log_path in self._log_files():
+            if log_generation < generation or not os.path.getsize(log_path):
+                # Already covered by the snapshot, or empty
+                os.remove(log_path)
+                continue
+            for operation, payload in _read_frames(log_path):
+                if operation == "put":
+                    objects[payload.id] = payload
+                else:
+                    objects.pop(payload, None)
+                replayed += 1
+            next_generation = log_generation + 1
+
+        self._load(objects.values())
+        self._records_since_snapshot = replayed
+        return next_generation
+
+    def _append(self, record):
+        """
+        Append a record to the log. Called under the write lock.
+
+        Args:
+            record (tuple): The ("put", obj) or ("delete", obj_id) record.
+        """
+        self._log.write(_frame(pickle.dumps(record, pickle.HIGHEST_PROTOCOL)))
+        self._dirty = True
+        self._records_since_snapshot += 1
+
+    def _before_put(self, obj):
+        """
+        Log an object about to be added or replaced.
+        """
+        self._append(("put", obj))
+
+    def _before_delete(self, obj_id):
+        """
+        Log an object about to be deleted.
+        """
+        self._append(("delete", obj_id))
+
+    def _flush_loop(self):
+        """
+        Fsync the log and take snapshots in the background until closed.
+        """
+        while not self._closed.wait(self._fsync_interval):
+            self.sync()
+            if self._snapshot_every and self._records_since_snapshot >= self._snapshot_every:
+                self.snapshot()
+
+    def sync(self):
+        """
+        Flush the log and fsync it, making every write so far durable.
+        """
+        with self._log_lock:
+            if self._dirty:
+                self._dirty = False
+                self._log.flush()
+                os.fsync(self._log.fileno())
+
+    def snapshot(self):
+        """
+        Write every object to a new snapshot and delete the logs it covers.
+
+        Writers are only blocked while the object list is copied and the log
+        is rotated; the objects are written out afterwards. Updates replace
+        objects rather than changing them, so the copied list stays
+        consistent.
+        """
+        with self._snapshot_lock:
+            with self._lock.read():
+                objects = list(self._storage.values())
+                with self._log_lock:
+                    self._log.flush()
+                    os.fsync(self._log.fileno())
+                    self._log.close()
+                    self._generation += 1
+                    self._log = open(self._log_path(self._generation), "ab")
+                    self._dirty = False
+                    self._records_since_snapshot = 0
+                generation = self._generation
+
+            temporary = self._snapshot_path() + ".tmp"
+            with open(temporary, "wb") as file:
+                header = {"generation": generation, "count": len(objects)}
+                file.write(_frame(pickle.dumps(header, pickle.HIGHEST_PROTOCOL)))
+                for start in range(0, len(objects), SNAPSHOT_CHUNK_SIZE):
+                    chunk = objects[start:start + SNAPSHOT_CHUNK_SIZE]
+                    file.write(_frame(pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self._snapshot_path())
+            _fsync_directory(os.path.dirname(os.path.abspath(self._path)))
+
+            for log_generation, log_path in self._log_files():
+                if log_generation < generation:
+                    os.remove(log_path)
+
+    def close(self):
+        """
+        Stop the background thread and make every write durable.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        self.sync()
+        self._log.close()
@@ -1,4 +1,48 @@
+import base64
+import binascii
+import copy
+import json
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from operator import itemgetter
+from app.persistence.rwlock import ReadWriteLock
+
+
+def encode_cursor(created_at, obj_id):
+    """
+    Encode a (created_at, id) keyset position into an opaque cursor string.
+
+    Args:
+        created_at (datetime): The creation timestamp of the last object seen.
+        obj_id (str): The ID of the last object seen.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), obj_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        tuple: The (created_at, id) keyset position.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
 
 
 class Repository(ABC):
@@ -29,6 +73,19 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects from the repository by their IDs.
+
+        Args:
+            obj_ids: An iterable of IDs of the objects to retrieve.
+
+        Returns:
+            A list of the objects found, in the order of obj_ids.
+        """
+        pass
+
     @abstractmethod
     def get_all(self):
         """
@@ -39,6 +96,21 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_page(self, limit, cursor=None):
+        """
+        Retrieve one page of objects ordered by (created_at, id).
+
+        Args:
+            limit: The maximum number of objects to return.
+            cursor: The cursor returned with the previous page, if any.
+
+        Returns:
+            A tuple of the list of objects and the cursor of the next page,
+            or None if this is the last page.
+        """
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         """
@@ -74,17 +146,139 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Retrieve every object of the repository with an attribute value.
+
+        Args:
+            attr_name: The name of the attribute.
+            attr_value: The value of the attribute.
+
+        Returns:
+            A list of the matching objects.
+        """
+        pass
+
+    @abstractmethod
+    def get_range(self, attr_name, low=None, high=None):
+        """
+        Retrieve the objects whose attribute lies between two bounds.
+
+        Args:
+            attr_name: The name of the attribute.
+            low: The inclusive lower bound, or None for no lower bound.
+            high: The inclusive upper bound, or None for no upper bound.
+
+        Returns:
+            A list of the matching objects ordered by the attribute.
+        """
+        pass
+
 
 class InMemoryRepository(Repository):
     """
     In-memory implementation of the Repository interface.
+
+    Secondary indexes can be declared on attributes that are looked up often:
+    hash indexes answer equality lookups and sorted indexes answer range
+    queries. They are kept up to date by add, update and delete, so indexed
+    attributes must only be changed through update.
     """
 
-    def __init__(self):
+    def __init__(self, hash_indexes=(), sorted_indexes=()):
         """
         Initialize the in-memory repository.
+
+        Args:
+            hash_indexes (iterable): Attribute names to index for equality
+                lookups, e.g. ("email",).
+            sorted_indexes (iterable): Attribute names to index for range
+                queries, e.g. ("price", "created_at").
         """
         self._storage = {}
+        # attribute -> value -> {id: obj}, in insertion order
+        self._hash_indexes = {attr: {} for attr in hash_indexes}
+        # attribute -> sorted list of (value, id)
+        self._sorted_indexes = {attr: [] for attr in sorted_indexes}
+        # attribute -> id -> value the object is indexed under
+        self._indexed_values = {attr: {} for attr in (*hash_indexes, *sorted_indexes)}
+
+    def _index(self, obj):
+        """
+        Add an object to every secondary index.
+
+        Args:
+            obj: The object to index.
+        """
+        obj_id = obj.id
+        for attr, values in self._indexed_values.items():
+            values[obj_id] = getattr(obj, attr, None)
+        for attr, index in self._hash_indexes.items():
+            value = self._indexed_values[attr][obj_id]
+            bucket = index.get(value)
+            if bucket is None:
+                index[value] = {obj_id: obj}
+            else:
+                bucket[obj_id] = obj
+        for attr, index in self._sorted_indexes.items():
+            value = self._indexed_values[attr][obj_id]
+            # None does not compare with other values, so it is not indexed
+            if value is not None:
+                insort(index, (value, obj_id))
+
+    def _load(self, objs):
+        """
+        Replace the content of the repository, building the secondary
+        indexes in bulk rather than one insertion at a time.
+
+        Args:
+            objs (iterable): The objects to store.
+        """
+        self._storage = {obj.id: obj for obj in objs}
+        for attr in self._indexed_values:
+            self._indexed_values[attr] = {
+                obj_id: getattr(obj, attr, None) for obj_id, obj in self._storage.items()
+            }
+        for attr in self._hash_indexes:
+            index = {}
+            storage = self._storage
+            for obj_id, value in self._indexed_values[attr].items():
+                bucket = index.get(value)
+                if bucket is None:
+                    index[value] = {obj_id: storage[obj_id]}
+                else:
+                    bucket[obj_id] = storage[obj_id]
+            self._hash_indexes[attr] = index
+        for attr in self._sorted_indexes:
+            self._sorted_indexes[attr] = sorted(
+                (value, obj_id) for obj_id, value in self._indexed_values[attr].items()
+                if value is not None
+            )
+
+    def _unindex(self, obj_id):
+        """
+        Remove an object from every secondary index.
+
+        Args:
+            obj_id: The ID of the object to remove.
+        """
+        if obj_id not in self._storage:
+            return
+        values = {attr: indexed.pop(obj_id, None)
+                  for attr, indexed in self._indexed_values.items()}
+        for attr, index in self._hash_indexes.items():
+            bucket = index.get(values[attr])
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del index[values[attr]]
+        for attr, index in self._sorted_indexes.items():
+            value = values[attr]
+            if value is not None:
+                position = bisect_left(index, (value, obj_id))
+                if position < len(index) and index[position] == (value, obj_id):
+                    del index[position]
 
     def add(self, obj):
         """
@@ -93,7 +287,9 @@ class InMemoryRepository(Repository):
         Args:
             obj: The object to add.
         """
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
 
     def get(self, obj_id):
         """
@@ -107,6 +303,19 @@ class InMemoryRepository(Repository):
         """
         return self._storage.get(obj_id)
 
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects from the in-memory repository by their IDs.
+
+        Args:
+            obj_ids: An iterable of IDs of the objects to retrieve.
+
+        Returns:
+            A list of the objects found, in the order of obj_ids. IDs that do
+            not exist are skipped.
+        """
+        return [self._storage[obj_id] for obj_id in obj_ids if obj_id in self._storage]
+
     def get_all(self):
         """
         Retrieve all objects from the in-memory repository.
@@ -116,6 +325,37 @@ class InMemoryRepository(Repository):
         """
         return list(self._storage.values())
 
+    def get_page(self, limit, cursor=None):
+        """
+        Retrieve one page of objects from the in-memory repository, ordered by
+        (created_at, id).
+
+        Args:
+            limit: The maximum number of objects to return.
+            cursor: The cursor returned with the previous page, if any.
+
+        Returns:
+            A tuple of the list of objects and the cursor of the next page,
+            or None if this is the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        index = self._sorted_indexes.get("created_at")
+        if index is not None:
+            start = bisect_right(index, position) if position else 0
+            ordered = [self._storage[obj_id] for _, obj_id in index[start:start + limit + 1]]
+        else:
+            ordered = sorted(self._storage.values(), key=lambda obj: (obj.created_at, obj.id))
+            if position:
+                ordered = [obj for obj in ordered if (obj.created_at, obj.id) > position]
+
+        if len(ordered) <= limit:
+            return ordered, None
+        items = ordered[:limit]
+        return items, encode_cursor(items[-1].created_at, items[-1].id)
+
     def update(self, obj_id, data):
         """
         Update an object in the in-memory repository.
@@ -124,9 +364,13 @@ class InMemoryRepository(Repository):
             obj_id: The ID of the object to update.
             data: A dictionary of updated data.
         """
-        obj = self.get(obj_id)
+        obj = self._storage.get(obj_id)
         if obj:
-            obj.update(data)
+            self._unindex(obj_id)
+            try:
+                obj.update(data)
+            finally:
+                self._index(obj)
 
     def delete(self, obj_id):
         """
@@ -136,6 +380,7 @@ class InMemoryRepository(Repository):
             obj_id: The ID of the object to delete.
         """
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
@@ -149,7 +394,192 @@ class InMemoryRepository(Repository):
         Returns:
             The retrieved object, or None if not found.
         """
+        index = self._hash_indexes.get(attr_name)
+        if index is not None:
+            return next(iter(index.get(attr_value, {}).values()), None)
+        if attr_name in self._sorted_indexes and attr_value is not None:
+            return next(iter(self._range(attr_name, attr_value, attr_value)), None)
         return next(
             (obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value),
             None
         )
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Retrieve every object of the in-memory repository with an attribute
+        value, using a secondary index on the attribute if there is one.
+
+        Args:
+            attr_name: The name of the attribute.
+            attr_value: The value of the attribute.
+
+        Returns:
+            A list of the matching objects.
+        """
+        index = self._hash_indexes.get(attr_name)
+        if index is not None:
+            return list(index.get(attr_value, {}).values())
+        if attr_name in self._sorted_indexes and attr_value is not None:
+            return self._range(attr_name, attr_value, attr_value)
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+
+    def get_range(self, attr_name, low=None, high=None):
+        """
+        Retrieve the objects whose attribute lies between two bounds, using
+        a sorted index on the attribute if there is one. Objects whose
+        attribute is None are never returned.
+
+        Args:
+            attr_name: The name of the attribute.
+            low: The inclusive lower bound, or None for no lower bound.
+            high: The inclusive upper bound, or None for no upper bound.
+
+        Returns:
+            A list of the matching objects ordered by the attribute.
+        """
+        return self._range(attr_name, low, high)
+
+    def _range(self, attr_name, low, high):
+        """
+        Collect the objects of a range query, see get_range.
+        """
+        index = self._sorted_indexes.get(attr_name)
+        if index is None:
+            matches = [
+                obj for obj in self._storage.values()
+                if getattr(obj, attr_name) is not None
+                and (low is None or getattr(obj, attr_name) >= low)
+                and (high is None or getattr(obj, attr_name) <= high)
+            ]
+            return sorted(matches, key=lambda obj: (getattr(obj, attr_name), obj.id))
+
+        start = bisect_left(index, low, key=itemgetter(0)) if low is not None else 0
+        end = bisect_right(index, high, key=itemgetter(0)) if high is not None else len(index)
+        return [self._storage[obj_id] for _, obj_id in index[start:end]]
+
+
+class ThreadSafeInMemoryRepository(InMemoryRepository):
+    """
+    InMemoryRepository that can be shared between threads.
+
+    Reads run concurrently under the read side of a ReadWriteLock and writes
+    run one at a time under its write side. Updates are copy-on-write: the
+    changes are applied to a copy of the object, which then replaces the
+    original, so a reader holding an object never sees a half-applied update
+    and an update rejected by validation leaves the stored object untouched.
+    """
+
+    def __init__(self, hash_indexes=(), sorted_indexes=()):
+        """
+        Initialize the thread-safe in-memory repository.
+
+        Args:
+            hash_indexes (iterable): Attribute names to index for equality
+                lookups.
+            sorted_indexes (iterable): Attribute names to index for range
+                queries.
+        """
+        super().__init__(hash_indexes, sorted_indexes)
+        self._lock = ReadWriteLock()
+
+    def _before_put(self, obj):
+        """
+        Hook called under the write lock before an object is added or
+        replaced. If it raises, the repository is left unchanged.
+
+        Args:
+            obj: The object about to be stored.
+        """
+
+    def _before_delete(self, obj_id):
+        """
+        Hook called under the write lock before an object is deleted. If it
+        raises, the repository is left unchanged.
+
+        Args:
+            obj_id: The ID of the object about to be deleted.
+        """
+
+    def add(self, obj):
+        """
+        Add an object under the write lock.
+        """
+        with self._lock.write():
+            self._before_put(obj)
+            super().add(obj)
+
+    def get(self, obj_id):
+        """
+        Retrieve an object by its ID under the read lock.
+        """
+        with self._lock.read():
+            return super().get(obj_id)
+
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects by their IDs under the read lock.
+        """
+        with self._lock.read():
+            return super().get_many(obj_ids)
+
+    def get_all(self):
+        """
+        Retrieve a consistent list of all objects under the read lock.
+        """
+        with self._lock.read():
+            return super().get_all()
+
+    def get_page(self, limit, cursor=None):
+        """
+        Retrieve one page of objects under the read lock.
+        """
+        with self._lock.read():
+            return super().get_page(limit, cursor)
+
+    def update(self, obj_id, data):
+        """
+        Update an object by replacing it with an updated copy.
+
+        Args:
+            obj_id: The ID of the object to update.
+            data: A dictionary of updated data.
+        """
+        with self._lock.write():
+            obj = self._storage.get(obj_id)
+            if obj:
+                updated = copy.copy(obj)
+                updated.update(data)
+                self._before_put(updated)
+                self._unindex(obj_id)
+                self._storage[obj_id] = updated
+                self._index(updated)
+
+    def delete(self, obj_id):
+        """
+        Delete an object under the write lock.
+        """
+        with self._lock.write():
+            if obj_id in self._storage:
+                self._before_delete(obj_id)
+            super().delete(obj_id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """
+        Retrieve an object by an attribute value under the read lock.
+        """
+        with self._lock.read():
+            return super().get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Retrieve every object with an attribute value under the read lock.
+        """
+        with self._lock.read():
+            return super().get_all_by_attribute(attr_name, attr_value)
+
+    def get_range(self, attr_name, low=None, high=None):
+        """
+        Retrieve the objects in an attribute range under the read lock.
+        """
+        with self._lock.read():
+            return super().get_range(attr_name, low, high)
@@ -0,0 +1,98 @@
+from threading import Condition, Lock
+
+
+class ReadWriteLock:
+    """
+    A lock letting many readers, or a single writer, in at a time.
+
+    Waiting writers take priority over new readers so that a steady stream
+    of reads cannot starve writes. The lock is not reentrant: a thread
+    holding it must not try to acquire it again.
+
+    Example:
+        with lock.read():
+            ...
+        with lock.write():
+            ...
+    """
+    def __init__(self):
+        """
+        Initialize an unlocked ReadWriteLock.
+        """
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        self._read = _Hold(self.acquire_read, self.release_read)
+        self._write = _Hold(self.acquire_write, self.release_write)
+
+    def read(self):
+        """
+        Hold the lock for reading for the duration of a with block.
+        """
+        return self._read
+
+    def write(self):
+        """
+        Hold the lock for writing for the duration of a with block.
+        """
+        return self._write
+
+    def acquire_read(self):
+        """
+        Wait until no writer holds or waits for the lock, then take a
+        read hold.
+        """
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """
+        Release a read hold.
+        """
+        with self._condition:
+            self._readers -= 1
+            if not self._readers and self._writers_waiting:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Wait until no reader or writer holds the lock, then take it for
+        writing.
+        """
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self):
+        """
+        Release the write hold.
+        """
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+class _Hold:
+    """
+    Context manager calling an acquire and a release function, cheaper
+    than a generator-based one on the lock's hot path.
+    """
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._release()
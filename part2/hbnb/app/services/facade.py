@@ -1,10 +1,23 @@
-from app.persistence.repository import InMemoryRepository
+import atexit
+import os
+from app.models.compact import CompactAmenity, CompactPlace, CompactReview, CompactUser
+from app.persistence.durable import DurableInMemoryRepository
+from app.persistence.repository import ThreadSafeInMemoryRepository
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
 
 
+# The attributes each repository is indexed on
+REPOSITORY_INDEXES = {
+    "users": {"hash_indexes": ("email",), "sorted_indexes": ("created_at",)},
+    "places": {"hash_indexes": ("owner_id",), "sorted_indexes": ("price", "created_at")},
+    "reviews": {"hash_indexes": ("place_id", "user_id"), "sorted_indexes": ("created_at",)},
+    "amenities": {"sorted_indexes": ("created_at",)},
+}
+
+
 class HBnBFacade:
     """
     Facade class to manage interactions between different layers of the
@@ -12,13 +25,68 @@ class HBnBFacade:
     """
     def __init__(self):
         """
-        Initialize the HBnBFacade with in-memory repositories for users,
-        places, reviews, and amenities.
+        Initialize the HBnBFacade with thread-safe in-memory repositories for
+        users, places, reviews, and amenities, indexed on the attributes they
+        are looked up by.
+        """
+        self.user_repo = ThreadSafeInMemoryRepository(**REPOSITORY_INDEXES["users"])
+        self.place_repo = ThreadSafeInMemoryRepository(**REPOSITORY_INDEXES["places"])
+        self.review_repo = ThreadSafeInMemoryRepository(**REPOSITORY_INDEXES["reviews"])
+        self.amenity_repo = ThreadSafeInMemoryRepository(**REPOSITORY_INDEXES["amenities"])
+        self.user_model = User
+        self.place_model = Place
+        self.review_model = Review
+        self.amenity_model = Amenity
+        atexit.register(self.close)
+
+    def init_models(self, config):
+        """
+        Choose the model classes new objects are created with.
+
+        Args:
+            config (dict): The Flask config, read for COMPACT_MODELS. When
+                set, the slotted models of app.models.compact are used.
         """
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+        compact = config.get("COMPACT_MODELS")
+        self.user_model = CompactUser if compact else User
+        self.place_model = CompactPlace if compact else Place
+        self.review_model = CompactReview if compact else Review
+        self.amenity_model = CompactAmenity if compact else Amenity
+
+    def init_persistence(self, config):
+        """
+        Persist the repositories to disk if the app config asks for it,
+        loading the data saved by the previous run.
+
+        Args:
+            config (dict): The Flask config, read for DATA_DIR,
+                WAL_FSYNC_INTERVAL and SNAPSHOT_EVERY.
+        """
+        data_dir = config.get("DATA_DIR")
+        if not data_dir:
+            return
+        self.close()
+
+        def durable(name):
+            return DurableInMemoryRepository(
+                os.path.join(data_dir, name),
+                fsync_interval=config.get("WAL_FSYNC_INTERVAL", 0.01),
+                snapshot_every=config.get("SNAPSHOT_EVERY", 100000),
+                **REPOSITORY_INDEXES[name]
+            )
+
+        self.user_repo = durable("users")
+        self.place_repo = durable("places")
+        self.review_repo = durable("reviews")
+        self.amenity_repo = durable("amenities")
+
+    def close(self):
+        """
+        Make every write durable and release the persisted repositories.
+        """
+        for repo in (self.user_repo, self.place_repo, self.review_repo, self.amenity_repo):
+            if isinstance(repo, DurableInMemoryRepository):
+                repo.close()
 
 #--------------User facade CRUD ops--------------#
     def create_user(self, user_data):
@@ -31,7 +99,7 @@ class HBnBFacade:
         Returns:
             User: The created user instance.
         """
-        user = User(**user_data)
+        user = self.user_model(**user_data)
         self.user_repo.add(user)
         return user
 
@@ -89,7 +157,7 @@ class HBnBFacade:
         Returns:
             Amenity: The created amenity instance.
         """
-        amenity = Amenity(**amenity_data)
+        amenity = self.amenity_model(**amenity_data)
         self.amenity_repo.add(amenity)
         return amenity
 
@@ -135,7 +203,7 @@ class HBnBFacade:
         Returns:
             Place: The created place instance.
         """
-        place = Place(**place_data)
+        place = self.place_model(**place_data)
         self.place_repo.add(place)
         return place
 
@@ -160,6 +228,31 @@ class HBnBFacade:
         """
         return self.place_repo.get_all()
 
+    def get_places_by_owner(self, owner_id):
+        """
+        Retrieve all places belonging to a specific owner.
+
+        Args:
+            owner_id (str): The owner's unique identifier.
+
+        Returns:
+            list: A list of Place instances for the specified owner.
+        """
+        return self.place_repo.get_all_by_attribute('owner_id', owner_id)
+
+    def get_places_by_price_range(self, min_price=None, max_price=None):
+        """
+        Retrieve the places within a specified price range.
+
+        Args:
+            min_price (float): The minimum price, or None for no minimum.
+            max_price (float): The maximum price, or None for no maximum.
+
+        Returns:
+            list: A list of Place instances ordered by price.
+        """
+        return self.place_repo.get_range('price', min_price, max_price)
+
     def update_place(self, place_id, place_data):
         """
         Update a place's information.
@@ -170,6 +263,23 @@ class HBnBFacade:
         """
         self.place_repo.update(place_id, place_data)
 
+    def remove_place_review(self, place_id, review_id):
+        """
+        Remove a review ID from a place's reviews.
+
+        The stored place is never modified in place: the shortened list is
+        written through the repository's update, like any other change.
+
+        Args:
+            place_id (str): The ID of the place.
+            review_id (str): The ID of the review to remove.
+        """
+        place = self.place_repo.get(place_id)
+        if place and review_id in place.reviews:
+            # The reviews setter appends, so the list is replaced directly
+            remaining = [rev for rev in place.reviews if rev != review_id]
+            self.place_repo.update(place_id, {"_reviews": remaining})
+
 #--------------Review facade CRUD ops--------------#
     def create_review(self, review_data):
         """
@@ -181,7 +291,7 @@ class HBnBFacade:
         Returns:
             Review: The created review instance.
         """
-        review = Review(**review_data)
+        review = self.review_model(**review_data)
         self.review_repo.add(review)
         return review
 
@@ -219,7 +329,7 @@ class HBnBFacade:
         place = self.place_repo.get(place_id)
         if not place:
             return None
-        reviews = [self.review_repo.get(review) for review in place.reviews]
+        reviews = self.review_repo.get_many(place.reviews)
         return reviews
 
     def update_review(self, review_id, review_data):
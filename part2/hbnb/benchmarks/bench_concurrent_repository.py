@@ -0,0 +1,114 @@
+"""
+Measure the throughput of ThreadSafeInMemoryRepository under a mixed
+read/write workload at increasing thread counts.
+
+Usage:
+    python -m benchmarks.bench_concurrent_repository [--places N] [--ops N] [--writes PCT]
+"""
+import argparse
+import random
+import threading
+import time
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository, ThreadSafeInMemoryRepository
+
+
+THREAD_COUNTS = (1, 4, 16, 64)
+
+
+def seed(repo, places):
+    """
+    Fill a repository with places.
+
+    Args:
+        repo (InMemoryRepository): The repository to fill.
+        places (int): The number of places to add.
+
+    Returns:
+        list: The IDs of the places added.
+    """
+    ids = []
+    for i in range(places):
+        place = Place(title=f"Place {i}", description="", price=float(i % 500),
+                      latitude=0.0, longitude=0.0, owner_id=f"owner-{i % 100}")
+        repo.add(place)
+        ids.append(place.id)
+    return ids
+
+
+def worker(repo, ids, ops, write_ratio, seed_value):
+    """
+    Run a mix of lookups, range queries and updates.
+
+    Args:
+        repo (InMemoryRepository): The repository to run against.
+        ids (list): The IDs of the places in the repository.
+        ops (int): The number of operations to run.
+        write_ratio (float): The fraction of operations that are updates.
+        seed_value (int): The seed of this worker's random generator.
+    """
+    rng = random.Random(seed_value)
+    for _ in range(ops):
+        roll = rng.random()
+        if roll < write_ratio:
+            repo.update(rng.choice(ids), {"price": float(rng.randrange(500))})
+        elif roll < 0.5:
+            repo.get(rng.choice(ids))
+        elif roll < 0.8:
+            repo.get_all_by_attribute("owner_id", f"owner-{rng.randrange(100)}")
+        else:
+            low = float(rng.randrange(500))
+            repo.get_range("price", low, low + 2)
+
+
+def run_threads(repo, ids, threads, ops, write_ratio):
+    """
+    Split the operations between threads and time them.
+
+    Returns:
+        float: The operations completed per second.
+    """
+    per_thread = ops // threads
+    pool = [threading.Thread(target=worker, args=(repo, ids, per_thread, write_ratio, n))
+            for n in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def run(places, ops, write_ratio):
+    """
+    Report the throughput at every thread count.
+
+    Args:
+        places (int): The number of places to seed.
+        ops (int): The total number of operations per run.
+        write_ratio (float): The fraction of operations that are updates.
+    """
+    indexes = {"hash_indexes": ("owner_id",), "sorted_indexes": ("price",)}
+    print(f"{places} places, {ops} operations, {write_ratio:.0%} updates")
+    print(f"{'repository':<32}{'threads':>8}{'ops/s':>12}")
+
+    repo = InMemoryRepository(**indexes)
+    ids = seed(repo, places)
+    rate = run_threads(repo, ids, 1, ops, write_ratio)
+    print(f"{'InMemoryRepository (unlocked)':<32}{1:>8}{rate:>12,.0f}")
+
+    repo = ThreadSafeInMemoryRepository(**indexes)
+    ids = seed(repo, places)
+    for threads in THREAD_COUNTS:
+        rate = run_threads(repo, ids, threads, ops, write_ratio)
+        print(f"{'ThreadSafeInMemoryRepository':<32}{threads:>8}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--writes", type=float, default=10.0,
+                        help="percentage of operations that are updates")
+    args = parser.parse_args()
+    run(args.places, args.ops, args.writes / 100)
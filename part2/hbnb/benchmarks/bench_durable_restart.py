@@ -0,0 +1,94 @@
+"""
+Measure the write throughput and restart time of DurableInMemoryRepository,
+restarting from the log alone and from a snapshot plus a log tail.
+
+Usage:
+    python -m benchmarks.bench_durable_restart [--objects N]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from app.models.review import Review
+from app.persistence.durable import DurableInMemoryRepository
+from app.services.facade import REPOSITORY_INDEXES
+
+
+def open_repo(path):
+    """
+    Open the review repository stored under path, timing the recovery.
+
+    Returns:
+        tuple: The repository and the seconds taken to open it.
+    """
+    start = time.perf_counter()
+    repo = DurableInMemoryRepository(path, snapshot_every=None, **REPOSITORY_INDEXES["reviews"])
+    return repo, time.perf_counter() - start
+
+
+def add_reviews(repo, count):
+    """
+    Add reviews to a repository, timing the writes and the final fsync.
+
+    Returns:
+        float: The writes per second.
+    """
+    place_ids = [str(uuid.uuid4()) for _ in range(1000)]
+    user_ids = [str(uuid.uuid4()) for _ in range(1000)]
+    reviews = [Review(text="Benchmark review", rating=1 + i % 5,
+                      place_id=place_ids[i % 1000], user_id=user_ids[i // 1000 % 1000])
+               for i in range(count)]
+    start = time.perf_counter()
+    for review in reviews:
+        repo.add(review)
+    repo.sync()
+    return count / (time.perf_counter() - start)
+
+
+def file_sizes(directory):
+    """
+    Describe the files of the repository directory.
+    """
+    return ", ".join(f"{name} {os.path.getsize(os.path.join(directory, name)) / 1e6:.0f} MB"
+                     for name in sorted(os.listdir(directory)))
+
+
+def run(objects):
+    """
+    Fill a repository, then restart it from the log and from a snapshot.
+
+    Args:
+        objects (int): The number of reviews to store.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reviews")
+        repo, _ = open_repo(path)
+        rate = add_reviews(repo, objects)
+        repo.close()
+        print(f"{objects} reviews written at {rate:,.0f} writes/s")
+        print(f"  files: {file_sizes(directory)}")
+
+        del repo
+        repo, seconds = open_repo(path)
+        print(f"restart from the log alone: {seconds:.2f} s ({len(repo.get_all())} reviews)")
+
+        start = time.perf_counter()
+        repo.snapshot()
+        print(f"snapshot written in {time.perf_counter() - start:.2f} s")
+        add_reviews(repo, objects // 10)
+        repo.close()
+        print(f"  files: {file_sizes(directory)}")
+
+        del repo
+        repo, seconds = open_repo(path)
+        print(f"restart from snapshot + {objects // 10} logged writes: {seconds:.2f} s "
+              f"({len(repo.get_all())} reviews)")
+        repo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objects", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.objects)
@@ -0,0 +1,95 @@
+"""
+Compare the memory held per object by the regular and compact models.
+
+Usage:
+    python -m benchmarks.bench_model_memory [--objects N]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from app.models.amenity import Amenity
+from app.models.compact import CompactAmenity, CompactPlace, CompactReview, CompactUser
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+def build_rows(count):
+    """
+    Build the constructor arguments of every model, shared by both variants
+    so only the objects themselves are measured.
+
+    Returns:
+        dict: Model names mapped to lists of keyword argument dicts.
+    """
+    owner_id = str(uuid.uuid4())
+    return {
+        "User": [{"first_name": "John", "last_name": "Doe",
+                  "email": f"user{i}@example.com"} for i in range(count)],
+        "Place": [{"title": "Cottage", "description": "Cozy", "price": float(i),
+                   "latitude": 10.0, "longitude": 20.0, "owner_id": owner_id}
+                  for i in range(count)],
+        "Review": [{"text": "Great stay", "rating": 1 + i % 5, "place_id": owner_id,
+                    "user_id": owner_id} for i in range(count)],
+        "Amenity": [{"name": f"Amenity {i}"} for i in range(count)],
+    }
+
+
+def measure(model, rows):
+    """
+    Create one object per row and report the memory they hold.
+
+    Args:
+        model (type): The model class to instantiate.
+        rows (list): The keyword arguments of every object.
+
+    Returns:
+        tuple: The bytes per object and the seconds taken to create them.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    objects = [model(**row) for row in rows]
+    seconds = time.perf_counter() - start
+    del objects
+
+    gc.collect()
+    tracemalloc.start()
+    objects = [model(**row) for row in rows]
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return current / len(rows), seconds
+
+
+def run(count):
+    """
+    Measure every model and its compact variant.
+
+    Args:
+        count (int): The number of objects created per model.
+    """
+    pairs = {
+        "User": (User, CompactUser),
+        "Place": (Place, CompactPlace),
+        "Review": (Review, CompactReview),
+        "Amenity": (Amenity, CompactAmenity),
+    }
+    rows = build_rows(count)
+    print(f"{count} objects per model")
+    print(f"{'model':<10}{'regular B/obj':>15}{'compact B/obj':>15}{'saved':>8}"
+          f"{'regular s':>11}{'compact s':>11}")
+    for name, (regular, compact) in pairs.items():
+        regular_bytes, regular_seconds = measure(regular, rows[name])
+        compact_bytes, compact_seconds = measure(compact, rows[name])
+        saved = 1 - compact_bytes / regular_bytes
+        print(f"{name:<10}{regular_bytes:>15.0f}{compact_bytes:>15.0f}{saved:>8.0%}"
+              f"{regular_seconds:>11.2f}{compact_seconds:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objects", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.objects)
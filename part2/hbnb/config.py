@@ -7,6 +7,15 @@ class Config:
     """
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Directory persisting the repositories across restarts; when unset
+    # the data only lives in memory
+    DATA_DIR = os.getenv('HBNB_DATA_DIR')
+    # Maximum seconds of writes lost on a crash
+    WAL_FSYNC_INTERVAL = float(os.getenv('HBNB_WAL_FSYNC_INTERVAL', 0.01))
+    # Number of logged writes after which a repository is snapshotted
+    SNAPSHOT_EVERY = int(os.getenv('HBNB_SNAPSHOT_EVERY', 100000))
+    # Store new objects as the slotted models of app.models.compact
+    COMPACT_MODELS = os.getenv('HBNB_COMPACT_MODELS', 'false').lower() == 'true'
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,64 @@
+import copy
+import pickle
+import unittest
+from datetime import datetime
+from app.models.compact import CompactAmenity, CompactPlace, CompactReview, CompactUser
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def setUp(self):
+        self.user = CompactUser(first_name="John", last_name="Doe",
+                                email="john.doe@example.com", is_admin=True)
+        self.place = CompactPlace(title="Cottage", description="Cozy", price=100.0,
+                                  latitude=10.0, longitude=20.0, owner_id=self.user.id)
+        self.review = CompactReview(text="Great", rating=5, place_id=self.place.id,
+                                    user_id=self.user.id)
+        self.amenity = CompactAmenity(name="Wi-Fi")
+
+    def test_instances_have_no_dict(self):
+        for obj in (self.user, self.place, self.review, self.amenity):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_same_attributes_as_regular_models(self):
+        self.assertEqual(self.user.first_name, "John")
+        self.assertTrue(self.user.is_admin)
+        self.assertEqual(self.place.owner_id, self.user.id)
+        self.assertEqual(self.review.rating, 5)
+        self.assertEqual(self.amenity.name, "Wi-Fi")
+        self.place.reviews = self.review.id
+        self.assertEqual(self.place.reviews, [self.review.id])
+
+    def test_id_and_timestamps_round_trip(self):
+        self.assertEqual(len(self.user._id), 16)
+        self.assertEqual(len(self.user.id), 36)
+        now = datetime.now()
+        self.user.created_at = now
+        self.assertEqual(self.user.created_at, now)
+        self.assertIsInstance(self.user._created_at, float)
+
+    def test_validation_is_kept(self):
+        with self.assertRaises(TypeError):
+            CompactPlace(title="Cottage", description="Cozy", price="free",
+                         latitude=10.0, longitude=20.0, owner_id=self.user.id)
+        with self.assertRaises(ValueError):
+            self.review.update({"rating": 6})
+
+    def test_update_refreshes_updated_at(self):
+        before = self.amenity.updated_at
+        self.amenity.update({"name": "Pool"})
+        self.assertEqual(self.amenity.name, "Pool")
+        self.assertGreaterEqual(self.amenity.updated_at, before)
+
+    def test_copy_and_pickle(self):
+        for obj in (copy.copy(self.place), pickle.loads(pickle.dumps(self.place))):
+            self.assertEqual(obj.id, self.place.id)
+            self.assertEqual(obj.created_at, self.place.created_at)
+            self.assertEqual(obj.title, self.place.title)
+
+    def test_copy_has_its_own_lists(self):
+        self.place.add_review("rev0")
+        clone = copy.copy(self.place)
+        clone.add_review("rev1")
+        self.assertEqual(self.place.reviews, ["rev0"])
+        self.assertEqual(clone.reviews, ["rev0", "rev1"])
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.models.place import Place
+from app.persistence.durable import DurableInMemoryRepository
+
+
+class TestDurableInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "places")
+        self.repo = self.open()
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.directory)
+
+    def open(self):
+        return DurableInMemoryRepository(self.path, hash_indexes=("owner_id",),
+                                         sorted_indexes=("price",), snapshot_every=None)
+
+    def reopen(self):
+        self.repo.close()
+        self.repo = self.open()
+
+    def make_place(self, i):
+        return Place(title=f"Place {i}", description="", price=float(i),
+                     latitude=0.0, longitude=0.0, owner_id=f"owner-{i % 2}")
+
+    def test_replays_the_log_after_restart(self):
+        places = [self.make_place(i) for i in range(5)]
+        for place in places:
+            self.repo.add(place)
+        self.repo.update(places[0].id, {"title": "Renamed", "price": 50.0})
+        self.repo.delete(places[1].id)
+        updated_at = self.repo.get(places[0].id).updated_at
+        self.reopen()
+
+        self.assertEqual(len(self.repo.get_all()), 4)
+        self.assertIsNone(self.repo.get(places[1].id))
+        renamed = self.repo.get(places[0].id)
+        self.assertEqual(renamed.title, "Renamed")
+        self.assertEqual(renamed.updated_at, updated_at)
+        self.assertEqual(self.repo.get_range("price", 50.0), [renamed])
+        self.assertEqual(len(self.repo.get_all_by_attribute("owner_id", "owner-0")), 3)
+
+    def test_loads_snapshot_and_log_tail(self):
+        places = [self.make_place(i) for i in range(4)]
+        for place in places[:3]:
+            self.repo.add(place)
+        self.repo.snapshot()
+        self.repo.add(places[3])
+        self.repo.delete(places[0].id)
+        self.reopen()
+
+        self.assertEqual(sorted(p.id for p in self.repo.get_all()),
+                         sorted(p.id for p in places[1:]))
+        logs = [name for name in os.listdir(self.directory) if name.endswith(".log")]
+        self.assertEqual(len(logs), 2)
+
+    def test_snapshot_deletes_covered_logs(self):
+        self.repo.add(self.make_place(0))
+        self.repo.snapshot()
+        self.repo.snapshot()
+        logs = [name for name in os.listdir(self.directory) if name.endswith(".log")]
+        self.assertEqual(len(logs), 1)
+        self.reopen()
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_ignores_torn_record_at_end_of_log(self):
+        self.repo.add(self.make_place(0))
+        self.repo.add(self.make_place(1))
+        self.repo.close()
+        log = [name for name in os.listdir(self.directory) if name.endswith(".log")][0]
+        with open(os.path.join(self.directory, log), "r+b") as file:
+            file.truncate(os.path.getsize(file.name) - 3)
+        self.repo = self.open()
+
+        self.assertEqual(len(self.repo.get_all()), 1)
+        self.repo.add(self.make_place(2))
+        self.reopen()
+        self.assertEqual(len(self.repo.get_all()), 2)
+
+    def test_rejected_update_is_not_logged(self):
+        place = self.make_place(0)
+        self.repo.add(place)
+        with self.assertRaises(TypeError):
+            self.repo.update(place.id, {"price": "free"})
+        self.reopen()
+        self.assertEqual(self.repo.get(place.id).price, 0.0)
@@ -0,0 +1,193 @@
+import sys
+import threading
+import unittest
+from app.persistence.repository import InMemoryRepository, ThreadSafeInMemoryRepository
+from app.models.amenity import Amenity
+from app.models.place import Place
+
+
+class TestInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository()
+        self.amenities = [Amenity(name=f"Amenity {i}") for i in range(5)]
+        for amenity in self.amenities:
+            self.repo.add(amenity)
+
+    def test_get_many_keeps_input_order(self):
+        ids = [self.amenities[3].id, self.amenities[0].id, self.amenities[4].id]
+        found = self.repo.get_many(ids)
+        self.assertEqual([amenity.id for amenity in found], ids)
+
+    def test_get_many_skips_unknown_ids(self):
+        found = self.repo.get_many(["missing", self.amenities[1].id])
+        self.assertEqual(found, [self.amenities[1]])
+
+    def test_get_many_empty(self):
+        self.assertEqual(self.repo.get_many([]), [])
+
+    def test_get_page_walks_every_object_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = self.repo.get_page(2, cursor)
+            seen.extend(amenity.id for amenity in page)
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(amenity.id for amenity in self.amenities))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_get_page_rejects_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.repo.get_page(2, "not-a-cursor")
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository(hash_indexes=("owner_id",),
+                                       sorted_indexes=("price", "created_at"))
+        self.places = [
+            Place(title=f"Place {i}", description="", price=float(i * 10),
+                  latitude=0.0, longitude=0.0, owner_id=f"owner-{i % 2}")
+            for i in range(6)
+        ]
+        for place in self.places:
+            self.repo.add(place)
+
+    def test_get_all_by_attribute_uses_hash_index(self):
+        found = self.repo.get_all_by_attribute("owner_id", "owner-1")
+        self.assertEqual(found, [self.places[1], self.places[3], self.places[5]])
+        self.assertEqual(self.repo.get_by_attribute("owner_id", "owner-0"), self.places[0])
+        self.assertIsNone(self.repo.get_by_attribute("owner_id", "nobody"))
+
+    def test_get_range_is_inclusive_and_ordered(self):
+        found = self.repo.get_range("price", 10.0, 30.0)
+        self.assertEqual(found, self.places[1:4])
+        self.assertEqual(self.repo.get_range("price", high=10.0), self.places[:2])
+        self.assertEqual(self.repo.get_range("price", low=45.0), self.places[5:])
+
+    def test_update_moves_object_between_index_entries(self):
+        place = self.places[0]
+        self.repo.update(place.id, {"owner_id": "owner-1", "price": 100.0})
+        self.assertNotIn(place, self.repo.get_all_by_attribute("owner_id", "owner-0"))
+        self.assertIn(place, self.repo.get_all_by_attribute("owner_id", "owner-1"))
+        self.assertEqual(self.repo.get_range("price", 0.0, 0.0), [])
+        self.assertEqual(self.repo.get_range("price", 100.0), [place])
+
+    def test_delete_removes_object_from_indexes(self):
+        place = self.places[2]
+        self.repo.delete(place.id)
+        self.assertNotIn(place, self.repo.get_all_by_attribute("owner_id", "owner-0"))
+        self.assertNotIn(place, self.repo.get_range("price"))
+
+    def test_indexed_lookups_match_scans(self):
+        scan = InMemoryRepository()
+        for place in self.places:
+            scan.add(place)
+        self.assertEqual(self.repo.get_range("price", 15.0, 45.0),
+                         scan.get_range("price", 15.0, 45.0))
+        self.assertEqual(self.repo.get_all_by_attribute("owner_id", "owner-0"),
+                         scan.get_all_by_attribute("owner_id", "owner-0"))
+        self.assertEqual(self.repo.get_page(4), scan.get_page(4))
+        page, cursor = self.repo.get_page(4)
+        self.assertEqual(self.repo.get_page(4, cursor), scan.get_page(4, cursor))
+
+
+class TestThreadSafeInMemoryRepository(unittest.TestCase):
+
+    THREADS = 8
+    ITERATIONS = 300
+
+    def setUp(self):
+        self.repo = ThreadSafeInMemoryRepository(hash_indexes=("owner_id",),
+                                                 sorted_indexes=("price", "created_at"))
+        self.place = Place(title="t-0", description="t-0", price=0.0,
+                           latitude=0.0, longitude=0.0, owner_id="owner")
+        self.repo.add(self.place)
+        self.errors = []
+
+    def run_threads(self, *targets):
+        def guard(target):
+            try:
+                target()
+            except Exception as e:
+                self.errors.append(e)
+
+        threads = [threading.Thread(target=guard, args=(target,)) for target in targets]
+        # Switch threads as often as possible to surface races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(self.errors, [])
+
+    def test_concurrent_adds_and_reads(self):
+        def writer(n):
+            def run():
+                for i in range(self.ITERATIONS):
+                    self.repo.add(Place(title=f"{n}-{i}", description="", price=float(i),
+                                        latitude=0.0, longitude=0.0, owner_id=f"owner-{n}"))
+            return run
+
+        def reader():
+            for _ in range(self.ITERATIONS):
+                self.repo.get_all()
+                for place in self.repo.get_range("price", 10.0, 20.0):
+                    assert 10.0 <= place.price <= 20.0
+                self.repo.get_page(10)
+
+        writers = [writer(n) for n in range(self.THREADS)]
+        self.run_threads(*writers, *[reader] * self.THREADS)
+
+        self.assertEqual(len(self.repo.get_all()), self.THREADS * self.ITERATIONS + 1)
+        for n in range(self.THREADS):
+            self.assertEqual(len(self.repo.get_all_by_attribute("owner_id", f"owner-{n}")),
+                             self.ITERATIONS)
+        self.assertEqual(len(self.repo.get_range("price")), self.THREADS * self.ITERATIONS + 1)
+
+    def test_readers_never_see_half_applied_updates(self):
+        def writer(n):
+            def run():
+                for i in range(self.ITERATIONS):
+                    value = f"t-{n}-{i}"
+                    self.repo.update(self.place.id, {"title": value, "description": value,
+                                                     "price": float(i)})
+            return run
+
+        def reader():
+            for _ in range(self.ITERATIONS * 4):
+                place = self.repo.get(self.place.id)
+                assert place.title == place.description, (place.title, place.description)
+
+        writers = [writer(n) for n in range(self.THREADS)]
+        self.run_threads(*writers, *[reader] * self.THREADS)
+        self.assertEqual(len(self.repo.get_range("price")), 1)
+
+    def test_rejected_update_leaves_object_unchanged(self):
+        with self.assertRaises(TypeError):
+            self.repo.update(self.place.id, {"title": "changed", "price": "free"})
+        self.assertEqual(self.repo.get(self.place.id).title, "t-0")
+        self.assertEqual(self.repo.get_range("price", 0.0, 0.0), [self.place])
+
+    def test_rejected_update_leaves_list_attribute_unchanged(self):
+        self.repo.update(self.place.id, {"reviews": "rev0"})
+        with self.assertRaises(TypeError):
+            self.repo.update(self.place.id, {"reviews": "rev1", "price": -5})
+        self.assertEqual(self.repo.get(self.place.id).reviews, ["rev0"])
+
+    def test_update_does_not_reach_replaced_object(self):
+        before = self.repo.get(self.place.id)
+        self.repo.update(self.place.id, {"reviews": "rev1"})
+        self.repo.update(self.place.id, {"amenities": ["wifi"]})
+        self.assertEqual(before.reviews, [])
+        self.assertEqual(before.amenities, [])
+        after = self.repo.get(self.place.id)
+        self.assertEqual(after.reviews, ["rev1"])
+        self.assertEqual(after.amenities, ["wifi"])
+
@@ -231,6 +231,11 @@ class TestReviewEndpoints(unittest.TestCase):
         self.assertEqual(delete_response.status_code, 200)
         self.assertEqual(delete_response.json["message"], "Review deleted successfully")
 
+        # The place no longer lists the review
+        place_response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(place_response.status_code, 200)
+        self.assertEqual(place_response.json["reviews"], [])
+
     def test_delete_review_not_found(self):
         delete_response = self.client.delete('/api/v1/reviews/nonexistent_id')
         self.assertEqual(delete_response.status_code, 404)
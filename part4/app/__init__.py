@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from app.extensions import bcrypt, jwt, db
 from flask_restx import Api
@@ -9,24 +10,58 @@ from app.api.v1.auth import api as auth_ns
 from app.api.v1.protected import api as protected_ns
 from app.api.v1.admin import api as admin_ns
 from app.routes import html
+from app.services import facade
+from app.persistence.engine import install_sqlite_pragmas, install_sqlite_statement_timeout
+from app.persistence.engine import metered_engine_options
+from app.persistence.routing import init_app as init_read_routing
 from app.cli import init_app as init_cli  # REMOVE for production
 
 
-def create_app(config_class="config.DevelopmentConfig"):
+def create_app(config_class=None):
     """
     Create and configure the Flask application.
 
+    Args:
+        config_class: The configuration class or its import path. Defaults
+            to the entry of config.config named by the HBNB_ENV environment
+            variable, or the development configuration.
+
     Returns:
         Flask: The configured Flask application instance.
     """
     app = Flask(__name__)
     #this is for SQLite db
     init_cli(app)  #REMOVE for production
+    if config_class is None:
+        from config import config
+        env = os.getenv("HBNB_ENV", "default")
+        if env not in config:
+            raise ValueError(f"Unknown HBNB_ENV {env!r}, expected one of {', '.join(config)}")
+        config_class = config[env]
     app.config.from_object(config_class)
+    # Pooled profiles get the pool recording checkout wait and saturation
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = metered_engine_options(
+        app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    )
 
     bcrypt.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
+    with app.app_context():
+        # Installed on the primary and the replica before their first
+        # connection is opened
+        for engine in db.engines.values():
+            if engine.dialect.name != "sqlite":
+                continue
+            if app.config.get("SQLITE_PRAGMAS"):
+                install_sqlite_pragmas(engine, app.config["SQLITE_PRAGMAS"])
+            if app.config.get("DB_STATEMENT_TIMEOUT_MS"):
+                install_sqlite_statement_timeout(engine, app.config["DB_STATEMENT_TIMEOUT_MS"])
+        facade.init_sqlite_maintenance(app.config)
+    init_read_routing(app, db)
+    facade.init_group_commit(app)
+    facade.init_cache(app.config)
+    facade.init_place_catalog(app.config)
     
     api = Api(
         app,
@@ -48,4 +83,9 @@ def create_app(config_class="config.DevelopmentConfig"):
     # Register the HTML Blueprint
     app.register_blueprint(html)
 
+    if app.config.get("NEARBY_INDEX_PRELOAD"):
+        with app.app_context():
+            if db.inspect(db.engine).has_table("places"):
+                facade.load_nearby_index()
+
     return app
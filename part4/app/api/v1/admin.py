@@ -1,6 +1,9 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.api.v1.listing import PAGE_PARAMS, page_args, paginated_response
+from app.api.v1.users import USER_SUMMARY_COLUMNS, user_summary
 
 
 api = Namespace('admin', description='Admin operations')
@@ -80,7 +83,8 @@ class AdminUserResource(Resource):
                 return {'error': 'Email is already in use'}, 400
 
         try:
-            facade.update_user(user_id, user_update_data)
+            with facade.unit_of_work():
+                facade.update_user(user_id, user_update_data)
         except Exception as e:
             return {"error": f"Invalid input data {e}"}, 400
         updated_user = facade.get_user(user_id)
@@ -93,6 +97,70 @@ class AdminUserResource(Resource):
         }, 200
 
 
+@api.route('/users/search')
+class AdminUserSearch(Resource):
+    @api.response(200, 'Matching users retrieved successfully')
+    @api.response(400, 'Invalid search or pagination parameters')
+    @api.response(403, 'Admin privileges required')
+    @api.doc(params={"q": "Substrings the first name, last name or email must contain, separated by spaces",
+                     **{name: doc for name, doc in PAGE_PARAMS.items() if name != "stream"}})
+    @jwt_required()
+    def get(self):
+        """
+        Search the users by name and email.
+
+        Only an admin can search the users. Users containing every word of
+        q are returned best match first, paginated with limit and cursor
+        like the user list.
+
+        Returns:
+            dict: The users of the page under items, and next_cursor.
+            int: The HTTP status code.
+        """
+        if not get_jwt()["is_admin"]:
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            limit, cursor = page_args()
+            users, next_cursor = facade.search_users(
+                request.args.get("q", ""), limit, cursor, USER_SUMMARY_COLUMNS
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return paginated_response([user_summary(user) for user in users], next_cursor)
+
+
+@api.route('/metrics')
+class AdminMetrics(Resource):
+    @api.response(200, 'Metrics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """
+        Retrieve the runtime metrics of the application.
+
+        Only an admin can read the metrics: the connection pool checkout
+        wait times and saturation under db_pool, the entity cache counters
+        under entity_cache, the periodic SQLite checkpoints under
+        sqlite_maintenance and the group commit batches under group_commit.
+        Each is null when disabled.
+
+        Returns:
+            dict: The metrics.
+            int: The HTTP status code.
+        """
+        if not get_jwt()["is_admin"]:
+            return {'error': 'Admin privileges required'}, 403
+
+        return {
+            "db_pool": facade.pool_stats(),
+            "entity_cache": facade.cache_stats(),
+            "sqlite_maintenance": facade.sqlite_maintenance_stats(),
+            "group_commit": facade.group_commit_stats()
+        }, 200
+
+
 @api.route('/users/')
 class AdminUserCreate(Resource):
     @api.expect(user_model, validate=True)
@@ -1,5 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.listing import PAGE_PARAMS, page_args, paginated_response
+from app.api.v1.listing import streamed_response, wants_stream
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -8,6 +10,24 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
+# Only these columns are loaded for the list endpoint
+AMENITY_SUMMARY_COLUMNS = ("id", "name")
+
+def amenity_summary(amenity):
+    """
+    Serialize the fields of an amenity shown in the amenity list.
+
+    Args:
+        amenity (Amenity|Row): The amenity (or projected row) to serialize.
+
+    Returns:
+        dict: The amenity's id and name.
+    """
+    return {
+        "id": amenity.id,
+        "name": amenity.name
+    }
+
 @api.route('/')
 class AmenityList(Resource):
     @api.expect(amenity_model, validate=True)
@@ -35,23 +55,32 @@ class AmenityList(Resource):
         }, 201
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @api.doc(params=PAGE_PARAMS)
     def get(self):
         """
-        Retrieve all amenities.
+        Retrieve one page of amenities.
+
+        Pages are selected with the limit and cursor query parameters. With
+        ?stream=1 or Accept: application/x-ndjson every amenity is streamed
+        instead, one JSON object per line.
 
         Returns:
-            list: A list of dictionaries containing amenity details.
+            dict: The amenities of the page under items, and next_cursor.
             int: The HTTP status code.
         """
-        amenities = facade.get_all_amenities()
-        amenities_list = [
-            {
-                "id": amenity.id,
-                "name": amenity.name
-            } for amenity in amenities
-        ]
-
-        return amenities_list, 200
+        if wants_stream():
+            return streamed_response(facade.iter_amenities(columns=AMENITY_SUMMARY_COLUMNS), amenity_summary)
+
+        try:
+            limit, cursor = page_args()
+            amenities, next_cursor = facade.get_amenities_page(limit, cursor, AMENITY_SUMMARY_COLUMNS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        amenities_list = [amenity_summary(amenity) for amenity in amenities]
+
+        return paginated_response(amenities_list, next_cursor)
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
@@ -0,0 +1,109 @@
+"""Helpers shared by the collection (list) endpoints of every namespace"""
+import json
+from urllib.parse import urlencode
+from flask import Response, request, stream_with_context
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# Swagger documentation of the pagination query parameters
+PAGE_PARAMS = {
+    "limit": f"Page size (1-{MAX_PAGE_LIMIT}, default {DEFAULT_PAGE_LIMIT})",
+    "cursor": "Cursor of the page to fetch, taken from next_cursor",
+    "stream": "Set to 1 to stream every object as NDJSON instead of paging"
+}
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Serialized rows are buffered up to this many bytes before being written
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def page_args():
+    """
+    Read the limit and cursor query parameters of the current request.
+
+    Returns:
+        tuple: The page size and the cursor (None for the first page).
+
+    Raises:
+        ValueError: If limit is not an integer between 1 and MAX_PAGE_LIMIT.
+    """
+    limit = request.args.get("limit", DEFAULT_PAGE_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit, request.args.get("cursor") or None
+
+
+def paginated_response(items, next_cursor):
+    """
+    Build the body, status and headers of a paginated list response.
+
+    The next page is advertised both in the body (next_cursor) and in an
+    RFC 8288 Link header that repeats the current query string.
+
+    Args:
+        items (list): The serialized objects of the current page.
+        next_cursor (str): The cursor of the next page, or None.
+
+    Returns:
+        tuple: The response body, the HTTP status code and the headers.
+    """
+    headers = {}
+    if next_cursor:
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return {"items": items, "next_cursor": next_cursor}, 200, headers
+
+
+def wants_stream():
+    """
+    Tell whether the client asked for a streamed NDJSON response, either
+    with ?stream=1 or by preferring application/x-ndjson in Accept.
+
+    Returns:
+        bool: True if the response should be streamed.
+    """
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def streamed_response(objs, serialize):
+    """
+    Stream objects as newline-delimited JSON while they are being read.
+
+    Nothing is materialized up front: each object is serialized as it comes
+    out of the iterator and written in chunks of about STREAM_CHUNK_BYTES,
+    so the worker's memory does not grow with the size of the collection.
+
+    Args:
+        objs (iterable): The objects to stream, typically a repository's
+            iter_all().
+        serialize (callable): Turns one object into a JSON-serializable dict.
+
+    Returns:
+        Response: A chunked application/x-ndjson response.
+    """
+    def generate():
+        buffer = []
+        size = 0
+        for obj in objs:
+            line = json.dumps(serialize(obj)) + "\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= STREAM_CHUNK_BYTES:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield "".join(buffer)
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
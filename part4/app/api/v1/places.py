@@ -1,6 +1,10 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.models.place import average_rating
+from app.api.v1.listing import MAX_PAGE_LIMIT, PAGE_PARAMS, page_args, paginated_response
+from app.api.v1.listing import streamed_response, wants_stream
 
 api = Namespace('places', description='Place operations')
 
@@ -38,6 +42,147 @@ place_model = api.model('Place', {
 })
 
 
+# Only these columns are loaded for the list endpoint
+PLACE_SUMMARY_COLUMNS = ("id", "title", "latitude", "longitude", "price")
+
+
+# Optional field groups of the place list, requested with ?include=, and
+# the extra columns each one loads
+INCLUDE_COLUMNS = {
+    "rating": ("review_count", "rating_sum")
+}
+
+
+def place_summary(place, include=()):
+    """
+    Serialize the fields of a place shown in the place list.
+
+    Args:
+        place (Place|Row): The place (or projected row) to serialize.
+        include (tuple): Optional field groups to add, see INCLUDE_COLUMNS.
+
+    Returns:
+        dict: The place's id, title, coordinates and price, plus its
+        average rating and review count if "rating" is included.
+    """
+    summary = {
+        "id": place.id,
+        "title": place.title,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "price": place.price
+    }
+    if "rating" in include:
+        summary["rating"] = average_rating(place.rating_sum, place.review_count)
+        summary["review_count"] = place.review_count
+    return summary
+
+
+def include_args():
+    """
+    Read the optional field groups from the include query parameter, a
+    comma-separated list such as "rating".
+
+    Returns:
+        tuple: The names of the requested groups.
+
+    Raises:
+        ValueError: If a name is not a known group.
+    """
+    names = [name.strip() for name in request.args.get("include", "").split(",") if name.strip()]
+    if any(name not in INCLUDE_COLUMNS for name in names):
+        raise ValueError(f"include must be a comma-separated list of: {', '.join(INCLUDE_COLUMNS)}")
+    return tuple(dict.fromkeys(names))
+
+
+def summary_columns(include):
+    """
+    List the columns loaded for the place list with the given groups.
+    """
+    return PLACE_SUMMARY_COLUMNS + tuple(
+        column for name in include for column in INCLUDE_COLUMNS[name]
+    )
+
+
+# Swagger documentation of the list filters, on top of the pagination ones
+FILTER_PARAMS = {
+    "min_price": "Only places costing at least this much per night",
+    "max_price": "Only places costing at most this much per night",
+    "min_rating": "Only places whose average rating is at least this (1-5)",
+    "bbox": "Only places inside the box minLon,minLat,maxLon,maxLat, edges included",
+    "include": "Optional fields to add to every place: rating (average rating and review count)"
+}
+
+NUMERIC_FILTERS = ("min_price", "max_price", "min_rating")
+
+
+def parse_bbox(value):
+    """
+    Parse a bounding box given as "minLon,minLat,maxLon,maxLat".
+
+    Args:
+        value (str): The bbox query parameter.
+
+    Returns:
+        tuple: The (min_lon, min_lat, max_lon, max_lat) floats.
+
+    Raises:
+        ValueError: If the box is malformed, out of range or inverted.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    if not (-180.0 <= min_lon <= max_lon <= 180.0):
+        raise ValueError("bbox longitudes must satisfy -180 <= minLon <= maxLon <= 180")
+    if not (-90.0 <= min_lat <= max_lat <= 90.0):
+        raise ValueError("bbox latitudes must satisfy -90 <= minLat <= maxLat <= 90")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def filter_args():
+    """
+    Read the list filters from the query parameters of the current request.
+
+    Returns:
+        dict: The given filters keyed by name: floats, and the bbox tuple.
+
+    Raises:
+        ValueError: If a filter is not a number or the bbox is invalid.
+    """
+    filters = {}
+    for name in NUMERIC_FILTERS:
+        value = request.args.get(name)
+        if value is None or value == "":
+            continue
+        try:
+            filters[name] = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number")
+    if request.args.get("bbox"):
+        filters["bbox"] = parse_bbox(request.args["bbox"])
+    return filters
+
+
+def iter_filtered_places(filters, columns=PLACE_SUMMARY_COLUMNS):
+    """
+    Iterate over every place matching the filters, page by page.
+
+    Args:
+        filters (dict): The filters, as returned by filter_args.
+        columns (tuple): The columns to load.
+
+    Yields:
+        The matching places (or rows), ordered by creation time.
+    """
+    cursor = None
+    while True:
+        places, cursor = facade.filter_places(MAX_PAGE_LIMIT, cursor, columns, **filters)
+        yield from places
+        if not cursor:
+            return
+
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -80,23 +225,151 @@ class PlaceList(Resource):
         }, 201
 
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination or filter parameters')
+    @api.doc(params={**PAGE_PARAMS, **FILTER_PARAMS})
     def get(self):
         """
-        Retrieve a list of all places from the repository.
+        Retrieve one page of places from the repository.
+
+        Pages are selected with the limit and cursor query parameters; the
+        cursor of the next page is returned in next_cursor and in the Link
+        header. With ?stream=1 or Accept: application/x-ndjson every place
+        is streamed instead, one JSON object per line. The min_price,
+        max_price, min_rating and bbox parameters restrict the places
+        listed. With include=rating every place also has its average rating
+        and review count, read by the same query.
 
         Returns:
-            list: A list of dictionaries containing place details.
+            dict: The places of the page under items, and next_cursor.
             int: The HTTP status code.
         """
-        place_repo_list = facade.get_all_places()
-        places_list = [{
-            "id": place.id,
-            "title": place.title,
-            "latitude": place.latitude,
-            "longitude": place.longitude,
-            "price": place.price
-        } for place in place_repo_list]
-        return places_list, 200
+        try:
+            filters = filter_args()
+            include = include_args()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        columns = summary_columns(include)
+
+        def serialize(place):
+            return place_summary(place, include)
+
+        if wants_stream():
+            if filters:
+                return streamed_response(iter_filtered_places(filters, columns), serialize)
+            return streamed_response(facade.iter_places(columns=columns), serialize)
+
+        try:
+            limit, cursor = page_args()
+            if filters:
+                place_repo_list, next_cursor = facade.filter_places(limit, cursor, columns, **filters)
+            else:
+                place_repo_list, next_cursor = facade.get_places_page(limit, cursor, columns)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        places_list = [serialize(place) for place in place_repo_list]
+        return paginated_response(places_list, next_cursor)
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search or pagination parameters')
+    @api.doc(params={"q": "Words the title or description must contain; end a word with * to match it as a prefix",
+                     **{name: doc for name, doc in PAGE_PARAMS.items() if name != "stream"}})
+    def get(self):
+        """
+        Search the places by title and description.
+
+        Places containing every word of q are returned best match first,
+        paginated with limit and cursor like the place list.
+
+        Returns:
+            dict: The places of the page under items, and next_cursor.
+            int: The HTTP status code.
+        """
+        try:
+            limit, cursor = page_args()
+            places, next_cursor = facade.search_places(
+                request.args.get("q", ""), limit, cursor, PLACE_SUMMARY_COLUMNS
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        return paginated_response([place_summary(place) for place in places], next_cursor)
+
+
+DEFAULT_NEARBY_K = 10
+MAX_NEARBY_K = 100
+
+# Swagger documentation of the nearby query parameters
+NEARBY_PARAMS = {
+    "lat": "Latitude of the point to search around (-90 to 90)",
+    "lon": "Longitude of the point to search around (-180 to 180)",
+    "k": f"Number of places to return (1-{MAX_NEARBY_K}, default {DEFAULT_NEARBY_K})",
+    "max_km": "Only return places at most this many kilometres away"
+}
+
+
+def nearby_args():
+    """
+    Read the nearby query parameters of the current request.
+
+    Returns:
+        tuple: The latitude, longitude, k and max_km (None if not given).
+
+    Raises:
+        ValueError: If a parameter is missing, not a number or out of range.
+    """
+    try:
+        latitude = float(request.args["lat"])
+        longitude = float(request.args["lon"])
+    except (KeyError, ValueError):
+        raise ValueError("lat and lon must be numbers")
+    if not -90.0 <= latitude <= 90.0 or not -180.0 <= longitude <= 180.0:
+        raise ValueError("lat must be between -90 and 90, lon between -180 and 180")
+    try:
+        k = int(request.args.get("k", DEFAULT_NEARBY_K))
+    except ValueError:
+        raise ValueError("k must be an integer")
+    if k < 1 or k > MAX_NEARBY_K:
+        raise ValueError(f"k must be between 1 and {MAX_NEARBY_K}")
+    max_km = request.args.get("max_km")
+    if max_km is not None:
+        try:
+            max_km = float(max_km)
+        except ValueError:
+            raise ValueError("max_km must be a number")
+        if not max_km >= 0:
+            raise ValueError("max_km must not be negative")
+    return latitude, longitude, k, max_km
+
+
+@api.route('/nearby')
+class NearbyPlaceList(Resource):
+    @api.response(200, 'Nearby places retrieved successfully')
+    @api.response(400, 'Invalid nearby parameters')
+    @api.doc(params=NEARBY_PARAMS)
+    def get(self):
+        """
+        Retrieve the places closest to a point.
+
+        Places are sorted by great-circle distance, which is returned in
+        distance_km alongside the fields of the place list.
+
+        Returns:
+            dict: The places under items, closest first.
+            int: The HTTP status code.
+        """
+        try:
+            latitude, longitude, k, max_km = nearby_args()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        nearby = facade.get_nearby_places(latitude, longitude, k, max_km)
+        return {"items": [
+            dict(place_summary(place), distance_km=round(distance, 3))
+            for place, distance in nearby
+        ]}, 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
@@ -113,13 +386,13 @@ class PlaceResource(Resource):
             dict: A dictionary containing the place's details.
             int: The HTTP status code.
         """
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, load=("owner", "amenities", "reviews"))
         if not place:
             return {"error": "Place not found"}, 404
 
-        owner = facade.get_user(place.owner_id)
-        amenities = [facade.get_amenity(amenity.id) for amenity in place.amenities]
-        reviews = [facade.get_review(review.id) for review in place.reviews]
+        owner = place.owner
+        amenities = place.amenities
+        reviews = place.reviews
         return {
             "id": place.id,
             "title": place.title,
@@ -127,10 +400,12 @@ class PlaceResource(Resource):
             "latitude": place.latitude,
             "longitude": place.longitude,
             "price": place.price,
-            "rating": facade.get_average_rating_for_place(place.id),
+            "rating": place.average_rating,
+            "review_count": place.review_count,
+            "rating_histogram": {str(star): count for star, count in place.rating_histogram.items()},
             "owner": marshal(owner, user_model) if owner else None,
-            "amenities": [marshal(amenity, amenity_model) for amenity in amenities if amenity],
-            "reviews": [marshal(review, review_model) for review in reviews if review]
+            "amenities": [marshal(amenity, amenity_model) for amenity in amenities],
+            "reviews": [marshal(review, review_model) for review in reviews]
         }, 200
 
     @api.expect(place_model)
@@ -194,11 +469,9 @@ class PlaceReviewList(Resource):
             list: A list of dictionaries containing review details.
             int: The HTTP status code.
         """
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, load=("reviews",))
         if not place:
             return {"error": "Place not found"}, 404
 
-        place_review_list = [
-            marshal(facade.get_review(review.id), review_model) for review in place.reviews if review
-        ]
+        place_review_list = [marshal(review, review_model) for review in place.reviews]
         return place_review_list, 200
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.v1.listing import PAGE_PARAMS, page_args, paginated_response
+from app.api.v1.listing import streamed_response, wants_stream
 
 api = Namespace('reviews', description='Review operations')
 
@@ -12,6 +14,25 @@ review_model = api.model('Review', {
     # 'place_id': fields.String(required=True, description='ID of the place')
 })
 
+# Only these columns are loaded for the list endpoint
+REVIEW_SUMMARY_COLUMNS = ("id", "text", "rating")
+
+def review_summary(review):
+    """
+    Serialize the fields of a review shown in the review list.
+
+    Args:
+        review (Review|Row): The review (or projected row) to serialize.
+
+    Returns:
+        dict: The review's id, text and rating.
+    """
+    return {
+        "id": review.id,
+        "text": review.text,
+        "rating": review.rating
+    }
+
 @api.route('/')
 class ReviewList(Resource):
     @api.expect(review_model)
@@ -41,12 +62,11 @@ class ReviewList(Resource):
         user_giving_review = facade.get_user(current_user)
         if not user_giving_review:
             return {"error": "User not found"}, 400
-        if review_data["place_id"] in [plc.id for plc in facade.get_places_by_owner(current_user)]:
+        if place_to_review.owner_id == current_user:
             return {"error": "You cannot review your own place"}, 400
 
-        for review in place_to_review.reviews:
-            if review.user_id == current_user:
-                return {"error": "You have already reviewed this place"}, 400
+        if facade.get_review_by_place_and_user(place_to_review.id, current_user):
+            return {"error": "You have already reviewed this place"}, 400
 
         try:
             new_review = facade.create_review(review_data)
@@ -62,24 +82,32 @@ class ReviewList(Resource):
         }, 201
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @api.doc(params=PAGE_PARAMS)
     def get(self):
         """
-        Retrieve a list of all reviews.
+        Retrieve one page of reviews.
+
+        Pages are selected with the limit and cursor query parameters. With
+        ?stream=1 or Accept: application/x-ndjson every review is streamed
+        instead, one JSON object per line.
 
         Returns:
-            list: A list of dictionaries containing review details.
+            dict: The reviews of the page under items, and next_cursor.
             int: The HTTP status code.
         """
-        review_repo_list = facade.get_all_reviews()
-        reviews_list = [
-            {
-                "id": review.id,
-                "text": review.text,
-                "rating": review.rating
-            } for review in review_repo_list
-        ]
-
-        return reviews_list, 200
+        if wants_stream():
+            return streamed_response(facade.iter_reviews(columns=REVIEW_SUMMARY_COLUMNS), review_summary)
+
+        try:
+            limit, cursor = page_args()
+            review_repo_list, next_cursor = facade.get_reviews_page(limit, cursor, REVIEW_SUMMARY_COLUMNS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        reviews_list = [review_summary(review) for review in review_repo_list]
+
+        return paginated_response(reviews_list, next_cursor)
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.v1.listing import PAGE_PARAMS, page_args, paginated_response
+from app.api.v1.listing import streamed_response, wants_stream
 
 api = Namespace('users', description='User operations')
 
@@ -13,6 +15,28 @@ user_model = api.model('User', {
 })
 
 
+# Only these columns are loaded for the list endpoint
+USER_SUMMARY_COLUMNS = ("id", "first_name", "last_name", "email")
+
+
+def user_summary(user):
+    """
+    Serialize the fields of a user shown in the user list.
+
+    Args:
+        user (User|Row): The user (or projected row) to serialize.
+
+    Returns:
+        dict: The user's id, names and email.
+    """
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email
+    }
+
+
 # TODO validation for admin role assignment when creating users
 # I think ^ this is is taken care of by the expect, validate=True?
 @api.route('/')
@@ -50,29 +74,33 @@ class UserList(Resource):
             }, 201
 
     @api.response(200, "All users succesfully retrieved")
+    @api.response(400, 'Invalid pagination parameters')
+    @api.doc(params=PAGE_PARAMS)
     def get(self):
         """
-        Retrieve all users.
+        Retrieve one page of users.
 
-        This endpoint retrieves all users from the repository.
+        This endpoint retrieves users from the repository, one page at a
+        time, selected with the limit and cursor query parameters. With
+        ?stream=1 or Accept: application/x-ndjson every user is streamed
+        instead, one JSON object per line.
 
         Returns:
-            list: A list of dictionaries containing user details.
+            dict: The users of the page under items, and next_cursor.
             int: The HTTP status code.
         """
-        user_repo_list = facade.get_users_all()
-        user_list = []
-        for user in user_repo_list:
-            user_list.append(
-                {
-                    'id': user.id,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'email': user.email
-                }
-            )
-
-        return user_list, 200
+        if wants_stream():
+            return streamed_response(facade.iter_users(columns=USER_SUMMARY_COLUMNS), user_summary)
+
+        try:
+            limit, cursor = page_args()
+            user_repo_list, next_cursor = facade.get_users_page(limit, cursor, USER_SUMMARY_COLUMNS)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        user_list = [user_summary(user) for user in user_repo_list]
+
+        return paginated_response(user_list, next_cursor)
 
 
 @api.route('/<user_id>')
@@ -0,0 +1,95 @@
+"""
+Maintenance commands, run with the flask command, e.g. `flask search rebuild`.
+"""
+import time
+import click
+from flask.cli import AppGroup
+from app.persistence.engine import CHECKPOINT_MODES
+from app.services import facade
+
+
+search_cli = AppGroup("search", help="Maintain the search indexes of the places and users.")
+
+
+@search_cli.command("rebuild")
+def rebuild_search():
+    """
+    Create the search indexes if needed and rebuild them from the places
+    and users.
+    """
+    try:
+        places = facade.rebuild_place_search()
+        users = facade.rebuild_user_search()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Indexed {places} places and {users} users")
+
+
+ratings_cli = AppGroup("ratings", help="Maintain the review aggregates stored on the places.")
+
+
+@ratings_cli.command("reconcile")
+def reconcile_ratings():
+    """
+    Recompute the review count, rating sum and histogram of every place
+    from the reviews.
+    """
+    count = facade.reconcile_place_ratings()
+    click.echo(f"Corrected the review aggregates of {count} places")
+
+
+sqlite_cli = AppGroup("sqlite", help="Maintain the SQLite database.")
+
+
+@sqlite_cli.command("maintain")
+@click.option("--checkpoint", type=click.Choice(CHECKPOINT_MODES, case_sensitive=False),
+              default="TRUNCATE", show_default=True, help="Mode of the WAL checkpoint.")
+def maintain_sqlite(checkpoint):
+    """
+    Checkpoint the write-ahead log and run PRAGMA optimize.
+    """
+    try:
+        result = facade.maintain_sqlite(checkpoint)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if result["wal_pages"] < 0:
+        click.echo("Optimized; the database is not in WAL mode")
+    else:
+        state = "incomplete, the log is in use" if result["busy"] else "complete"
+        click.echo(f"Checkpointed {result['checkpointed_pages']} of {result['wal_pages']} "
+                   f"WAL pages ({state}) and optimized")
+
+
+replica_cli = AppGroup("replica", help="Maintain the SQLite read replica.")
+
+
+@replica_cli.command("sync")
+@click.option("--every", type=float, default=None,
+              help="Keep copying every this many seconds until interrupted.")
+def sync_replica(every):
+    """
+    Copy the primary database over the read replica.
+    """
+    while True:
+        started = time.perf_counter()
+        try:
+            facade.sync_replica()
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Copied the primary to the replica in {time.perf_counter() - started:.2f} s")
+        if every is None:
+            return
+        time.sleep(every)
+
+
+def init_app(app):
+    """
+    Register the maintenance commands on the application.
+
+    Args:
+        app (Flask): The application to register the commands on.
+    """
+    app.cli.add_command(search_cli)
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(sqlite_cli)
+    app.cli.add_command(replica_cli)
@@ -1,9 +1,10 @@
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app.persistence.routing import RoutingSession
 """This file contains all the extensions to run the Flask app"""
 
 
 bcrypt = Bcrypt()
 jwt = JWTManager()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
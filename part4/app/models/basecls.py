@@ -1,6 +1,7 @@
 from app.extensions import db
 import uuid
 from datetime import datetime
+from sqlalchemy.orm import declared_attr
 
 
 class BaseModel(db.Model):
@@ -18,6 +19,14 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @declared_attr
+    def __table_args__(cls):
+        """
+        Index every table on (created_at, id), the keyset used by
+        SQLAlchemyRepository.get_page.
+        """
+        return (db.Index(f"ix_{cls.__tablename__}_created_at_id", "created_at", "id"),)
+
     def __init__(self, **kwargs):
         """
         Initialize a new BaseModel instance with keyword arguments.
@@ -1,10 +1,29 @@
 from app.models.basecls import BaseModel
 from app.models.place_amenities import place_amenities
 from app.extensions import db
+from sqlalchemy import DDL, column, event, table
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import validates
 
 
+# The possible review ratings; Place keeps a review counter for each
+RATING_STARS = (1, 2, 3, 4, 5)
+
+
+def average_rating(rating_sum, review_count):
+    """
+    Compute an average rating from the stored review aggregates.
+
+    Args:
+        rating_sum (int): The sum of the ratings.
+        review_count (int): The number of reviews.
+
+    Returns:
+        float: The average rating, or None if there are no reviews.
+    """
+    return rating_sum / review_count if review_count else None
+
+
 class Place(BaseModel):
     """
     Place model class that inherits from BaseModel.
@@ -21,6 +40,9 @@ class Place(BaseModel):
         _latitude (float): Latitude coordinate of the place.
         _longitude (float): Longitude coordinate of the place.
         owner_id (str): Foreign key referencing the owner (User) of the place.
+        review_count (int): Number of reviews of the place.
+        rating_sum (int): Sum of the ratings of its reviews.
+        rating_count_1 .. rating_count_5 (int): Number of reviews per rating.
         reviews (list[Review]): One-to-many relationship; list of reviews for the place.
         amenities (list[Amenity]): Many-to-many relationship; list of amenity objects associated with the place.
     """
@@ -28,20 +50,34 @@ class Place(BaseModel):
 
     _title = db.Column("title", db.String(100), nullable=False)
     _description = db.Column("description", db.Text, nullable=False)
-    _price = db.Column("price", db.Float, nullable=False)
+    _price = db.Column("price", db.Float, nullable=False, index=True)
     _latitude = db.Column("latitude", db.Float, nullable=False)
     _longitude = db.Column("longitude", db.Float, nullable=False)
-    owner_id = db.Column("owner_id", db.String(36), db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column("owner_id", db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # Review aggregates, adjusted by the facade in the same transaction as
+    # every review write so the rating is read without loading the reviews.
+    # `flask ratings reconcile` recomputes them from the reviews table.
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_1 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_2 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_3 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_4 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count_5 = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Relationships are loaded lazily by default; callers that need them
+    # ask the repository to eager load them (see SQLAlchemyRepository.get).
 
     # One-to-many relationship with Review: each place can have multiple reviews.
-    reviews = db.relationship("Review", backref="place", lazy=True)
+    reviews = db.relationship("Review", backref="place", lazy="select")
 
     # Many-to-many relationship with Amenity via the association table.
     amenities = db.relationship(
         "Amenity",
         secondary=place_amenities,
-        lazy="subquery",
-        backref=db.backref("places", lazy=True)
+        lazy="select",
+        backref=db.backref("places", lazy="select")
     )
 
     @hybrid_property
@@ -255,3 +291,80 @@ class Place(BaseModel):
         if longitude < -180.0 or longitude > 180.0:
             raise ValueError("Place longitude must be range -180.0 to 180.0")
         return float(longitude)
+
+    @property
+    def average_rating(self):
+        """
+        Get the average rating of the place's reviews.
+
+        Returns:
+            float: The average rating, or None if the place has no reviews.
+        """
+        return average_rating(self.rating_sum, self.review_count)
+
+    @property
+    def rating_histogram(self):
+        """
+        Get the number of reviews of the place per rating.
+
+        Returns:
+            dict: Every rating from 1 to 5 mapped to its number of reviews.
+        """
+        return {star: getattr(self, f"rating_count_{star}") for star in RATING_STARS}
+
+
+# SQLite R*Tree index over the coordinates, keyed by the rowid of places.
+# Triggers keep it in sync so that set-based UPDATE and DELETE statements
+# are covered as well as ORM writes. VACUUM may renumber the rowids of
+# places: run upgrade_sqlite_indexes.py afterwards to rebuild the index.
+PLACES_RTREE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree"
+    " USING rtree(id, min_lon, max_lon, min_lat, max_lat)",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_insert AFTER INSERT ON places BEGIN"
+    " INSERT INTO places_rtree VALUES"
+    " (NEW.rowid, NEW.longitude, NEW.longitude, NEW.latitude, NEW.latitude); END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_update AFTER UPDATE OF latitude, longitude ON places BEGIN"
+    " UPDATE places_rtree SET min_lon = NEW.longitude, max_lon = NEW.longitude,"
+    " min_lat = NEW.latitude, max_lat = NEW.latitude WHERE id = NEW.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_delete AFTER DELETE ON places BEGIN"
+    " DELETE FROM places_rtree WHERE id = OLD.rowid; END",
+)
+
+for statement in PLACES_RTREE_DDL:
+    event.listen(Place.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Place.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS places_rtree").execute_if(dialect="sqlite"))
+
+# SQLite FTS5 index over the title and description, stored as an external
+# content table reading the text from places by rowid. Triggers keep it in
+# sync for the same reason as the R*Tree index; `flask search rebuild`
+# recreates it, e.g. for databases created before it existed or after a
+# VACUUM.
+PLACES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    "title, description, content='places', content_rowid='rowid',"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_insert AFTER INSERT ON places BEGIN"
+    " INSERT INTO places_fts(rowid, title, description)"
+    " VALUES (NEW.rowid, NEW.title, NEW.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_update AFTER UPDATE OF title, description ON places BEGIN"
+    " INSERT INTO places_fts(places_fts, rowid, title, description)"
+    " VALUES ('delete', OLD.rowid, OLD.title, OLD.description);"
+    " INSERT INTO places_fts(rowid, title, description)"
+    " VALUES (NEW.rowid, NEW.title, NEW.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_delete AFTER DELETE ON places BEGIN"
+    " INSERT INTO places_fts(places_fts, rowid, title, description)"
+    " VALUES ('delete', OLD.rowid, OLD.title, OLD.description); END",
+)
+
+for statement in PLACES_FTS_DDL:
+    event.listen(Place.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Place.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS places_fts").execute_if(dialect="sqlite"))
+
+places_rtree = table(
+    "places_rtree",
+    column("id"), column("min_lon"), column("max_lon"), column("min_lat"), column("max_lat")
+)
+
+places_fts = table("places_fts", column("rowid"), column("title"), column("description"))
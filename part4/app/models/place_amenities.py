@@ -14,5 +14,5 @@ from app.extensions import db
 place_amenities = db.Table(
     "place_amenities",
     Column("place_id", db.String(36), ForeignKey("places.id"), primary_key=True),
-    Column("amenity_id", db.String(36), ForeignKey("amenities.id"), primary_key=True)
+    Column("amenity_id", db.String(36), ForeignKey("amenities.id"), primary_key=True, index=True)
 )
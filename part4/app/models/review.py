@@ -22,7 +22,7 @@ class Review(BaseModel):
     _text = db.Column("text", db.Text, nullable=False)
     _rating = db.Column("rating", db.Integer, nullable=False)
     place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False, index=True)
 
     @hybrid_property
     def text(self):
@@ -107,3 +107,8 @@ class Review(BaseModel):
         if rating not in range(1, 6):
             raise ValueError("Rating outside of range (1-5)")
         return rating
+
+
+# A user reviews a place at most once. The index also serves lookups by
+# place_id alone, so place_id needs no index of its own.
+db.Index("uq_reviews_place_id_user_id", Review.place_id, Review.user_id, unique=True)
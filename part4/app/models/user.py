@@ -1,6 +1,7 @@
 from app.models.basecls import BaseModel
 from app.extensions import bcrypt, db
 from email_validator import validate_email
+from sqlalchemy import DDL, column, event, table
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import validates
 
@@ -18,8 +19,8 @@ class User(BaseModel):
     _last_name = db.Column("last_name", db.String(50), nullable=False)
     _email = db.Column("email", db.String(120), nullable=False, unique=True)
     _password = db.Column("password", db.String(128), nullable=False)
-    places = db.relationship("Place", backref='owner', lazy=True)
-    reviews = db.relationship("Review", backref="user", lazy=True)
+    places = db.relationship("Place", backref='owner', lazy="select")
+    reviews = db.relationship("Review", backref="user", lazy="select")
     _is_admin = db.Column("is_admin", db.Boolean, default=False)
 
     @hybrid_property
@@ -185,3 +186,36 @@ class User(BaseModel):
             bool: True if the user is an admin, False otherwise.
         """
         return self._is_admin
+
+
+# SQLite FTS5 trigram index over the names and email, stored as an external
+# content table reading the text from users by rowid. Every substring of at
+# least three characters is indexed, case-folded, so the admin search finds
+# "mit" in "Smith" without scanning the table. Triggers keep it in sync with
+# every write; `flask search rebuild` recreates it.
+USERS_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5("
+    "first_name, last_name, email, content='users', content_rowid='rowid',"
+    " tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_search_insert AFTER INSERT ON users BEGIN"
+    " INSERT INTO users_search(rowid, first_name, last_name, email)"
+    " VALUES (NEW.rowid, NEW.first_name, NEW.last_name, NEW.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_update"
+    " AFTER UPDATE OF first_name, last_name, email ON users BEGIN"
+    " INSERT INTO users_search(users_search, rowid, first_name, last_name, email)"
+    " VALUES ('delete', OLD.rowid, OLD.first_name, OLD.last_name, OLD.email);"
+    " INSERT INTO users_search(rowid, first_name, last_name, email)"
+    " VALUES (NEW.rowid, NEW.first_name, NEW.last_name, NEW.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_delete AFTER DELETE ON users BEGIN"
+    " INSERT INTO users_search(users_search, rowid, first_name, last_name, email)"
+    " VALUES ('delete', OLD.rowid, OLD.first_name, OLD.last_name, OLD.email); END",
+)
+
+for statement in USERS_SEARCH_DDL:
+    event.listen(User.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(User.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS users_search").execute_if(dialect="sqlite"))
+
+users_search = table(
+    "users_search", column("rowid"), column("first_name"), column("last_name"), column("email")
+)
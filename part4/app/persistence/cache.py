@@ -0,0 +1,352 @@
+"""
+Read-through entity cache placed in front of the SQLAlchemy repositories.
+
+The cache never holds live ORM instances: it keeps a snapshot of an
+object's column values and rebuilds a detached instance from it, which is
+then merged into the current session without a query. This keeps cached
+objects safe to share between requests and threads.
+"""
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.persistence.repository import in_unit_of_work, on_commit
+
+
+class EntityCache:
+    """
+    Bounded LRU cache of entity snapshots keyed by (model name, id), with a
+    time-to-live per model and hit/miss/eviction counters.
+
+    Each model has a version bumped by every invalidation of its entries. A
+    reader takes the version before querying the database and passes it to
+    put(), which drops the snapshot if an invalidation happened meanwhile:
+    the row may have been read before a write was committed.
+    """
+
+    def __init__(self, max_size=10000, default_ttl=60, model_ttls=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): The maximum number of entries kept.
+            default_ttl (float): Seconds an entry stays valid.
+            model_ttls (dict): Per-model overrides of default_ttl, keyed by
+                model class name.
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.model_ttls = dict(model_ttls or {})
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key):
+        """
+        Look up an entry and mark it as most recently used.
+
+        Args:
+            key (tuple): The (model name, id) key.
+
+        Returns:
+            dict: The cached column values, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return values
+
+    def version(self, model_name):
+        """
+        Return the invalidation version of a model.
+
+        Args:
+            model_name (str): The model class name.
+
+        Returns:
+            int: The version to pass to put().
+        """
+        with self._lock:
+            return self._versions.get(model_name, 0)
+
+    def put(self, key, values, version=None):
+        """
+        Store an entry, evicting the least recently used ones if full.
+
+        Args:
+            key (tuple): The (model name, id) key.
+            values (dict): The column values to cache.
+            version (int): The model's version taken before reading the
+                values; the entry is not stored if it has changed since.
+        """
+        ttl = self.model_ttls.get(key[0], self.default_ttl)
+        with self._lock:
+            if version is not None and version != self._versions.get(key[0], 0):
+                return
+            self._entries[key] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key):
+        """
+        Drop a single entry.
+
+        Args:
+            key (tuple): The (model name, id) key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._bump(key[0])
+
+    def invalidate_model(self, model_name):
+        """
+        Drop every entry of a model.
+
+        Args:
+            model_name (str): The model class name.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+            self._bump(model_name)
+
+    def _bump(self, model_name):
+        """
+        Increment the version of a model; the caller holds the lock.
+        """
+        self._versions[model_name] = self._versions.get(model_name, 0) + 1
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            for model_name in self._versions:
+                self._bump(model_name)
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self):
+        """
+        Return a snapshot of the counters.
+
+        Returns:
+            dict: hits, misses, evictions, expirations, size and hit_ratio.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+class CachedRepository:
+    """
+    Caching decorator around a SQLAlchemyRepository.
+
+    get() is served from the cache when possible; every write made through
+    the decorator invalidates the affected entries. Any other attribute,
+    such as the dedicated queries of UserRepository, is forwarded to the
+    wrapped repository untouched. With no cache attached the decorator is a
+    transparent pass-through.
+    """
+
+    def __init__(self, repository, cache=None):
+        """
+        Initialize the decorator.
+
+        Args:
+            repository (SQLAlchemyRepository): The repository to wrap.
+            cache (EntityCache): The cache to use, or None to disable caching.
+        """
+        self._repository = repository
+        self.cache = cache
+
+    def __getattr__(self, name):
+        """
+        Forward unknown attributes to the wrapped repository.
+        """
+        return getattr(self._repository, name)
+
+    def _key(self, obj_id):
+        """
+        Build the cache key of an object ID.
+        """
+        return (self._repository.model.__name__, obj_id)
+
+    def _invalidate(self, obj_ids=None):
+        """
+        Invalidate entries now and again once the writes are committed.
+
+        Bumping the model's version on commit also keeps a read that started
+        before the commit from caching the old row afterwards.
+
+        Args:
+            obj_ids (iterable): The IDs to invalidate, or None for every
+                entry of the model.
+        """
+        cache = self.cache
+        if cache is None:
+            return
+        model_name = self._repository.model.__name__
+
+        def invalidate():
+            if obj_ids is None:
+                cache.invalidate_model(model_name)
+            else:
+                for obj_id in obj_ids:
+                    cache.invalidate((model_name, obj_id))
+
+        invalidate()
+        if in_unit_of_work():
+            on_commit(invalidate)
+
+    def invalidate(self, obj_ids=None):
+        """
+        Invalidate entries after a write made through a dedicated method of
+        the wrapped repository, which the decorator does not intercept.
+
+        Args:
+            obj_ids (iterable): The IDs to invalidate, or None for every
+                entry of the model.
+        """
+        self._invalidate(None if obj_ids is None else list(obj_ids))
+
+    def get(self, obj_id, load=None):
+        """
+        Retrieve an object by its ID, from the cache when possible.
+
+        Calls asking for eager-loaded relationships bypass the cache since
+        only column values are cached. So do calls made inside a unit of
+        work or for an object already in the session, whose flushed or
+        pending values a cached snapshot would overwrite.
+
+        Args:
+            obj_id: The ID of the object to retrieve.
+            load: Relationships to load along with the object.
+
+        Returns:
+            The retrieved object, or None if not found.
+        """
+        if self.cache is None or load or in_unit_of_work() or self._in_session(obj_id):
+            return self._repository.get(obj_id, load)
+
+        key = self._key(obj_id)
+        values = self.cache.get(key)
+        if values is not None:
+            return self._rebuild(values)
+
+        version = self.cache.version(key[0])
+        obj = self._repository.get(obj_id)
+        if obj is not None and not db.session.is_modified(obj):
+            self.cache.put(key, self._snapshot(obj), version)
+        return obj
+
+    def _in_session(self, obj_id):
+        """
+        Tell whether the current session already holds the object.
+        """
+        mapper = sa_inspect(self._repository.model)
+        return mapper.identity_key_from_primary_key([obj_id]) in db.session.identity_map
+
+    def _snapshot(self, obj):
+        """
+        Copy the column values of an object.
+        """
+        mapper = sa_inspect(self._repository.model)
+        return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs}
+
+    def _rebuild(self, values):
+        """
+        Rebuild an instance from cached column values and attach it to the
+        current session without emitting a query.
+        """
+        model = self._repository.model
+        obj = sa_inspect(model).class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def add(self, obj):
+        """
+        Add an object and invalidate any stale entry for its ID.
+        """
+        self._repository.add(obj)
+        self._invalidate(self._ids([obj]))
+
+    def add_many(self, objs, chunk_size=500):
+        """
+        Add several objects and invalidate any stale entries for them.
+        """
+        objs = list(objs)
+        failures = self._repository.add_many(objs, chunk_size=chunk_size)
+        self._invalidate(self._ids(objs))
+        return failures
+
+    def _ids(self, objs):
+        """
+        Read the IDs of persisted objects from their identity keys, which
+        unlike obj.id does not refresh the objects expired by the commit.
+        Objects whose insert was rolled back have no identity and are
+        skipped.
+        """
+        if self.cache is None:
+            return []
+        identities = (sa_inspect(obj).identity for obj in objs)
+        return [identity[0] for identity in identities if identity is not None]
+
+    def update(self, obj_id, data):
+        """
+        Update an object and invalidate its entry.
+        """
+        try:
+            self._repository.update(obj_id, data)
+        finally:
+            self._invalidate([obj_id])
+
+    def update_where(self, filters, values):
+        """
+        Update every matching object and invalidate the model's entries.
+        """
+        try:
+            return self._repository.update_where(filters, values)
+        finally:
+            self._invalidate()
+
+    def delete(self, obj_id):
+        """
+        Delete an object and invalidate its entry.
+        """
+        try:
+            self._repository.delete(obj_id)
+        finally:
+            self._invalidate([obj_id])
+
+    def delete_many(self, obj_ids):
+        """
+        Delete several objects and invalidate their entries.
+        """
+        obj_ids = list(obj_ids)
+        try:
+            return self._repository.delete_many(obj_ids)
+        finally:
+            self._invalidate(obj_ids)
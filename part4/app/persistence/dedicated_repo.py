@@ -1,9 +1,72 @@
-from app.models.user import User
-from app.models.place import Place
+from app.models.user import User, USERS_SEARCH_DDL, users_search
+import re
+from collections import Counter
+from app.models.place import Place, PLACES_FTS_DDL, RATING_STARS, places_fts, places_rtree
 from app.models.review import Review
 from app.models.amenity import Amenity
 from app import db
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import GET_MANY_CHUNK_SIZE, SQLAlchemyRepository
+from app.persistence.repository import decode_rank_cursor, encode_rank_cursor
+from app.persistence.routing import pin_to_primary
+
+
+# BM25 weights of the place title and description in search results
+SEARCH_TITLE_WEIGHT = 5.0
+SEARCH_DESCRIPTION_WEIGHT = 1.0
+
+# A search term: a word, optionally followed by * for a prefix match
+SEARCH_TERM = re.compile(r"(\w+)(\*?)")
+
+
+def search_terms(query):
+    """
+    Split a search query into the terms every result must contain.
+
+    Operators and punctuation are ignored, so user input can never form an
+    invalid or unexpected FTS5 expression.
+
+    Args:
+        query (str): The search query, e.g. "beach hou*".
+
+    Returns:
+        list: (word, is_prefix) tuples.
+
+    Raises:
+        ValueError: If the query contains no word.
+    """
+    terms = [(word, bool(star)) for word, star in SEARCH_TERM.findall(query or "")]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms
+
+
+# BM25 weights of the first name, last name and email in user search results
+USER_SEARCH_WEIGHTS = (2.0, 2.0, 1.0)
+
+# The columns searched by the admin user search, in users_search order
+USER_SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+# The trigram index only matches substrings at least this long
+MIN_TRIGRAM_LENGTH = 3
+
+
+def contains_all(columns, words, fields):
+    """
+    Build ILIKE criteria requiring every word to appear in one of the fields.
+
+    Args:
+        columns: The column collection of the table to match.
+        words (list): The substrings to look for, matched literally.
+        fields (iterable): The names of the columns to look in.
+
+    Returns:
+        list: One criterion per word.
+    """
+    criteria = []
+    for word in words:
+        pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        criteria.append(db.or_(*(columns[field].ilike(pattern, escape="\\") for field in fields)))
+    return criteria
 
 
 class UserRepository(SQLAlchemyRepository):
@@ -65,6 +128,103 @@ class UserRepository(SQLAlchemyRepository):
         """
         return self.model.query.filter_by(_is_admin=False).all()
 
+    def _search(self, words, fields, limit=None, cursor=None, columns=None):
+        """
+        Find the users with every word somewhere in the given fields.
+
+        On SQLite the users_search trigram index selects the users matching
+        the words of three characters or more and ranks them by BM25; the
+        shorter words are then checked on those candidates only. Elsewhere,
+        or when every word is too short for the index, the words are matched
+        with ILIKE and the users come in ID order.
+
+        Args:
+            words (list): The substrings to look for, case-insensitively.
+            fields (tuple): The searched columns, among USER_SEARCH_FIELDS.
+            limit (int): The maximum number of users to return, or None for
+                all of them.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                User objects.
+
+        Returns:
+            tuple: The list of users (or rows) and the cursor of the next
+            page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        entities = [self.model] if columns is None else self._projection(columns, ("id",))
+        after = decode_rank_cursor(cursor) if cursor else None
+        indexed = [word for word in words if len(word) >= MIN_TRIGRAM_LENGTH]
+
+        if indexed and self._has_table("users_search"):
+            # Every phrase must occur as a substring; a column filter limits
+            # the phrases to the requested fields
+            expression = " ".join('"' + word.replace('"', '""') + '"' for word in indexed)
+            if tuple(fields) != USER_SEARCH_FIELDS:
+                expression = "{" + " ".join(fields) + "} : (" + expression + ")"
+            score = db.func.bm25(db.literal_column("users_search"), *USER_SEARCH_WEIGHTS)
+            key = users_search.c.rowid
+            ranked = db.select(key.label("key"), score.label("score")).where(
+                db.literal_column("users_search").match(expression),
+                *contains_all(users_search.c, [word for word in words if word not in indexed], fields)
+            )
+            if after:
+                ranked = ranked.where(db.or_(
+                    score > after[0], db.and_(score == after[0], key > after[1])
+                ))
+            ranked = ranked.order_by(score, key)
+            if limit is not None:
+                ranked = ranked.limit(limit + 1)
+            ranked = ranked.subquery()
+            statement = (
+                db.select(*entities, ranked.c.score, ranked.c.key)
+                .join(ranked, ranked.c.key == db.literal_column("users.rowid"))
+                .order_by(ranked.c.score, ranked.c.key)
+            )
+        else:
+            statement = db.select(
+                *entities, db.literal(0.0).label("score"), self.model.id.label("key")
+            ).where(*contains_all(self.model.__table__.c, words, fields))
+            if after:
+                statement = statement.where(self.model.id > after[1])
+            statement = statement.order_by(self.model.id)
+            if limit is not None:
+                statement = statement.limit(limit + 1)
+        rows = db.session.execute(statement).all()
+
+        items = [row[0] for row in rows] if columns is None else rows
+        if limit is None or len(items) <= limit:
+            return items, None
+        last = rows[limit - 1]
+        return items[:limit], encode_rank_cursor(last.score, last.key)
+
+    def search_users(self, query, limit, cursor=None, columns=None):
+        """
+        Retrieve one page of the users whose first name, last name or email
+        contain every word of a search query, best matches first.
+
+        Args:
+            query (str): Whitespace-separated substrings to look for,
+                case-insensitively, e.g. "smi @example".
+            limit (int): The maximum number of users to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                User objects.
+
+        Returns:
+            tuple: The list of users (or rows) and the cursor of the next
+            page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the query is blank or the cursor is malformed.
+        """
+        words = (query or "").split()
+        if not words:
+            raise ValueError("q must not be blank")
+        return self._search(words, USER_SEARCH_FIELDS, limit, cursor, columns)
+
     def search_users_by_name(self, name_substring):
         """
         Search for users whose first or last name contains the provided substring (case-insensitive).
@@ -73,14 +233,32 @@ class UserRepository(SQLAlchemyRepository):
             name_substring (str): The substring to search for.
         
         Returns:
-            list: A list of User objects matching the search criteria.
+            list: A list of User objects matching the search criteria, best
+            matches first.
         """
-        return self.model.query.filter(
-            db.or_(
-                self.model._first_name.ilike(f"%{name_substring}%"),
-                self.model._last_name.ilike(f"%{name_substring}%")
-            )
-        ).all()
+        users, _ = self._search([name_substring], ("first_name", "last_name"))
+        return users
+
+    def rebuild_search_index(self):
+        """
+        Create the users_search index and its triggers if they are missing,
+        then rebuild it from the users table.
+
+        Returns:
+            int: The number of users indexed.
+
+        Raises:
+            ValueError: If the database is not SQLite.
+        """
+        connection = db.session.connection()
+        if connection.engine.dialect.name != "sqlite":
+            raise ValueError("The user search index is only available on SQLite")
+        for statement in USERS_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO users_search(users_search) VALUES ('rebuild')")
+        self._commit()
+        self._tables.pop((connection.engine, "users_search"), None)
+        return self.model.query.count()
 
 
 class PlaceRepository(SQLAlchemyRepository):
@@ -96,6 +274,142 @@ class PlaceRepository(SQLAlchemyRepository):
         """
         super().__init__(Place)
 
+    def _bbox_criteria(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Build the SQL criteria selecting the places inside a bounding box.
+
+        The coordinate range predicates alone work on every database. On
+        SQLite the R*Tree index selects the candidate rows first; it stores
+        rounded coordinates, so the range predicates still apply exactly.
+
+        Args:
+            min_lon (float): The western edge of the box.
+            min_lat (float): The southern edge of the box.
+            max_lon (float): The eastern edge of the box.
+            max_lat (float): The northern edge of the box.
+
+        Returns:
+            list: The criteria, edges included.
+        """
+        criteria = [
+            self.model.longitude.between(min_lon, max_lon),
+            self.model.latitude.between(min_lat, max_lat)
+        ]
+        if self._has_table("places_rtree"):
+            candidates = db.select(places_rtree.c.id).where(
+                places_rtree.c.min_lon <= max_lon, places_rtree.c.max_lon >= min_lon,
+                places_rtree.c.min_lat <= max_lat, places_rtree.c.max_lat >= min_lat
+            )
+            criteria.insert(0, db.literal_column("places.rowid").in_(candidates))
+        return criteria
+
+    def get_places_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Retrieve all places inside a bounding box, edges included.
+
+        Args:
+            min_lon (float): The western edge of the box.
+            min_lat (float): The southern edge of the box.
+            max_lon (float): The eastern edge of the box.
+            max_lat (float): The northern edge of the box.
+
+        Returns:
+            list: A list of Place objects located in the box.
+        """
+        return self.model.query.filter(
+            *self._bbox_criteria(min_lon, min_lat, max_lon, max_lat)
+        ).all()
+
+    def search_places(self, query, limit, cursor=None, columns=None):
+        """
+        Retrieve one page of the places whose title or description contains
+        every term of a search query, best matches first.
+
+        On SQLite the places_fts index answers the query and ranks the
+        places by BM25, titles weighing more than descriptions. Elsewhere
+        every term is matched with ILIKE over both columns and the places
+        come in ID order.
+
+        Args:
+            query (str): The search terms; a term ending with * matches
+                every word starting with it.
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                Place objects.
+
+        Returns:
+            tuple: The list of places (or rows) and the cursor of the next
+            page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the query has no term or the cursor is malformed.
+        """
+        terms = search_terms(query)
+        entities = [self.model] if columns is None else self._projection(columns, ("id",))
+        after = decode_rank_cursor(cursor) if cursor else None
+
+        if self._has_table("places_fts"):
+            # Rank and cut the page inside the index, ties broken by rowid,
+            # so only the places of the page are read from the table
+            expression = " ".join(f'"{word}"' + ("*" if prefix else "") for word, prefix in terms)
+            score = db.func.bm25(db.literal_column("places_fts"),
+                                 SEARCH_TITLE_WEIGHT, SEARCH_DESCRIPTION_WEIGHT)
+            key = places_fts.c.rowid
+            ranked = db.select(key.label("key"), score.label("score")).where(
+                db.literal_column("places_fts").match(expression)
+            )
+            if after:
+                ranked = ranked.where(db.or_(
+                    score > after[0], db.and_(score == after[0], key > after[1])
+                ))
+            ranked = ranked.order_by(score, key).limit(limit + 1).subquery()
+            statement = (
+                db.select(*entities, ranked.c.score, ranked.c.key)
+                .join(ranked, ranked.c.key == db.literal_column("places.rowid"))
+                .order_by(ranked.c.score, ranked.c.key)
+            )
+        else:
+            statement = db.select(*entities, db.literal(0.0).label("score"),
+                                  self.model.id.label("key"))
+            for word, prefix in terms:
+                pattern = "%" + word.replace("_", "\\_") + "%"
+                statement = statement.where(db.or_(
+                    self.model.title.ilike(pattern, escape="\\"),
+                    self.model.description.ilike(pattern, escape="\\")
+                ))
+            if after:
+                statement = statement.where(self.model.id > after[1])
+            statement = statement.order_by(self.model.id).limit(limit + 1)
+        rows = db.session.execute(statement).all()
+
+        items = [row[0] for row in rows] if columns is None else rows
+        if len(items) <= limit:
+            return items, None
+        last = rows[limit - 1]
+        return items[:limit], encode_rank_cursor(last.score, last.key)
+
+    def rebuild_search_index(self):
+        """
+        Create the places_fts index and its triggers if they are missing,
+        then rebuild it from the places table.
+
+        Returns:
+            int: The number of places indexed.
+
+        Raises:
+            ValueError: If the database is not SQLite.
+        """
+        connection = db.session.connection()
+        if connection.engine.dialect.name != "sqlite":
+            raise ValueError("The full-text search index is only available on SQLite")
+        for statement in PLACES_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO places_fts(places_fts) VALUES ('rebuild')")
+        self._commit()
+        self._tables.pop((connection.engine, "places_fts"), None)
+        return self.model.query.count()
+
     def get_places_by_owner(self, owner_id):
         """
         Retrieve all places owned by a specific user.
@@ -139,6 +453,217 @@ class PlaceRepository(SQLAlchemyRepository):
         ).all()
 
 
+    def _filter_criteria(self, min_price=None, max_price=None, bbox=None, min_rating=None):
+        """
+        Build the SQL criteria of the place list filters.
+
+        Args:
+            min_price (float): The minimum price, inclusive.
+            max_price (float): The maximum price, inclusive.
+            bbox (tuple): A (min_lon, min_lat, max_lon, max_lat) box the
+                places must lie in, edges included.
+            min_rating (float): The minimum average rating of the places.
+
+        Returns:
+            list: The criteria to pass to get_page.
+        """
+        criteria = []
+        if min_price is not None:
+            criteria.append(self.model.price >= min_price)
+        if max_price is not None:
+            criteria.append(self.model.price <= max_price)
+        if bbox is not None:
+            criteria.extend(self._bbox_criteria(*bbox))
+        if min_rating is not None:
+            criteria.append(self.model.review_count > 0)
+            criteria.append(self.model.rating_sum >= min_rating * self.model.review_count)
+        return criteria
+
+    def get_filtered_page(self, limit, cursor=None, columns=None, **filters):
+        """
+        Retrieve one page of the places matching the list filters.
+
+        Args:
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                Place objects.
+            **filters: min_price, max_price, bbox and min_rating, see
+                _filter_criteria.
+
+        Returns:
+            tuple: The list of places (or rows) and the next page cursor.
+        """
+        return self.get_page(limit, cursor, columns, where=self._filter_criteria(**filters))
+
+    def iter_coordinates(self, batch_size=10000):
+        """
+        Stream the coordinates of every place, for NearbyIndex. They are
+        read from the primary database, whose commits keep the index up to
+        date from then on.
+
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
+
+        Yields:
+            tuple: (id, latitude, longitude) rows.
+        """
+        statement = db.select(
+            self.model.id, self.model._latitude, self.model._longitude
+        ).execution_options(yield_per=batch_size)
+        pin_to_primary(db.session)
+        for row in db.session.execute(statement):
+            yield tuple(row)
+
+    def iter_catalog_rows(self, batch_size=10000):
+        """
+        Stream the columns of every place that PlaceCatalog filters on,
+        from the primary database like iter_coordinates.
+
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
+
+        Yields:
+            tuple: (id, created_at, price, latitude, longitude, review_count,
+            rating_sum) rows ordered by (created_at, id).
+        """
+        statement = (
+            db.select(
+                self.model.id, self.model.created_at, self.model._price,
+                self.model._latitude, self.model._longitude,
+                self.model.review_count, self.model.rating_sum
+            )
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        pin_to_primary(db.session)
+        for row in db.session.execute(statement):
+            yield tuple(row)
+
+    def get_rating_totals(self, place_ids):
+        """
+        Retrieve the stored review count and rating sum of places.
+
+        Args:
+            place_ids (iterable): The IDs of the places.
+
+        Returns:
+            list: (id, review_count, rating_sum) tuples of the places found.
+        """
+        place_ids = list(place_ids)
+        rows = []
+        for start in range(0, len(place_ids), GET_MANY_CHUNK_SIZE):
+            statement = db.select(
+                self.model.id, self.model.review_count, self.model.rating_sum
+            ).where(self.model.id.in_(place_ids[start:start + GET_MANY_CHUNK_SIZE]))
+            rows.extend(tuple(row) for row in db.session.execute(statement))
+        return rows
+
+    def get_all_with_ratings(self):
+        """
+        Retrieve every place along with its average rating and number of
+        reviews, read from the stored aggregates in the same query.
+
+        Returns:
+            list: (Place, average_rating, review_count) rows; the average
+            is None for places without reviews.
+        """
+        average = db.case(
+            (self.model.review_count > 0, self.model.rating_sum * 1.0 / self.model.review_count),
+            else_=None
+        )
+        statement = db.select(self.model, average.label("average_rating"), self.model.review_count)
+        return db.session.execute(statement).all()
+
+    def add_ratings(self, place_id, added=(), removed=()):
+        """
+        Adjust the review aggregates of a place with a single UPDATE, so
+        concurrent review writes never lose an increment.
+
+        Args:
+            place_id (str): The ID of the reviewed place.
+            added (iterable): The ratings of the reviews added to the place.
+            removed (iterable): The ratings of the reviews removed from it.
+        """
+        stars = Counter(added)
+        stars.subtract(removed)
+        deltas = {getattr(self.model, f"rating_count_{star}"): delta
+                  for star, delta in stars.items() if delta}
+        if not deltas:
+            return
+        deltas[self.model.review_count] = sum(deltas.values())
+        deltas[self.model.rating_sum] = sum(star * delta for star, delta in stars.items())
+        db.session.execute(
+            db.update(self.model)
+            .where(self.model.id == place_id)
+            .values({column: column + delta for column, delta in deltas.items() if delta})
+            .execution_options(synchronize_session=False)
+        )
+        self._commit(set_based=True)
+
+    def reconcile_ratings(self, place_ids=None):
+        """
+        Recompute the review aggregates of places from the reviews table,
+        with one GROUP BY over the reviews.
+
+        Args:
+            place_ids (iterable): The IDs of the places to recompute, or None
+                for every place.
+
+        Returns:
+            int: The number of places whose stored aggregates were wrong.
+        """
+        if place_ids is None:
+            return self._reconcile_ratings(None)
+        place_ids = list(set(place_ids))
+        return sum(
+            self._reconcile_ratings(place_ids[start:start + GET_MANY_CHUNK_SIZE])
+            for start in range(0, len(place_ids), GET_MANY_CHUNK_SIZE)
+        )
+
+    def _reconcile_ratings(self, place_ids):
+        """
+        Recompute the review aggregates of a chunk of places, or of every
+        place if place_ids is None.
+
+        Returns:
+            int: The number of places corrected.
+        """
+        columns = [self.model.review_count, self.model.rating_sum] + [
+            getattr(self.model, f"rating_count_{star}") for star in RATING_STARS
+        ]
+        totals = db.select(
+            Review.place_id,
+            db.func.count().label("review_count"),
+            db.func.sum(Review._rating).label("rating_sum"),
+            *(db.func.sum(db.case((Review._rating == star, 1), else_=0)).label(f"rating_count_{star}")
+              for star in RATING_STARS)
+        ).group_by(Review.place_id)
+        unreviewed = ~db.exists().where(Review.place_id == self.model.id)
+        stale = [db.or_(*(column != 0 for column in columns))]
+        if place_ids is not None:
+            totals = totals.where(Review.place_id.in_(place_ids))
+            stale.append(self.model.id.in_(place_ids))
+        totals = totals.subquery()
+
+        # Only rows whose values differ are written, and counted
+        corrected = db.session.execute(
+            db.update(self.model)
+            .where(self.model.id == totals.c.place_id)
+            .where(db.or_(*(column != totals.c[column.key] for column in columns)))
+            .values({column: totals.c[column.key] for column in columns})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        corrected += db.session.execute(
+            db.update(self.model)
+            .where(unreviewed, *stale)
+            .values({column: 0 for column in columns})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self._commit(set_based=True)
+        return corrected
+
+
 class AmenityRepository(SQLAlchemyRepository):
     """
     SQLAlchemy repository dedicated to the Amenity model.
@@ -187,6 +712,20 @@ class ReviewRepository(SQLAlchemyRepository):
         """
         super().__init__(Review)
     
+    def get_place_ids_where(self, filters):
+        """
+        Retrieve the IDs of the places reviewed by the matching reviews.
+
+        Args:
+            filters (dict): Attribute names mapped to the required value(s),
+                as for update_where.
+
+        Returns:
+            set: The distinct place IDs.
+        """
+        statement = db.select(self.model.place_id).where(*self._criteria(filters)).distinct()
+        return set(db.session.scalars(statement))
+
     def get_reviews_by_place_id(self, place_id):
         """
         Retrieve all reviews associated with a given place.
@@ -210,3 +749,16 @@ class ReviewRepository(SQLAlchemyRepository):
             list: A list of Review objects associated with the specified user.
         """
         return self.model.query.filter_by(user_id=user_id).all()
+
+    def get_review_by_place_and_user(self, place_id, user_id):
+        """
+        Retrieve the review a user wrote for a place.
+
+        Args:
+            place_id (str): The unique identifier of the place.
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            Review: The review if found, otherwise None.
+        """
+        return self.model.query.filter_by(place_id=place_id, user_id=user_id).first()
@@ -0,0 +1,419 @@
+"""
+Database engine instrumentation and tuning: a connection pool that measures
+how long requests wait to check out a connection, and, for SQLite, a
+statement timeout, per-connection PRAGMAs and a periodic maintenance task.
+
+The pool tuning itself (size, overflow, recycle, pre-ping) and the SQLite
+PRAGMAs come from the configuration profiles in config.py.
+"""
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Number of recent checkout waits kept for the percentiles
+WAIT_SAMPLES = 1024
+
+# Key of the pool record info holding the running statement's deadline
+STATEMENT_DEADLINE = "statement_deadline"
+
+# SQLite virtual machine instructions between two deadline checks
+PROGRESS_INSTRUCTIONS = 10000
+
+# Modes of PRAGMA wal_checkpoint, from the least to the most blocking
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters of the checkouts of a connection pool.
+    """
+    def __init__(self):
+        """
+        Initialize the counters at zero.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Set the counters back to zero, e.g. between two benchmark runs.
+        """
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.saturated_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_in_use = 0
+
+    def record_checkout(self, wait, in_use, saturated):
+        """
+        Account for a connection handed out by the pool.
+
+        Args:
+            wait (float): The seconds spent waiting for the connection.
+            in_use (int): The number of connections checked out, this one
+                included.
+            saturated (bool): Whether every connection the pool may open was
+                already in use when the checkout started.
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.saturated_checkouts += saturated
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self._waits.append(wait)
+
+    def record_timeout(self, wait):
+        """
+        Account for a checkout that gave up after the pool timeout.
+
+        Args:
+            wait (float): The seconds spent waiting.
+        """
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self._waits.append(wait)
+
+    def snapshot(self):
+        """
+        Return a copy of the counters.
+
+        Returns:
+            dict: The counters, with the wait times in milliseconds and the
+            p50/p99 of the last WAIT_SAMPLES checkouts.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "checkouts": self.checkouts,
+                "saturated_checkouts": self.saturated_checkouts,
+                "timeouts": self.timeouts,
+                "peak_in_use": self.peak_in_use,
+                "wait_ms_total": self.wait_seconds_total * 1e3,
+                "wait_ms_max": self.wait_seconds_max * 1e3,
+            }
+        stats["wait_ms_p50"] = waits[len(waits) // 2] * 1e3 if waits else 0.0
+        stats["wait_ms_p99"] = waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1e3 if waits else 0.0
+        return stats
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool recording the wait and saturation of every checkout in a
+    PoolMetrics instance, kept across pool re-creation.
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the pool as a QueuePool, with empty metrics.
+        """
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._checkout = threading.local()
+
+    def capacity(self):
+        """
+        Count the connections the pool may have open at once.
+
+        Returns:
+            int: pool_size plus max_overflow, or None if unbounded.
+        """
+        if self._max_overflow < 0 or self.size() == 0:
+            return None
+        return self.size() + self._max_overflow
+
+    def _do_get(self):
+        """
+        Check out a connection, timing the wait.
+
+        QueuePool._do_get retries by calling itself, so only the outermost
+        call of a thread is measured.
+        """
+        if getattr(self._checkout, "active", False):
+            return super()._do_get()
+        self._checkout.active = True
+        try:
+            return self._timed_get()
+        finally:
+            self._checkout.active = False
+
+    def _timed_get(self):
+        """
+        Run QueuePool._do_get, recording its wait in the metrics.
+        """
+        capacity = self.capacity()
+        saturated = capacity is not None and self.checkedout() >= capacity
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.checkedout(), saturated)
+        return record
+
+    def recreate(self):
+        """
+        Re-create the pool, e.g. on engine.dispose(), keeping the metrics.
+        """
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self):
+        """
+        Describe the current state of the pool along with its metrics.
+
+        Returns:
+            dict: The pool size, capacity, connections in use and idle,
+            saturation (in use / capacity), its peak and the PoolMetrics
+            counters.
+        """
+        capacity = self.capacity()
+        in_use = self.checkedout()
+        stats = {
+            "pool_size": self.size(),
+            "capacity": capacity,
+            "in_use": in_use,
+            "idle": self.checkedin(),
+            "saturation": in_use / capacity if capacity else None,
+        }
+        stats.update(self.metrics.snapshot())
+        stats["peak_saturation"] = stats["peak_in_use"] / capacity if capacity else None
+        return stats
+
+
+def metered_engine_options(options):
+    """
+    Add the metered pool class to engine options that tune a QueuePool.
+
+    Options without a pool_size keep the dialect's default pool, e.g. the
+    single-connection pool of in-memory SQLite databases.
+
+    Args:
+        options (dict): The SQLALCHEMY_ENGINE_OPTIONS of the configuration.
+
+    Returns:
+        dict: A copy of the options.
+    """
+    options = dict(options)
+    if "pool_size" in options:
+        options.setdefault("poolclass", MeteredQueuePool)
+    return options
+
+
+def pool_stats(engine):
+    """
+    Describe the connection pool of an engine.
+
+    Args:
+        engine (Engine): The engine.
+
+    Returns:
+        dict: The MeteredQueuePool statistics, or None if the engine uses
+        another pool class.
+    """
+    pool = engine.pool
+    return pool.stats() if isinstance(pool, MeteredQueuePool) else None
+
+
+def install_sqlite_statement_timeout(engine, timeout_ms):
+    """
+    Abort SQLite statements running longer than a timeout.
+
+    A progress handler checks the deadline of the running statement every
+    PROGRESS_INSTRUCTIONS instructions; SQLite then fails the statement with
+    "interrupted". The deadline covers executing the statement up to its
+    first row, and is cleared once the cursor returns so that a later
+    COMMIT is never interrupted.
+
+    Args:
+        engine (Engine): A SQLite engine.
+        timeout_ms (int): The timeout in milliseconds.
+    """
+    timeout = timeout_ms / 1e3
+
+    @event.listens_for(engine, "connect")
+    def set_progress_handler(dbapi_connection, connection_record):
+        info = connection_record.info
+
+        def past_deadline():
+            deadline = info.get(STATEMENT_DEADLINE)
+            return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+        dbapi_connection.set_progress_handler(past_deadline, PROGRESS_INSTRUCTIONS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_deadline(conn, cursor, statement, parameters, context, executemany):
+        conn.info[STATEMENT_DEADLINE] = time.monotonic() + timeout
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def clear_deadline(conn, *args):
+        conn.info.pop(STATEMENT_DEADLINE, None)
+
+    @event.listens_for(engine, "handle_error")
+    def clear_failed_deadline(context):
+        if context.connection is not None:
+            context.connection.info.pop(STATEMENT_DEADLINE, None)
+
+
+def copy_sqlite_database(source_engine, target_engine):
+    """
+    Copy a SQLite database over another with the online backup API, e.g. to
+    refresh a local read replica. The copy is a consistent snapshot of the
+    source, which stays readable and writable meanwhile; connections to the
+    target see the new content from their next statement.
+
+    Args:
+        source_engine (Engine): The engine of the database to copy.
+        target_engine (Engine): The engine of the database to overwrite.
+    """
+    source = source_engine.raw_connection()
+    try:
+        target = target_engine.raw_connection()
+        try:
+            source.driver_connection.backup(target.driver_connection)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """
+    Apply PRAGMAs to every connection the engine opens.
+
+    Args:
+        engine (Engine): A SQLite engine.
+        pragmas (dict): PRAGMA names mapped to their values, applied in
+            order, such as config.SQLITE_PERFORMANCE_PRAGMAS.
+    """
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+class SQLiteMaintenance:
+    """
+    Housekeeping of a SQLite database in write-ahead log mode.
+
+    Each run checkpoints the WAL, copying the committed pages back into the
+    database file so that the log stops growing, and runs PRAGMA optimize,
+    which refreshes the query planner statistics of the tables whose size
+    changed. start() repeats it from a daemon thread.
+    """
+    def __init__(self, engine, interval):
+        """
+        Initialize the task.
+
+        Args:
+            engine (Engine): A SQLite engine.
+            interval (float): The seconds between two background runs.
+        """
+        self.engine = engine
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats = {"runs": 0, "failures": 0, "last_run_at": None, "last_error": None,
+                       "last_checkpoint": None}
+
+    def run(self, checkpoint_mode="PASSIVE"):
+        """
+        Checkpoint the WAL and run PRAGMA optimize once.
+
+        The statements run on a raw driver connection, outside the statement
+        timeout, which must not cut a checkpoint short.
+
+        Args:
+            checkpoint_mode (str): One of CHECKPOINT_MODES. PASSIVE never
+                waits for readers or writers; TRUNCATE also empties the log
+                file, waiting for the connections using it.
+
+        Returns:
+            dict: busy (whether the checkpoint could not complete),
+            wal_pages and checkpointed_pages, both -1 outside WAL mode.
+
+        Raises:
+            ValueError: If the checkpoint mode is unknown.
+        """
+        checkpoint_mode = checkpoint_mode.upper()
+        if checkpoint_mode not in CHECKPOINT_MODES:
+            raise ValueError(f"checkpoint_mode must be one of {', '.join(CHECKPOINT_MODES)}")
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            busy, wal_pages, checkpointed = cursor.execute(
+                f"PRAGMA wal_checkpoint({checkpoint_mode})"
+            ).fetchone()
+            cursor.execute("PRAGMA optimize")
+            cursor.close()
+            connection.commit()
+        finally:
+            connection.close()
+
+        checkpoint = {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["last_run_at"] = time.time()
+            self._stats["last_checkpoint"] = checkpoint
+        return checkpoint
+
+    def _loop(self):
+        """
+        Run the maintenance every interval until stop() is called.
+        """
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run()
+            except self.engine.dialect.dbapi.Error as e:
+                with self._lock:
+                    self._stats["failures"] += 1
+                    self._stats["last_error"] = str(e)
+
+    def start(self):
+        """
+        Start the background runs.
+
+        Returns:
+            SQLiteMaintenance: self.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="sqlite-maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the background runs, waiting for a running one to finish.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        """
+        Return a snapshot of the counters.
+
+        Returns:
+            dict: runs, failures, the time and result of the last run and
+            the last error message.
+        """
+        with self._lock:
+            return dict(self._stats)
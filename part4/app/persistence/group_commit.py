@@ -0,0 +1,226 @@
+"""
+Group commit: a single writer thread running the writes of the request
+threads, several per transaction.
+
+SQLite lets one connection write at a time and every commit pays for the
+file lock and an fsync. Handing the writes to one thread removes the lock
+contention between request threads, and committing together the writes
+queued while the previous batch was being written pays the fsync once per
+batch instead of once per write.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from app.extensions import db
+from app.persistence.repository import savepoint, unit_of_work
+
+
+# Queue item telling the writer thread to exit
+_STOP = object()
+
+
+class _Write:
+    """
+    A queued write: the function to run and the future of its result.
+    """
+    __slots__ = ("function", "args", "kwargs", "future")
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class GroupCommitWriter:
+    """
+    Background writer committing the queued writes in batches.
+
+    Each write runs in its own savepoint of the batch transaction, so a
+    write raising an exception is rolled back alone and its caller gets the
+    exception. The futures resolve once the batch is committed; if the
+    commit itself fails, every write of the batch fails with its error.
+    """
+    def __init__(self, app, window_ms=2, max_batch=64):
+        """
+        Initialize the writer.
+
+        Args:
+            app (Flask): The application whose database the writes use.
+            window_ms (float): How long the writer waits for more writes
+                after the first one of a batch, 0 to only take the writes
+                already queued.
+            max_batch (int): The most writes committed together.
+
+        Raises:
+            ValueError: If window_ms is negative or max_batch is not a
+                positive integer.
+        """
+        if window_ms < 0:
+            raise ValueError("window_ms must not be negative")
+        if not isinstance(max_batch, int) or max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        self.app = app
+        self.window = window_ms / 1e3
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._stats = {"batches": 0, "writes": 0, "failed_writes": 0, "failed_batches": 0,
+                       "max_batch_size": 0, "commit_ms_total": 0.0}
+
+    def start(self):
+        """
+        Start the writer thread.
+
+        Returns:
+            GroupCommitWriter: self.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="group-commit", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the writer thread once the writes already queued are committed.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def in_writer(self):
+        """
+        Tell whether the calling thread is the writer thread, whose writes
+        must run directly rather than be queued behind themselves.
+
+        Returns:
+            bool: True on the writer thread.
+        """
+        return threading.current_thread() is self._thread
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a write.
+
+        Args:
+            function (callable): The write, run on the writer thread inside
+                the batch's unit of work.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            Future: Resolves to the function's return value, detached from
+            the writer's session, once the batch is committed.
+
+        Raises:
+            RuntimeError: If the writer is stopped.
+        """
+        write = _Write(function, args, kwargs)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("The group commit writer is stopped")
+            self._queue.put(write)
+        return write.future
+
+    def _loop(self):
+        """
+        Collect and commit batches until stop() is called.
+        """
+        while True:
+            write = self._queue.get()
+            if write is _STOP:
+                return
+            batch = [write]
+            stopping = False
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    write = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if write is _STOP:
+                    stopping = True
+                    break
+                batch.append(write)
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch):
+        """
+        Run a batch of writes in one transaction, then resolve their futures.
+
+        Args:
+            batch (list): The _Write items.
+        """
+        batch = [write for write in batch if write.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        outcomes = []
+        error = None
+        started = time.perf_counter()
+        with self.app.app_context():
+            # The results are handed to other threads once the session is
+            # closed, so they keep the values loaded when committed
+            db.session().expire_on_commit = False
+            try:
+                with unit_of_work():
+                    if db.engine.dialect.name == "sqlite":
+                        # The driver only opens a transaction before DML, so
+                        # the first savepoint would otherwise commit on release
+                        db.session.execute(db.text("BEGIN IMMEDIATE"))
+                    for write in batch:
+                        try:
+                            with savepoint():
+                                outcomes.append((write.function(*write.args, **write.kwargs), None))
+                        except Exception as e:
+                            outcomes.append((None, e))
+            except Exception as e:
+                error = e
+            finally:
+                db.session.remove()
+        elapsed = time.perf_counter() - started
+
+        failed = 0
+        for index, write in enumerate(batch):
+            if error is not None:
+                write.future.set_exception(error)
+                failed += 1
+                continue
+            result, write_error = outcomes[index]
+            if write_error is not None:
+                write.future.set_exception(write_error)
+                failed += 1
+            else:
+                write.future.set_result(result)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["writes"] += len(batch)
+            self._stats["failed_writes"] += failed
+            self._stats["failed_batches"] += error is not None
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+            self._stats["commit_ms_total"] += elapsed * 1e3
+
+    def stats(self):
+        """
+        Return a snapshot of the counters.
+
+        Returns:
+            dict: batches, writes, failed_writes, failed_batches,
+            max_batch_size, mean_batch_size and the mean milliseconds spent
+            running and committing a batch.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        stats["mean_batch_size"] = stats["writes"] / batches if batches else 0.0
+        stats["mean_batch_ms"] = stats.pop("commit_ms_total") / batches if batches else 0.0
+        return stats
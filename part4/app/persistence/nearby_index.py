@@ -0,0 +1,281 @@
+"""
+In-memory grid index answering "the k places closest to a point".
+
+Places are bucketed into cells of a fixed size in degrees, like a geohash
+prefix. A query computes great-circle distances for the places of the
+cells in rings of growing radius around the query point, and stops once
+the closest place outside the rings is provably farther than the k-th
+place found. Coordinates live in NumPy arrays so every ring costs one
+vectorized haversine.
+"""
+import math
+from threading import Lock
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Compute great-circle distances between points given in radians.
+
+    Args:
+        lat1, lon1: The latitude and longitude of the first point(s).
+        lat2, lon2: The latitude and longitude of the second point(s).
+
+    Returns:
+        The distances in kilometres, as a float or an array.
+    """
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class NearbyIndex:
+    """
+    Grid index over the coordinates of every place.
+
+    Rows of the coordinate arrays are recycled through a free list when
+    places are deleted, and each cell holds the list of its rows. A single
+    lock serializes writes and queries.
+    """
+    def __init__(self, loader, cell_degrees=1.0, capacity=1024):
+        """
+        Initialize an empty index, loaded on first use or by load().
+
+        Args:
+            loader (callable): A function returning an iterable of
+                (id, latitude, longitude) rows.
+            cell_degrees (float): The side of a grid cell in degrees.
+            capacity (int): The initial number of rows allocated.
+        """
+        self._loader = loader
+        self._cell = cell_degrees
+        self._grid_rows = math.ceil(180.0 / cell_degrees)
+        self._grid_cols = math.ceil(360.0 / cell_degrees)
+        self._lock = Lock()
+        self._loaded = False
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        Replace the content with empty arrays of the given capacity.
+        """
+        self._ids = []
+        self._rows = {}
+        self._cells = {}
+        self._free = []
+        self._latitude = np.zeros(capacity, dtype=np.float64)
+        self._longitude = np.zeros(capacity, dtype=np.float64)
+        self._cell_of = np.zeros(capacity, dtype=np.int64)
+
+    def _cell_position(self, latitude, longitude):
+        """
+        Find the (grid row, grid column) of a coordinate in degrees.
+        """
+        row = min(int((latitude + 90.0) / self._cell), self._grid_rows - 1)
+        col = min(int((longitude + 180.0) / self._cell), self._grid_cols - 1)
+        return row, col
+
+    def _insert(self, place_id, latitude, longitude):
+        """
+        Add a place that is not indexed yet. Called under the lock.
+        """
+        if self._free:
+            row = self._free.pop()
+            self._ids[row] = place_id
+        else:
+            row = len(self._ids)
+            if row == len(self._latitude):
+                for name in ("_latitude", "_longitude", "_cell_of"):
+                    column = getattr(self, name)
+                    grown = np.zeros(2 * len(column), dtype=column.dtype)
+                    grown[:row] = column[:row]
+                    setattr(self, name, grown)
+            self._ids.append(place_id)
+        grid_row, grid_col = self._cell_position(latitude, longitude)
+        cell = grid_row * self._grid_cols + grid_col
+        self._rows[place_id] = row
+        self._latitude[row] = math.radians(latitude)
+        self._longitude[row] = math.radians(longitude)
+        self._cell_of[row] = cell
+        self._cells.setdefault(cell, []).append(row)
+
+    def _delete(self, place_id):
+        """
+        Remove an indexed place, if present. Called under the lock.
+        """
+        row = self._rows.pop(place_id, None)
+        if row is None:
+            return
+        cell = int(self._cell_of[row])
+        rows = self._cells[cell]
+        rows.remove(row)
+        if not rows:
+            del self._cells[cell]
+        self._ids[row] = None
+        self._free.append(row)
+
+    def load(self):
+        """
+        (Re)build the index from every place in the database.
+        """
+        rows = list(self._loader())
+        with self._lock:
+            self._allocate(max(len(rows), 1024))
+            for place_id, latitude, longitude in rows:
+                self._insert(place_id, latitude, longitude)
+            self._loaded = True
+
+    def invalidate(self):
+        """
+        Drop the index's content so it is reloaded on next use.
+        """
+        with self._lock:
+            self._loaded = False
+            self._allocate(1024)
+
+    def __len__(self):
+        """
+        Count the indexed places, loading the index if needed.
+        """
+        if not self._loaded:
+            self.load()
+        return len(self._rows)
+
+    def upsert(self, place_id, latitude, longitude):
+        """
+        Index a place, or move it to new coordinates.
+
+        Args:
+            place_id (str): The ID of the place.
+            latitude (float): The latitude of the place, in degrees.
+            longitude (float): The longitude of the place, in degrees.
+        """
+        with self._lock:
+            if not self._loaded:
+                # The write is already committed, so the load will see it
+                return
+            self._delete(place_id)
+            self._insert(place_id, latitude, longitude)
+
+    def remove(self, place_ids):
+        """
+        Remove places from the index. Unknown IDs are ignored.
+
+        Args:
+            place_ids (iterable): The IDs of the places to remove.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for place_id in place_ids:
+                self._delete(place_id)
+
+    def _bound_km(self, latitude, longitude, grid_row, grid_col, radius):
+        """
+        Lower-bound the distance from a point to every cell outside the
+        block of cells within `radius` of its own cell.
+
+        Args:
+            latitude, longitude (float): The point, in degrees.
+            grid_row, grid_col (int): The cell of the point.
+            radius (int): The radius of the block, in cells.
+
+        Returns:
+            float: The bound in kilometres, infinite once the block covers
+            the whole grid.
+        """
+        bound = math.inf
+        south = (grid_row - radius) * self._cell - 90.0
+        north = (grid_row + radius + 1) * self._cell - 90.0
+        if south > -90.0:
+            bound = min(bound, math.radians(latitude - south))
+        if north < 90.0:
+            bound = min(bound, math.radians(north - latitude))
+        if 2 * radius + 1 < self._grid_cols:
+            west = (grid_col - radius) * self._cell - 180.0
+            east = (grid_col + radius + 1) * self._cell - 180.0
+            delta = math.radians(min(longitude - west, east - longitude))
+            phi = math.radians(latitude)
+            if delta <= math.pi / 2:
+                # Distance to the great circle of the nearest block meridian
+                bound = min(bound, math.asin(math.cos(phi) * math.sin(delta)))
+            else:
+                # Past 90 degrees of longitude the pole is the closest point
+                bound = min(bound, math.pi / 2 - abs(phi))
+        return bound * EARTH_RADIUS_KM
+
+    def _ring(self, grid_row, grid_col, radius):
+        """
+        List the keys of the cells exactly `radius` cells away from a cell,
+        wrapping around in longitude.
+        """
+        cells = set()
+        for row in range(max(grid_row - radius, 0), min(grid_row + radius, self._grid_rows - 1) + 1):
+            if abs(row - grid_row) == radius:
+                offsets = range(-radius, radius + 1)
+            else:
+                offsets = (-radius, radius)
+            for offset in offsets:
+                cells.add(row * self._grid_cols + (grid_col + offset) % self._grid_cols)
+        return cells
+
+    def nearest(self, latitude, longitude, k, max_km=None):
+        """
+        Find the k places closest to a point by great-circle distance.
+
+        Args:
+            latitude (float): The latitude of the point, in degrees.
+            longitude (float): The longitude of the point, in degrees.
+            k (int): The maximum number of places to return.
+            max_km (float): Only return places at most this far, if given.
+
+        Returns:
+            list: (place ID, distance in km) tuples, closest first.
+        """
+        if not self._loaded:
+            self.load()
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+        grid_row, grid_col = self._cell_position(latitude, longitude)
+
+        with self._lock:
+            if not self._rows or k < 1:
+                return []
+            visited = set()
+            found_rows = []
+            found_distances = []
+            best = np.empty(0)
+            radius = 0
+            while True:
+                ring = self._ring(grid_row, grid_col, radius) - visited
+                visited |= ring
+                rows = [row for cell in ring for row in self._cells.get(cell, ())]
+                if rows:
+                    rows = np.array(rows)
+                    distances = haversine_km(phi, lam, self._latitude[rows], self._longitude[rows])
+                    if max_km is not None:
+                        keep = distances <= max_km
+                        rows, distances = rows[keep], distances[keep]
+                    found_rows.append(rows)
+                    found_distances.append(distances)
+                    best = np.concatenate([best, distances])
+                    if len(best) > k:
+                        best = np.partition(best, k - 1)[:k]
+
+                bound = self._bound_km(latitude, longitude, grid_row, grid_col, radius)
+                if bound == math.inf or (max_km is not None and bound > max_km):
+                    break
+                if len(best) == k and best.max() <= bound:
+                    break
+                radius += 1
+
+            if not found_rows:
+                return []
+            rows = np.concatenate(found_rows)
+            distances = np.concatenate(found_distances)
+            order = np.argsort(distances, kind="stable")[:k]
+            return [(self._ids[row], float(distances[row_index]))
+                    for row_index, row in zip(order.tolist(), rows[order].tolist())]
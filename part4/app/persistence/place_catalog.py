@@ -0,0 +1,353 @@
+"""
+Columnar in-memory copy of the place columns used by the list filters.
+
+The catalog keeps one NumPy array per filtered column (price, latitude,
+longitude, review count and rating sum) plus the creation time used for
+keyset ordering, so a combination of filters is evaluated as a few
+vectorized comparisons instead of a table scan. It is a read model: the
+database stays the source of truth, the catalog is loaded from it on first
+use and the facade applies every committed write to it afterwards.
+"""
+from datetime import datetime, timedelta
+from threading import Lock
+import numpy as np
+from app.persistence.repository import decode_cursor, encode_cursor
+
+
+# Creation times are stored as integer microseconds since this naive epoch,
+# which keeps the (created_at, id) comparisons exact
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Rows evaluated per step when scanning in creation order; a page of an
+# unselective filter is found without evaluating the whole catalog
+SCAN_CHUNK_SIZE = 65536
+
+
+def to_micros(created_at):
+    """
+    Convert a naive creation timestamp to microseconds since EPOCH.
+    """
+    return (created_at - EPOCH) // MICROSECOND
+
+
+def from_micros(micros):
+    """
+    Convert microseconds since EPOCH back to a naive timestamp.
+    """
+    return EPOCH + timedelta(microseconds=int(micros))
+
+
+class PlaceCatalog:
+    """
+    Vectorized filter index over every place.
+
+    Rows are appended on creation and tombstoned on deletion; the arrays
+    double in capacity when full and are compacted once half of the rows
+    are dead. Rows loaded from the database are in (created_at, id) order
+    and new places are created later, so the rows normally stay sorted by
+    creation time and a page is found by scanning forward from the cursor.
+    A single lock serializes writes and queries, which take milliseconds.
+    """
+    # The array attributes holding the columns
+    COLUMNS = ("_alive", "_created", "_price", "_latitude", "_longitude",
+               "_review_count", "_rating_sum")
+
+    def __init__(self, loader, capacity=1024):
+        """
+        Initialize an empty catalog, loaded on first use.
+
+        Args:
+            loader (callable): A function returning an iterable of
+                (id, created_at, price, latitude, longitude, review_count,
+                rating_sum) rows ordered by (created_at, id).
+            capacity (int): The initial number of rows allocated.
+        """
+        self._loader = loader
+        self._lock = Lock()
+        self._loaded = False
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        Replace the columns with empty arrays of the given capacity.
+        """
+        self._size = 0
+        self._dead = 0
+        self._sorted = True
+        self._ids = []
+        self._rows = {}
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._created = np.zeros(capacity, dtype=np.int64)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._latitude = np.zeros(capacity, dtype=np.float64)
+        self._longitude = np.zeros(capacity, dtype=np.float64)
+        self._review_count = np.zeros(capacity, dtype=np.int64)
+        self._rating_sum = np.zeros(capacity, dtype=np.float64)
+
+    def _ensure_loaded(self):
+        """
+        Load every place from the database if the catalog is not loaded.
+        Called under the lock.
+        """
+        if self._loaded:
+            return
+        rows = list(self._loader())
+        self._allocate(max(len(rows), 1024))
+        count = len(rows)
+        if count:
+            ids, created, price, latitude, longitude, review_count, rating_sum = zip(*rows)
+            self._ids = list(ids)
+            self._rows = {place_id: row for row, place_id in enumerate(ids)}
+            self._alive[:count] = True
+            self._created[:count] = [to_micros(value) for value in created]
+            self._price[:count] = price
+            self._latitude[:count] = latitude
+            self._longitude[:count] = longitude
+            self._review_count[:count] = review_count
+            self._rating_sum[:count] = rating_sum
+            self._size = count
+            self._sorted = bool(np.all(self._created[1:count] >= self._created[:count - 1]))
+        self._loaded = True
+
+    def _grow(self):
+        """
+        Double the capacity of every column. Called under the lock.
+        """
+        capacity = 2 * len(self._alive)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _compact(self):
+        """
+        Drop the dead rows, keeping the live ones in order. Called under
+        the lock.
+        """
+        keep = np.flatnonzero(self._alive[:self._size])
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            compacted = np.zeros(len(column), dtype=column.dtype)
+            compacted[:len(keep)] = column[keep]
+            setattr(self, name, compacted)
+        self._ids = [self._ids[row] for row in keep.tolist()]
+        self._rows = {place_id: row for row, place_id in enumerate(self._ids)}
+        self._size = len(keep)
+        self._dead = 0
+
+    def invalidate(self):
+        """
+        Drop the catalog's content so it is reloaded on next use, after
+        writes whose rows are not known (e.g. set-based updates).
+        """
+        with self._lock:
+            self._loaded = False
+            self._allocate(1024)
+
+    def __len__(self):
+        """
+        Count the places in the catalog, loading it if needed.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._size - self._dead
+
+    def upsert(self, place_id, created_at, price, latitude, longitude):
+        """
+        Add a place or replace its filtered values.
+
+        Args:
+            place_id (str): The ID of the place.
+            created_at (datetime): The creation timestamp of the place.
+            price (float): The price of the place.
+            latitude (float): The latitude of the place.
+            longitude (float): The longitude of the place.
+        """
+        with self._lock:
+            if not self._loaded:
+                # The write is already committed, so the load will see it
+                return
+            row = self._rows.get(place_id)
+            if row is None:
+                if self._size == len(self._alive):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._ids.append(place_id)
+                self._rows[place_id] = row
+                created = to_micros(created_at)
+                if row and created < self._created[row - 1]:
+                    self._sorted = False
+                self._alive[row] = True
+                self._created[row] = created
+                self._review_count[row] = 0
+                self._rating_sum[row] = 0.0
+            self._price[row] = price
+            self._latitude[row] = latitude
+            self._longitude[row] = longitude
+
+    def remove(self, place_ids):
+        """
+        Remove places from the catalog. Unknown IDs are ignored.
+
+        Args:
+            place_ids (iterable): The IDs of the places to remove.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for place_id in place_ids:
+                row = self._rows.pop(place_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._ids[row] = None
+                    self._dead += 1
+            if self._dead > 1024 and 2 * self._dead > self._size:
+                self._compact()
+
+    def add_rating(self, place_id, rating, count=1):
+        """
+        Account for reviews added to (or, with negative values, removed
+        from) a place.
+
+        Args:
+            place_id (str): The ID of the reviewed place.
+            rating (float): The sum of the ratings to add.
+            count (int): The number of reviews to add.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            row = self._rows.get(place_id)
+            if row is not None:
+                self._review_count[row] += count
+                self._rating_sum[row] += rating
+
+    def set_ratings(self, rows):
+        """
+        Replace the review aggregates of places, e.g. once they have been
+        recomputed from the reviews. Unknown IDs are ignored.
+
+        Args:
+            rows (iterable): (place ID, review count, rating sum) tuples.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for place_id, review_count, rating_sum in rows:
+                row = self._rows.get(place_id)
+                if row is not None:
+                    self._review_count[row] = review_count
+                    self._rating_sum[row] = rating_sum
+
+    def _mask(self, start, stop, min_price, max_price, bbox, min_rating):
+        """
+        Evaluate the filters over a range of rows. Called under the lock.
+
+        Returns:
+            numpy.ndarray: A boolean mask of the live matching rows.
+        """
+        mask = self._alive[start:stop].copy()
+        if min_price is not None:
+            mask &= self._price[start:stop] >= min_price
+        if max_price is not None:
+            mask &= self._price[start:stop] <= max_price
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            latitude = self._latitude[start:stop]
+            longitude = self._longitude[start:stop]
+            mask &= latitude >= min_lat
+            mask &= latitude <= max_lat
+            mask &= longitude >= min_lon
+            mask &= longitude <= max_lon
+        if min_rating is not None:
+            review_count = self._review_count[start:stop]
+            mask &= review_count > 0
+            mask &= self._rating_sum[start:stop] >= min_rating * review_count
+        return mask
+
+    def _after(self, rows, position):
+        """
+        Keep the rows strictly after a (created micros, id) position.
+        Called under the lock.
+        """
+        created_after, id_after = position
+        created = self._created[rows]
+        keep = created > created_after
+        for index in np.flatnonzero(created == created_after).tolist():
+            keep[index] = self._ids[rows[index]] > id_after
+        return rows[keep]
+
+    def query(self, limit, cursor=None, min_price=None, max_price=None,
+              bbox=None, min_rating=None):
+        """
+        Find one page of the places matching every given filter.
+
+        Pages are ordered by (created_at, id) and use the same cursors as
+        SQLAlchemyRepository.get_page, so a client can page through the
+        catalog and the database interchangeably.
+
+        Args:
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            min_price (float): The minimum price, inclusive.
+            max_price (float): The maximum price, inclusive.
+            bbox (tuple): A (min_lon, min_lat, max_lon, max_lat) box the
+                places must lie in, edges included.
+            min_rating (float): The minimum average rating; places without
+                reviews never match.
+
+        Returns:
+            tuple: The list of matching place IDs and the cursor of the next
+            page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        position = None
+        if cursor:
+            created_at, obj_id = decode_cursor(cursor)
+            position = (to_micros(created_at), obj_id)
+        filters = (min_price, max_price, bbox, min_rating)
+
+        with self._lock:
+            self._ensure_loaded()
+            size = self._size
+            created = self._created[:size]
+            if self._sorted:
+                start = int(np.searchsorted(created, position[0], "left")) if position else 0
+                found = []
+                matched = 0
+                while start < size and matched <= limit:
+                    stop = min(start + SCAN_CHUNK_SIZE, size)
+                    rows = start + np.flatnonzero(self._mask(start, stop, *filters))
+                    if position:
+                        rows = self._after(rows, position)
+                    found.append(rows)
+                    matched += len(rows)
+                    start = stop
+                rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+                if matched > limit and start < size:
+                    # Rows created at the same microsecond as the last
+                    # candidate may still sort before it by ID
+                    stop = int(np.searchsorted(created, created[rows[limit]], "right"))
+                    if stop > start:
+                        tied = start + np.flatnonzero(self._mask(start, stop, *filters))
+                        rows = np.concatenate((rows, tied))
+            else:
+                rows = np.flatnonzero(self._mask(0, size, *filters))
+                if position:
+                    rows = self._after(rows, position)
+
+            if len(rows) > limit + 1:
+                keys = created[rows]
+                rows = rows[keys <= np.partition(keys, limit)[limit]]
+            page = sorted(rows.tolist(), key=lambda row: (created[row], self._ids[row]))[:limit + 1]
+            place_ids = [self._ids[row] for row in page]
+            last = (created[page[limit - 1]], place_ids[limit - 1]) if len(page) > limit else None
+
+        if last is None:
+            return place_ids, None
+        return place_ids[:limit], encode_cursor(from_micros(last[0]), last[1])
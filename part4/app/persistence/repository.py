@@ -1,5 +1,186 @@
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, lazyload, noload, selectinload
 from app.extensions import db
+from app.persistence.routing import pin_to_primary
+
+
+# Upper bound on the number of IDs bound into a single IN (...) clause
+GET_MANY_CHUNK_SIZE = 500
+
+# Relationship loading strategies accepted in the load argument
+LOADER_STRATEGIES = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "select": lazyload,
+    "noload": noload
+}
+
+
+# Keys of db.session.info used to track an open unit of work
+UNIT_OF_WORK_DEPTH = "unit_of_work_depth"
+UNIT_OF_WORK_CALLBACKS = "unit_of_work_callbacks"
+
+
+def in_unit_of_work():
+    """
+    Tell whether the current session is inside a unit of work.
+
+    Returns:
+        bool: True if repositories must defer their commits.
+    """
+    return db.session.info.get(UNIT_OF_WORK_DEPTH, 0) > 0
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Group the writes of every repository into a single transaction.
+
+    Inside the block repositories flush instead of committing. The
+    transaction is committed once when the outermost block exits, or rolled
+    back if it exits with an exception. Nested blocks join the outer one.
+    Reads made from then on go to the primary database, not the replica.
+    """
+    session = db.session
+    depth = session.info.get(UNIT_OF_WORK_DEPTH, 0)
+    if depth == 0:
+        session.info[UNIT_OF_WORK_CALLBACKS] = []
+        pin_to_primary(session)
+    session.info[UNIT_OF_WORK_DEPTH] = depth + 1
+    try:
+        yield
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+            session.info.pop(UNIT_OF_WORK_CALLBACKS, None)
+        raise
+    finally:
+        session.info[UNIT_OF_WORK_DEPTH] = depth
+
+    if depth == 0:
+        for callback in session.info.pop(UNIT_OF_WORK_CALLBACKS, []):
+            callback()
+
+
+@contextmanager
+def savepoint():
+    """
+    Run writes that may fail on their own inside a unit of work.
+
+    If the block raises, its writes are rolled back to a savepoint and its
+    on_commit callbacks are dropped, while the rest of the unit of work
+    carries on.
+    """
+    callbacks = db.session.info.get(UNIT_OF_WORK_CALLBACKS, [])
+    mark = len(callbacks)
+    try:
+        with db.session.begin_nested():
+            yield
+    except BaseException:
+        del callbacks[mark:]
+        raise
+
+
+def on_commit(callback):
+    """
+    Run a callback once the current writes are committed.
+
+    Outside a unit of work the writes are already committed and the
+    callback runs immediately; inside one it runs after the final commit,
+    and is dropped if the unit of work is rolled back.
+
+    Args:
+        callback (callable): A function taking no arguments.
+    """
+    if in_unit_of_work():
+        db.session.info[UNIT_OF_WORK_CALLBACKS].append(callback)
+    else:
+        callback()
+
+
+def encode_cursor(created_at, obj_id):
+    """
+    Encode a (created_at, id) keyset position into an opaque cursor string.
+
+    Args:
+        created_at (datetime): The creation timestamp of the last object seen.
+        obj_id (str): The ID of the last object seen.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), obj_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        tuple: The (created_at, id) keyset position.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_rank_cursor(score, key):
+    """
+    Encode a (score, key) position in a ranked result list into an opaque
+    cursor string.
+
+    Args:
+        score (float): The ranking score of the last object seen.
+        key (str|int): The tie-breaking key (e.g. the ID) of the last
+            object seen.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    raw = json.dumps([score, key]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor):
+    """
+    Decode a cursor produced by encode_rank_cursor.
+
+    Args:
+        cursor (str): The cursor to decode.
+
+    Returns:
+        tuple: The (score, key) position.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, key = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(key, (str, int)):
+            raise TypeError(key)
+        return float(score), key
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
 
 
 class Repository(ABC):
@@ -18,12 +199,27 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def add_many(self, objs, chunk_size=500):
+        """
+        Add several objects to the repository in batches.
+
+        Args:
+            objs: An iterable of objects to add.
+            chunk_size: The number of objects persisted per batch.
+
+        Returns:
+            A list of (index, error) tuples for the objects that failed.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, obj_id, load=None):
         """
         Retrieve an object from the repository by its ID.
 
         Args:
             obj_id: The ID of the object to retrieve.
+            load: Relationships to load along with the object.
 
         Returns:
             The retrieved object, or None if not found.
@@ -31,12 +227,62 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get_all(self):
+    def get_many(self, obj_ids, load=None):
+        """
+        Retrieve several objects from the repository by their IDs.
+
+        Args:
+            obj_ids: An iterable of IDs of the objects to retrieve.
+            load: Relationships to load along with the objects.
+
+        Returns:
+            A list of the objects found, in the order of obj_ids.
+        """
+        pass
+
+    @abstractmethod
+    def get_all(self, columns=None, load=None):
         """
         Retrieve all objects from the repository.
 
+        Args:
+            columns: Attribute names to project instead of whole objects.
+            load: Relationships to load along with the objects.
+
+        Returns:
+            A list of all objects in the repository, or of rows holding only
+            the requested columns.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(self, limit, cursor=None, columns=None, load=None, where=()):
+        """
+        Retrieve one page of objects ordered by (created_at, id).
+
+        Args:
+            limit: The maximum number of objects to return.
+            cursor: The cursor returned with the previous page, if any.
+            columns: Attribute names to project instead of whole objects.
+            load: Relationships to load along with the objects.
+
         Returns:
-            A list of all objects in the repository.
+            A tuple of the list of objects and the cursor of the next page,
+            or None if this is the last page.
+        """
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size=1000, columns=None):
+        """
+        Iterate over every object without loading them all at once.
+
+        Args:
+            batch_size: The number of objects fetched from storage at a time.
+            columns: Attribute names to project instead of whole objects.
+
+        Returns:
+            An iterator over the objects, ordered by (created_at, id).
         """
         pass
 
@@ -51,6 +297,20 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_where(self, filters, values):
+        """
+        Update every object matching the filters with the same values.
+
+        Args:
+            filters: A dictionary of attribute names to required values.
+            values: A dictionary of updated data.
+
+        Returns:
+            The number of objects updated.
+        """
+        pass
+
     @abstractmethod
     def delete(self, obj_id):
         """
@@ -61,6 +321,19 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, obj_ids):
+        """
+        Delete several objects from the repository by their IDs.
+
+        Args:
+            obj_ids: An iterable of IDs of the objects to delete.
+
+        Returns:
+            The number of objects deleted.
+        """
+        pass
+
     @abstractmethod
     def get_by_attribute(self, attr_name, attr_value):
         """
@@ -89,6 +362,29 @@ class SQLAlchemyRepository(Repository):
             model: The SQLAlchemy model class.
         """
         self.model = model
+        # Whether each (engine, table) exists, for the SQLite-only indexes
+        self._tables = {}
+
+    def _has_table(self, name):
+        """
+        Tell whether the current database has one of the SQLite-only index
+        tables, e.g. places_rtree or places_fts.
+
+        Args:
+            name (str): The name of the table.
+
+        Returns:
+            bool: True on SQLite databases created with the table, or
+            upgraded since.
+        """
+        connection = db.session.connection()
+        key = (connection.engine, name)
+        if key not in self._tables:
+            self._tables[key] = (
+                connection.engine.dialect.name == "sqlite"
+                and db.inspect(connection).has_table(name)
+            )
+        return self._tables[key]
 
     def add(self, obj):
         """
@@ -98,28 +394,299 @@ class SQLAlchemyRepository(Repository):
             obj: The object to add.
         """
         db.session.add(obj)
-        db.session.commit()
+        self._commit()
+
+    def _commit(self, set_based=False):
+        """
+        Commit the session, or only flush it inside a unit of work so the
+        unit of work can commit everything at once.
+
+        Args:
+            set_based (bool): True after an UPDATE/DELETE issued without
+                loading the rows, in which case objects already in the
+                session are expired so they are reloaded from the database.
+        """
+        if in_unit_of_work():
+            db.session.flush()
+            if set_based:
+                db.session.expire_all()
+        else:
+            db.session.commit()
+
+    def add_many(self, objs, chunk_size=500):
+        """
+        Add several objects to the SQLAlchemy repository, committing once
+        per chunk instead of once per object.
+
+        If a chunk fails to commit it is rolled back and replayed one object
+        at a time, so a bad row only rejects itself and not its whole chunk.
+        Inside a unit of work chunks are only flushed, and a database error
+        propagates so the whole unit of work is rolled back.
+
+        Args:
+            objs: An iterable of objects to add.
+            chunk_size (int): The number of objects committed per transaction.
+
+        Returns:
+            list: (index, error) tuples for the objects that could not be
+            added, where index is the object's position in objs.
+
+        Raises:
+            ValueError: If chunk_size is not a positive integer.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        failures = []
+        chunk = []
+        for index, obj in enumerate(objs):
+            chunk.append((index, obj))
+            if len(chunk) == chunk_size:
+                failures.extend(self._commit_chunk(chunk))
+                chunk = []
+        if chunk:
+            failures.extend(self._commit_chunk(chunk))
+        return failures
+
+    def _commit_chunk(self, chunk):
+        """
+        Commit a chunk of (index, obj) pairs in a single transaction, falling
+        back to one transaction per object if the chunk is rejected.
+
+        Args:
+            chunk (list): The (index, obj) pairs to persist.
 
-    def get(self, obj_id):
+        Returns:
+            list: (index, error) tuples for the objects that failed.
+        """
+        if in_unit_of_work():
+            db.session.add_all([obj for _, obj in chunk])
+            db.session.flush()
+            return []
+
+        try:
+            db.session.add_all([obj for _, obj in chunk])
+            db.session.commit()
+            return []
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        failures = []
+        for index, obj in chunk:
+            try:
+                db.session.add(obj)
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                failures.append((index, e))
+        return failures
+
+    def get(self, obj_id, load=None):
         """
         Retrieve an object from the SQLAlchemy repository by its ID.
 
         Args:
             obj_id: The ID of the object to retrieve.
+            load: Relationships to load along with the object, see
+                _loader_options.
 
         Returns:
             The retrieved object, or None if not found.
         """
-        return self.model.query.get(obj_id)
+        return self.model.query.options(*self._loader_options(load)).get(obj_id)
+
+    def _loader_options(self, load):
+        """
+        Translate a load specification into SQLAlchemy loader options.
+
+        load is either an iterable of relationship paths, e.g.
+        ("owner", "amenities", "reviews.user"), or a dict mapping such paths
+        to a strategy name from LOADER_STRATEGIES ("joined", "selectin",
+        "select" or "noload"). Without an explicit strategy, many-to-one
+        relationships are joined and collections are loaded with a second
+        SELECT ... IN query, which avoids multiplying rows.
+
+        Args:
+            load (iterable|dict): The relationships to load, or None.
+
+        Returns:
+            list: The loader options to pass to Query.options.
+
+        Raises:
+            ValueError: If a path or strategy is unknown.
+        """
+        if not load:
+            return []
+        if not isinstance(load, dict):
+            load = dict.fromkeys(load)
+
+        options = []
+        for path, strategy in load.items():
+            if strategy is not None and strategy not in LOADER_STRATEGIES:
+                raise ValueError(f"Unknown loading strategy {strategy}")
+            model = self.model
+            option = None
+            names = path.split(".")
+            for depth, name in enumerate(names):
+                relationship = sa_inspect(model).relationships.get(name)
+                if relationship is None:
+                    raise ValueError(f"{model.__name__} has no relationship {name}")
+                if depth == len(names) - 1 and strategy is not None:
+                    loader = strategy
+                else:
+                    loader = "selectin" if relationship.uselist else "joined"
+                attr = getattr(model, name)
+                if option is None:
+                    option = LOADER_STRATEGIES[loader](attr)
+                else:
+                    option = getattr(option, LOADER_STRATEGIES[loader].__name__)(attr)
+                model = relationship.mapper.class_
+            options.append(option)
+        return options
+
+    def get_many(self, obj_ids, load=None):
+        """
+        Retrieve several objects from the SQLAlchemy repository by their IDs.
+
+        The IDs are fetched with one IN (...) query per GET_MANY_CHUNK_SIZE
+        IDs instead of one query per ID.
+
+        Args:
+            obj_ids (iterable): The IDs of the objects to retrieve.
+            load: Relationships to load along with the objects, see
+                _loader_options.
 
-    def get_all(self):
+        Returns:
+            list: The objects found, in the order of obj_ids. IDs that do not
+            exist are skipped.
+        """
+        obj_ids = list(obj_ids)
+        unique_ids = list(dict.fromkeys(obj_ids))
+        options = self._loader_options(load)
+        found = {}
+        for start in range(0, len(unique_ids), GET_MANY_CHUNK_SIZE):
+            chunk = unique_ids[start:start + GET_MANY_CHUNK_SIZE]
+            for obj in self.model.query.options(*options).filter(self.model.id.in_(chunk)):
+                found[obj.id] = obj
+        return [found[obj_id] for obj_id in obj_ids if obj_id in found]
+
+    def get_all(self, columns=None, load=None):
         """
         Retrieve all objects from the SQLAlchemy repository.
 
+        Args:
+            columns (iterable): Attribute names to load, e.g. ("id", "title").
+                When given, only those columns are selected and no object or
+                relationship is loaded.
+            load: Relationships to load along with the objects, see
+                _loader_options. Ignored when columns are given.
+
+        Returns:
+            list: All objects in the repository, or named-tuple rows with one
+            field per requested column.
+
+        Raises:
+            ValueError: If a column is not a mapped column of the model.
+        """
+        if columns is None:
+            return self.model.query.options(*self._loader_options(load)).all()
+        return db.session.execute(db.select(*self._projection(columns))).all()
+
+    def _projection(self, columns, required=()):
+        """
+        Build the labelled column expressions of a projected query.
+
+        Args:
+            columns (iterable): The attribute names requested by the caller.
+            required (iterable): Attribute names the query itself needs,
+                added when the caller did not request them.
+
         Returns:
-            A list of all objects in the repository.
+            list: Column expressions labelled with their attribute names.
+
+        Raises:
+            ValueError: If a name is not a mapped column of the model.
+        """
+        names = list(dict.fromkeys(list(columns) + list(required)))
+        mapper = sa_inspect(self.model)
+        projection = []
+        for name in names:
+            attr = getattr(self.model, name, None)
+            prop = getattr(attr, "property", None)
+            if prop is None or prop not in mapper.column_attrs.values():
+                raise ValueError(f"{name} is not a column of {self.model.__name__}")
+            projection.append(attr.label(name))
+        return projection
+
+    def get_page(self, limit, cursor=None, columns=None, load=None, where=()):
+        """
+        Retrieve one page of objects using keyset pagination.
+
+        Objects are ordered by (created_at, id) and the page starts strictly
+        after the position encoded in the cursor, so every page costs an
+        index range scan no matter how deep it is.
+
+        Args:
+            limit (int): The maximum number of objects to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                objects, as for get_all. created_at and id are always loaded.
+            load: Relationships to load along with the objects, see
+                _loader_options. Ignored when columns are given.
+            where (iterable): Extra SQL criteria the objects must match.
+
+        Returns:
+            tuple: The list of objects (or rows) and the cursor of the next
+            page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed or a column is unknown.
+        """
+        if columns is None:
+            statement = db.select(self.model).options(*self._loader_options(load))
+        else:
+            statement = db.select(*self._projection(columns, ("created_at", "id")))
+        statement = statement.where(*where)
+        if cursor:
+            created_at, obj_id = decode_cursor(cursor)
+            statement = statement.where(db.or_(
+                self.model.created_at > created_at,
+                db.and_(self.model.created_at == created_at, self.model.id > obj_id)
+            ))
+        statement = statement.order_by(self.model.created_at, self.model.id).limit(limit + 1)
+        result = db.session.execute(statement)
+        items = result.unique().scalars().all() if columns is None else result.all()
+
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, encode_cursor(items[-1].created_at, items[-1].id)
+
+    def iter_all(self, batch_size=1000, columns=None):
         """
-        return self.model.query.all()
+        Iterate over every object through a server-side cursor.
+
+        Rows are fetched batch_size at a time with yield_per, so only one
+        batch of objects is alive at once. Relationships are not eagerly
+        loaded since eager loaders cannot be combined with yield_per.
+
+        Args:
+            batch_size (int): The number of rows fetched per round trip.
+            columns (iterable): Attribute names to load instead of whole
+                objects, as for get_all.
+
+        Yields:
+            The objects (or rows), ordered by (created_at, id).
+        """
+        if columns is None:
+            statement = db.select(self.model).options(lazyload("*"))
+        else:
+            statement = db.select(*self._projection(columns))
+        statement = statement.order_by(
+            self.model.created_at, self.model.id
+        ).execution_options(yield_per=batch_size)
+        result = db.session.execute(statement)
+        yield from (result.scalars() if columns is None else result)
 
     def update(self, obj_id, data):
         """
@@ -133,7 +700,100 @@ class SQLAlchemyRepository(Repository):
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            self._commit()
+
+    def update_where(self, filters, values):
+        """
+        Update every matching object with a single UPDATE statement.
+
+        The new values are run through the model's validators before the
+        statement is issued, and updated_at is refreshed on every row.
+
+        Args:
+            filters (dict): Attribute names mapped to the value each row must
+                have. A list, tuple or set value matches any of its members.
+            values (dict): A dictionary of updated data.
+
+        Returns:
+            int: The number of rows updated.
+
+        Raises:
+            ValueError: If filters or values are empty or name an attribute
+                that cannot be updated this way.
+        """
+        if not values:
+            raise ValueError("No values to update")
+        column_values = self._validated_values(values)
+        column_values[self.model.updated_at] = datetime.utcnow()
+
+        count = self.model.query.filter(*self._criteria(filters)).update(
+            column_values, synchronize_session=False
+        )
+        self._commit(set_based=True)
+        return count
+
+    def _criteria(self, filters):
+        """
+        Turn a dictionary of attribute filters into SQL criteria.
+
+        Args:
+            filters (dict): Attribute names mapped to a value or a collection
+                of accepted values.
+
+        Returns:
+            list: The SQL criteria, to be combined with AND.
+
+        Raises:
+            ValueError: If filters is empty or names an unknown attribute.
+        """
+        if not filters:
+            raise ValueError("At least one filter is required")
+        criteria = []
+        for attr_name, attr_value in filters.items():
+            if not hasattr(self.model, attr_name):
+                raise ValueError(f"Unknown attribute {attr_name}")
+            column = getattr(self.model, attr_name)
+            if isinstance(attr_value, (list, tuple, set)):
+                criteria.append(column.in_(list(attr_value)))
+            else:
+                criteria.append(column == attr_value)
+        return criteria
+
+    def _validated_values(self, values):
+        """
+        Validate update data through the model's setters and @validates hooks.
+
+        The values are assigned to a throw-away instance that is never added
+        to the session, so the same rules apply as for a per-object update.
+
+        Args:
+            values (dict): A dictionary of updated data.
+
+        Returns:
+            dict: The validated values keyed by mapped column attribute.
+
+        Raises:
+            ValueError: If a key is unknown, read-only, a relationship or the
+                primary key.
+        """
+        mapper = sa_inspect(self.model)
+        probe = self.model()
+        for key, value in values.items():
+            if key == "id" or key in mapper.relationships or not hasattr(self.model, key):
+                raise ValueError(f"Attribute {key} cannot be bulk updated")
+            try:
+                setattr(probe, key, value)
+            except AttributeError:
+                # A read-only property, e.g. a hybrid without a setter
+                raise ValueError(f"Attribute {key} cannot be bulk updated") from None
+
+        state = sa_inspect(probe)
+        column_values = {}
+        for attr in mapper.column_attrs:
+            added = state.attrs[attr.key].history.added
+            if added:
+                column_values[getattr(self.model, attr.key)] = added[0]
+        return column_values
 
     def delete(self, obj_id):
         """
@@ -145,7 +805,38 @@ class SQLAlchemyRepository(Repository):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            self._commit()
+
+    def delete_many(self, obj_ids):
+        """
+        Delete several objects with a single DELETE statement.
+
+        Rows in many-to-many association tables that point at the deleted
+        objects are removed first, as the ORM would do for a single delete.
+
+        Args:
+            obj_ids (iterable): The IDs of the objects to delete.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return 0
+
+        for relationship in sa_inspect(self.model).relationships:
+            if relationship.secondary is None:
+                continue
+            for parent_col, secondary_col in relationship.synchronize_pairs:
+                db.session.execute(
+                    relationship.secondary.delete().where(secondary_col.in_(obj_ids))
+                )
+
+        count = self.model.query.filter(self.model.id.in_(obj_ids)).delete(
+            synchronize_session=False
+        )
+        self._commit(set_based=True)
+        return count
 
     def get_by_attribute(self, attr_name, attr_value):
         """
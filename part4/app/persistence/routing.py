@@ -0,0 +1,108 @@
+"""
+Read/write splitting between the primary database and a read replica.
+
+When SQLALCHEMY_BINDS has a "replica" entry, the SELECT statements of the
+repositories run on the replica and everything else on the primary. A
+session reads from the primary instead once it is pinned: when it has
+written or entered a unit of work, or belongs to a write request or to a
+request from a client that wrote within the last READ_REPLICA_PIN_SECONDS,
+so that clients read their own writes while the replica catches up.
+"""
+import time
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import CompoundSelect, Select, UpdateBase
+
+
+# Key of the replica in SQLALCHEMY_BINDS
+REPLICA_BIND = "replica"
+
+# Session info keys: whether the session wrote, and whether it reads from
+# the primary
+WROTE = "wrote"
+PINNED = "pinned_to_primary"
+
+# Cookie holding the time until which a client reads from the primary
+PIN_COOKIE = "hbnb_primary_until"
+
+# HTTP methods whose requests may read from the replica
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """
+    Flask-SQLAlchemy session sending the reads of unpinned sessions to the
+    replica bind, if one is configured.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """
+        Select the engine of a statement: the replica for plain SELECTs of
+        an unpinned session, the primary otherwise.
+        """
+        if bind is None and not self._flushing and self._is_read(clause):
+            if not self.info.get(PINNED) and not (self.new or self.dirty or self.deleted):
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        elif self._flushing or isinstance(clause, UpdateBase):
+            self.info[WROTE] = True
+            self.info[PINNED] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @staticmethod
+    def _is_read(clause):
+        """
+        Tell whether a statement only reads: a SELECT without FOR UPDATE.
+        """
+        if isinstance(clause, Select):
+            return clause._for_update_arg is None
+        return isinstance(clause, CompoundSelect)
+
+
+def pin_to_primary(session, wrote=False):
+    """
+    Send the remaining reads of a session to the primary.
+
+    Args:
+        session: The session, or the scoped session.
+        wrote (bool): Whether the session's request made a write elsewhere,
+            e.g. through the group commit writer, which pins its client.
+    """
+    session.info[PINNED] = True
+    if wrote:
+        session.info[WROTE] = True
+
+
+def init_app(app, db):
+    """
+    Read from the primary during write requests, and during the requests
+    of clients that wrote within the last READ_REPLICA_PIN_SECONDS, using a
+    cookie so that every worker process honours it.
+
+    Args:
+        app (Flask): The application.
+        db (SQLAlchemy): The Flask-SQLAlchemy extension of the application.
+    """
+    if REPLICA_BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    window = app.config.get("READ_REPLICA_PIN_SECONDS", 0)
+
+    @app.before_request
+    def pin_writers():
+        # The checks made before a write must see the primary's data
+        if request.method not in READ_METHODS:
+            pin_to_primary(db.session)
+            return
+        try:
+            pinned_until = float(request.cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            return
+        if pinned_until > time.time():
+            pin_to_primary(db.session)
+
+    @app.after_request
+    def remember_writers(response):
+        if window > 0 and db.session.registry.has() and db.session.info.get(WROTE):
+            response.set_cookie(PIN_COOKIE, f"{time.time() + window:.3f}", max_age=window,
+                                httponly=True, samesite="Lax")
+        return response
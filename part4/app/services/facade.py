@@ -1,11 +1,49 @@
+from functools import wraps
+from app.extensions import db
 from app.persistence.dedicated_repo import UserRepository, PlaceRepository
 from app.persistence.dedicated_repo import AmenityRepository, ReviewRepository
+from app.persistence.cache import CachedRepository, EntityCache
+from app.persistence.engine import SQLiteMaintenance, copy_sqlite_database, pool_stats
+from app.persistence.group_commit import GroupCommitWriter
+from app.persistence.nearby_index import NearbyIndex
+from app.persistence.repository import in_unit_of_work, on_commit, unit_of_work
+from app.persistence.routing import REPLICA_BIND, pin_to_primary
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, average_rating
 from app.models.review import Review
 from app.models.user import User
 
 
+def grouped_write(method):
+    """
+    Run a facade write on the group commit writer when it is enabled.
+
+    The calling thread waits for the batch holding the write to be
+    committed, after ending its session's transaction: the writer takes its
+    connection from the same pool, so callers holding theirs while waiting
+    would starve it once as many write as the pool has connections. The
+    returned object is merged into the caller's session, whose other
+    objects are expired since they may predate the write, and whose later
+    reads go to the primary database.
+    Writes made inside a unit of work or by the writer itself run directly.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        writer = self.group_commit
+        if writer is None or writer.in_writer() or in_unit_of_work():
+            return method(self, *args, **kwargs)
+        # Outside a unit of work the session has no pending writes, so this
+        # only returns its connection to the pool
+        db.session.commit()
+        result = writer.submit(method, self, *args, **kwargs).result()
+        pin_to_primary(db.session, wrote=True)
+        db.session.expire_all()
+        if isinstance(result, db.Model):
+            result = db.session.merge(result, load=False)
+        return result
+    return wrapper
+
+
 class HBnBFacade:
     """
     Facade class to manage interactions between different layers of the application.
@@ -17,11 +55,239 @@ class HBnBFacade:
         """
         Initialize the HBnBFacade with SQLAlchemy repositories for users,
         places, reviews, and amenities.
+
+        Each repository is wrapped in a CachedRepository, which stays a
+        pass-through until init_cache enables the entity cache.
+        """
+        self.cache = None
+        self.place_catalog = None
+        self.sqlite_maintenance = None
+        self.group_commit = None
+        self.user_repo = CachedRepository(UserRepository())
+        self.place_repo = CachedRepository(PlaceRepository())
+        self.review_repo = CachedRepository(ReviewRepository())
+        self.amenity_repo = CachedRepository(AmenityRepository())
+        self.nearby_index = NearbyIndex(self.place_repo.iter_coordinates)
+
+    def init_cache(self, config):
+        """
+        Enable or disable the entity cache according to the app config.
+
+        Args:
+            config (dict): The Flask config, read for ENTITY_CACHE_ENABLED,
+                ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL and ENTITY_CACHE_MODEL_TTLS.
+        """
+        self.cache = None
+        if config.get("ENTITY_CACHE_ENABLED"):
+            self.cache = EntityCache(
+                max_size=config.get("ENTITY_CACHE_SIZE", 10000),
+                default_ttl=config.get("ENTITY_CACHE_TTL", 60),
+                model_ttls=config.get("ENTITY_CACHE_MODEL_TTLS")
+            )
+        for repo in (self.user_repo, self.place_repo, self.review_repo, self.amenity_repo):
+            repo.cache = self.cache
+
+    def init_place_catalog(self, config):
+        """
+        Enable or disable the in-memory place catalog according to the app
+        config. The catalog is loaded from the database on first use.
+
+        The catalog module is only imported once enabled, so NumPy is not
+        needed otherwise.
+
+        Args:
+            config (dict): The Flask config, read for PLACE_CATALOG_ENABLED.
+        """
+        self.place_catalog = None
+        if config.get("PLACE_CATALOG_ENABLED"):
+            from app.persistence.place_catalog import PlaceCatalog
+            self.place_catalog = PlaceCatalog(self.place_repo.iter_catalog_rows)
+
+    def init_sqlite_maintenance(self, config):
+        """
+        Start or stop the periodic SQLite maintenance according to the app
+        config. Must be called within an application context.
+
+        Args:
+            config (dict): The Flask config, read for
+                SQLITE_MAINTENANCE_INTERVAL.
+        """
+        if self.sqlite_maintenance is not None:
+            self.sqlite_maintenance.stop()
+        self.sqlite_maintenance = None
+        interval = config.get("SQLITE_MAINTENANCE_INTERVAL")
+        if interval and db.engine.dialect.name == "sqlite":
+            self.sqlite_maintenance = SQLiteMaintenance(db.engine, interval).start()
+
+    def init_group_commit(self, app):
+        """
+        Start or stop the group commit writer according to the app config.
+
+        While it runs, the single-object place, amenity and review writes
+        are committed in batches by one writer thread. User writes are not,
+        since hashing passwords on the writer would hold up every batch.
+
+        Args:
+            app (Flask): The application, whose config is read for
+                GROUP_COMMIT_ENABLED, GROUP_COMMIT_WINDOW_MS and
+                GROUP_COMMIT_MAX_BATCH.
+        """
+        if self.group_commit is not None:
+            self.group_commit.stop()
+        self.group_commit = None
+        if app.config.get("GROUP_COMMIT_ENABLED"):
+            self.group_commit = GroupCommitWriter(
+                app,
+                window_ms=app.config.get("GROUP_COMMIT_WINDOW_MS", 2),
+                max_batch=app.config.get("GROUP_COMMIT_MAX_BATCH", 64)
+            ).start()
+
+    def load_nearby_index(self):
+        """
+        Build the nearby places index from the database now rather than on
+        the first nearby query.
+        """
+        self.nearby_index.load()
+
+    def _update_index(self, index, method, *args):
+        """
+        Apply a write to an in-memory index once it is committed.
+
+        Args:
+            index: The PlaceCatalog or NearbyIndex to update, or None if
+                it is disabled.
+            method (str): The name of the index method to call.
+            *args: The arguments of the method.
+        """
+        if index is not None:
+            on_commit(lambda: getattr(index, method)(*args))
+
+    def cache_stats(self):
+        """
+        Retrieve the entity cache counters.
+
+        Returns:
+            dict: The cache statistics, or None if the cache is disabled.
+        """
+        return self.cache.stats() if self.cache else None
+
+    def pool_stats(self):
         """
-        self.user_repo = UserRepository()
-        self.place_repo = PlaceRepository()
-        self.review_repo = ReviewRepository()
-        self.amenity_repo = AmenityRepository()
+        Retrieve the connection pool counters, among which the checkout wait
+        times and the saturation.
+
+        Returns:
+            dict: The pool statistics, or None if the configuration does not
+            use a sized pool.
+        """
+        return pool_stats(db.engine)
+
+    def sqlite_maintenance_stats(self):
+        """
+        Retrieve the counters of the periodic SQLite maintenance.
+
+        Returns:
+            dict: The maintenance statistics, or None if it is disabled.
+        """
+        return self.sqlite_maintenance.stats() if self.sqlite_maintenance else None
+
+    def sync_replica(self):
+        """
+        Refresh a SQLite read replica with a copy of the primary database,
+        the way a local setup stands in for replication.
+
+        Raises:
+            ValueError: If no SQLite replica is configured.
+        """
+        replica = db.engines.get(REPLICA_BIND)
+        if replica is None:
+            raise ValueError("No read replica is configured")
+        if db.engine.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+            raise ValueError("Copying to the replica requires SQLite databases")
+        copy_sqlite_database(db.engine, replica)
+
+    def group_commit_stats(self):
+        """
+        Retrieve the group commit writer counters.
+
+        Returns:
+            dict: The batch statistics, or None if group commit is disabled.
+        """
+        return self.group_commit.stats() if self.group_commit else None
+
+    def maintain_sqlite(self, checkpoint_mode="PASSIVE"):
+        """
+        Checkpoint the SQLite write-ahead log and refresh the query planner
+        statistics now.
+
+        Args:
+            checkpoint_mode (str): The PRAGMA wal_checkpoint mode.
+
+        Returns:
+            dict: The outcome of the checkpoint.
+
+        Raises:
+            ValueError: If the database is not SQLite or the mode is unknown.
+        """
+        if db.engine.dialect.name != "sqlite":
+            raise ValueError("SQLite maintenance requires an SQLite database")
+        maintenance = self.sqlite_maintenance or SQLiteMaintenance(db.engine, 0)
+        return maintenance.run(checkpoint_mode)
+
+    def unit_of_work(self):
+        """
+        Open a transaction shared by every facade write made inside it.
+
+        Example:
+            with facade.unit_of_work():
+                facade.update_user(user_id, user_data)
+                facade.update_places_where({"owner_id": user_id}, place_data)
+
+        Returns:
+            A context manager committing once on exit, or rolling back every
+            write if the block raises.
+        """
+        return unit_of_work()
+
+    def _create_bulk(self, repo, model, rows, chunk_size):
+        """
+        Validate and persist many rows of a model in chunked transactions.
+
+        Every row is first turned into a model instance, which runs the
+        model's validators. Rows that fail validation are reported and
+        skipped; the remaining instances are handed to the repository's
+        add_many, which reports rows rejected by the database.
+
+        Args:
+            repo (SQLAlchemyRepository): The repository to add the rows to.
+            model (type): The model class to instantiate for each row.
+            rows (iterable): Dictionaries of model data.
+            chunk_size (int): The number of rows committed per transaction.
+
+        Returns:
+            tuple: A list of the created instances and a list of
+            {"index": int, "error": str} dicts for the rows that failed,
+            where index is the row's position in rows.
+        """
+        errors = []
+        valid = []
+        for index, row in enumerate(rows):
+            try:
+                valid.append((index, model(**row)))
+            except (TypeError, ValueError) as e:
+                errors.append({"index": index, "error": str(e)})
+
+        failures = repo.add_many([obj for _, obj in valid], chunk_size=chunk_size)
+        failed = set()
+        for position, error in failures:
+            failed.add(position)
+            # Report the driver's message rather than the full statement,
+            # which would echo every bound parameter (password hashes included)
+            errors.append({"index": valid[position][0], "error": str(getattr(error, "orig", error))})
+
+        created = [obj for position, (_, obj) in enumerate(valid) if position not in failed]
+        errors.sort(key=lambda err: err["index"])
+        return created, errors
 
 #--------------User facade CRUD ops--------------#
     def create_user(self, user_data):
@@ -38,17 +304,45 @@ class HBnBFacade:
         self.user_repo.add(user)
         return user
 
-    def get_user(self, user_id):
+    def create_users_bulk(self, users_data, chunk_size=500):
+        """
+        Create many users, committing them in chunks.
+
+        Args:
+            users_data (iterable): Dictionaries containing user data.
+            chunk_size (int): The number of users committed per transaction.
+
+        Returns:
+            tuple: The list of created users and a list of per-row errors.
+        """
+        return self._create_bulk(self.user_repo, User, users_data, chunk_size)
+
+    def get_user(self, user_id, load=None):
         """
         Retrieve a user by their ID.
 
         Args:
             user_id (str): The ID of the user to retrieve.
+            load (iterable|dict): Relationships to load with the user, e.g.
+                ("places", "reviews").
 
         Returns:
             User: The retrieved user instance, or None if not found.
         """
-        return self.user_repo.get(user_id)
+        return self.user_repo.get(user_id, load)
+
+    def get_users(self, user_ids, load=None):
+        """
+        Retrieve several users by their IDs in as few queries as possible.
+
+        Args:
+            user_ids (iterable): The IDs of the users to retrieve.
+            load (iterable|dict): Relationships to load with the users.
+
+        Returns:
+            list: The User instances found, in the order of user_ids.
+        """
+        return self.user_repo.get_many(user_ids, load)
 
     def get_user_by_email(self, email):
         """
@@ -62,14 +356,49 @@ class HBnBFacade:
         """
         return self.user_repo.get_user_by_email(email)
     
-    def get_users_all(self):
+    def get_users_all(self, columns=None):
         """
         Retrieve all users.
 
+        Args:
+            columns (iterable): Attribute names to load instead of whole
+                user instances.
+
+        Returns:
+            list: A list of all user instances, or of rows holding only the
+            requested columns.
+        """
+        return self.user_repo.get_all(columns)
+
+    def get_users_page(self, limit, cursor=None, columns=None):
+        """
+        Retrieve one page of users ordered by creation time.
+
+        Args:
+            limit (int): The maximum number of users to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                user instances.
+
+        Returns:
+            tuple: The list of user instances (or rows) and the next page
+            cursor.
+        """
+        return self.user_repo.get_page(limit, cursor, columns)
+
+    def iter_users(self, batch_size=1000, columns=None):
+        """
+        Iterate over every user without materializing the whole table.
+
+        Args:
+            batch_size (int): The number of users fetched per round trip.
+            columns (iterable): Attribute names to load instead of whole
+                user instances.
+
         Returns:
-            list: A list of all user instances.
+            iterator: The user instances (or rows), ordered by creation time.
         """
-        return self.user_repo.get_all()
+        return self.user_repo.iter_all(batch_size, columns)
     
     def get_all_admins(self):
         """
@@ -100,6 +429,36 @@ class HBnBFacade:
             list: A list of user objects that match the search criteria.
         """
         return self.user_repo.search_users_by_name(name_substring)
+
+    def search_users(self, query, limit, cursor=None, columns=None):
+        """
+        Search the users by substrings of their names and email.
+
+        Args:
+            query (str): Whitespace-separated substrings every user must
+                contain in their first name, last name or email.
+            limit (int): The maximum number of users to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                user instances.
+
+        Returns:
+            tuple: The list of user instances (or rows), best matches first,
+            and the next page cursor.
+
+        Raises:
+            ValueError: If the query is blank or the cursor is malformed.
+        """
+        return self.user_repo.search_users(query, limit, cursor, columns)
+
+    def rebuild_user_search(self):
+        """
+        Rebuild the trigram search index of the users.
+
+        Returns:
+            int: The number of users indexed.
+        """
+        return self.user_repo.rebuild_search_index()
     
     def update_user(self, user_id, user_data):
         """
@@ -111,6 +470,19 @@ class HBnBFacade:
         """
         self.user_repo.update(user_id, user_data)
 
+    def update_users_where(self, filters, user_data):
+        """
+        Update every user matching the filters in a single statement.
+
+        Args:
+            filters (dict): Attribute names mapped to the required value(s).
+            user_data (dict): A dictionary of updated user data.
+
+        Returns:
+            int: The number of users updated.
+        """
+        return self.user_repo.update_where(filters, user_data)
+
     def authenticate_user(self, email, password):
         """
         Authenticate a user using their email and password.
@@ -133,7 +505,20 @@ class HBnBFacade:
         """
         self.user_repo.delete(user_id)
 
+    def delete_users(self, user_ids):
+        """
+        Delete several users in a single statement.
+
+        Args:
+            user_ids (iterable): The IDs of the users to delete.
+
+        Returns:
+            int: The number of users deleted.
+        """
+        return self.user_repo.delete_many(user_ids)
+
 #--------------Amenity facade CRUD ops--------------#
+    @grouped_write
     def create_amenity(self, amenity_data):
         """
         Create an amenity and add it to the repository.
@@ -148,27 +533,78 @@ class HBnBFacade:
         self.amenity_repo.add(amenity)
         return amenity
 
-    def get_amenity(self, amenity_id):
+    def get_amenity(self, amenity_id, load=None):
         """
         Retrieve an amenity by its ID.
 
         Args:
             amenity_id (str): The ID of the amenity to retrieve.
+            load (iterable|dict): Relationships to load with the amenity, e.g.
+                ("places",).
 
         Returns:
             Amenity: The retrieved amenity instance, or None if not found.
         """
-        return self.amenity_repo.get(amenity_id)
+        return self.amenity_repo.get(amenity_id, load)
+
+    def get_amenities(self, amenity_ids, load=None):
+        """
+        Retrieve several amenities by their IDs in as few queries as possible.
+
+        Args:
+            amenity_ids (iterable): The IDs of the amenities to retrieve.
+            load (iterable|dict): Relationships to load with the amenities.
+
+        Returns:
+            list: The Amenity instances found, in the order of amenity_ids.
+        """
+        return self.amenity_repo.get_many(amenity_ids, load)
 
-    def get_all_amenities(self):
+    def get_all_amenities(self, columns=None):
         """
         Retrieve all amenities.
 
+        Args:
+            columns (iterable): Attribute names to load instead of whole
+                amenity instances.
+
         Returns:
-            list: A list of all amenity instances.
+            list: A list of all amenity instances, or of rows holding only the
+            requested columns.
         """
-        return self.amenity_repo.get_all()
+        return self.amenity_repo.get_all(columns)
 
+    def get_amenities_page(self, limit, cursor=None, columns=None):
+        """
+        Retrieve one page of amenities ordered by creation time.
+
+        Args:
+            limit (int): The maximum number of amenities to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                amenity instances.
+
+        Returns:
+            tuple: The list of amenity instances (or rows) and the next page
+            cursor.
+        """
+        return self.amenity_repo.get_page(limit, cursor, columns)
+
+    def iter_amenities(self, batch_size=1000, columns=None):
+        """
+        Iterate over every amenity without materializing the whole table.
+
+        Args:
+            batch_size (int): The number of amenities fetched per round trip.
+            columns (iterable): Attribute names to load instead of whole
+                amenity instances.
+
+        Returns:
+            iterator: The amenity instances (or rows), ordered by creation time.
+        """
+        return self.amenity_repo.iter_all(batch_size, columns)
+
+    @grouped_write
     def update_amenity(self, amenity_id, amenity_data):
         """
         Update an amenity's information.
@@ -179,6 +615,19 @@ class HBnBFacade:
         """
         self.amenity_repo.update(amenity_id, amenity_data)
 
+    def update_amenities_where(self, filters, amenity_data):
+        """
+        Update every amenity matching the filters in a single statement.
+
+        Args:
+            filters (dict): Attribute names mapped to the required value(s).
+            amenity_data (dict): A dictionary of updated amenity data.
+
+        Returns:
+            int: The number of amenities updated.
+        """
+        return self.amenity_repo.update_where(filters, amenity_data)
+
     def search_amenity_by_name(self, name):
         """
         Retrieve an amenity by its name.
@@ -191,6 +640,7 @@ class HBnBFacade:
         """
         return self.amenity_repo.get_amenity_by_name(name)
     
+    @grouped_write
     def delete_amenity(self, amenity_id):
         """
         Delete an amenity by its ID.
@@ -200,42 +650,181 @@ class HBnBFacade:
         """
         self.amenity_repo.delete(amenity_id)
 
+    def delete_amenities(self, amenity_ids):
+        """
+        Delete several amenities in a single statement.
+
+        Args:
+            amenity_ids (iterable): The IDs of the amenities to delete.
+
+        Returns:
+            int: The number of amenities deleted.
+        """
+        return self.amenity_repo.delete_many(amenity_ids)
+
 #--------------Place facade CRUD ops--------------#
+    @grouped_write
     def create_place(self, place_data):
         """
         Create a place and add it to the repository.
 
+        The place and its amenities are written in one transaction, so an
+        unknown amenity leaves no place behind.
+
         Args:
-            place_data (dict): A dictionary containing place data.
+            place_data (dict): A dictionary containing place data, with an
+                optional "amenities" list of amenity IDs or {"id": ...} dicts.
 
         Returns:
             Place: The created place instance.
-        """
-        place = Place(**place_data)
-        self.place_repo.add(place)
+
+        Raises:
+            ValueError: If an amenity does not exist.
+        """
+        place_data = dict(place_data)
+        amenity_ids = [
+            amenity["id"] if isinstance(amenity, dict) else amenity
+            for amenity in place_data.pop("amenities", None) or []
+        ]
+        with self.unit_of_work():
+            place = Place(**place_data)
+            self.place_repo.add(place)
+            self._update_index(self.place_catalog, "upsert", place.id, place.created_at,
+                               place.price, place.latitude, place.longitude)
+            self._update_index(self.nearby_index, "upsert", place.id, place.latitude, place.longitude)
+            if amenity_ids:
+                amenities = self.get_amenities(amenity_ids)
+                found = {amenity.id for amenity in amenities}
+                missing = [amenity_id for amenity_id in amenity_ids if amenity_id not in found]
+                if missing:
+                    raise ValueError(f"Amenity not found: {', '.join(missing)}")
+                place.amenities = amenities
         return place
 
-    def get_place(self, place_id):
+    def create_places_bulk(self, places_data, chunk_size=500):
+        """
+        Create many places, committing them in chunks.
+
+        Args:
+            places_data (iterable): Dictionaries containing place data.
+            chunk_size (int): The number of places committed per transaction.
+
+        Returns:
+            tuple: The list of created places and a list of per-row errors.
+        """
+        created, errors = self._create_bulk(self.place_repo, Place, places_data, chunk_size)
+        # The created places are expired by their commits; reloading the
+        # indexes once is cheaper than refreshing the places one by one
+        self._update_index(self.place_catalog, "invalidate")
+        self._update_index(self.nearby_index, "invalidate")
+        return created, errors
+
+    def get_place(self, place_id, load=None):
         """
         Retrieve a place by its ID.
 
         Args:
             place_id (str): The ID of the place to retrieve.
+            load (iterable|dict): Relationships to load with the place, e.g.
+                ("owner", "amenities", "reviews.user").
 
         Returns:
             Place: The retrieved place instance, or None if not found.
         """
-        return self.place_repo.get(place_id)
+        return self.place_repo.get(place_id, load)
+
+    def get_places(self, place_ids, load=None):
+        """
+        Retrieve several places by their IDs in as few queries as possible.
 
-    def get_all_places(self):
+        Args:
+            place_ids (iterable): The IDs of the places to retrieve.
+            load (iterable|dict): Relationships to load with the places.
+
+        Returns:
+            list: The Place instances found, in the order of place_ids.
+        """
+        return self.place_repo.get_many(place_ids, load)
+
+    def get_all_places(self, columns=None):
         """
         Retrieve all places.
 
+        Args:
+            columns (iterable): Attribute names to load instead of whole
+                place instances.
+
         Returns:
-            list: A list of all place instances.
+            list: A list of all place instances, or of rows holding only the
+            requested columns.
+        """
+        return self.place_repo.get_all(columns)
+
+    def get_places_page(self, limit, cursor=None, columns=None):
         """
-        return self.place_repo.get_all()
+        Retrieve one page of places ordered by creation time.
+
+        Args:
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                place instances.
+
+        Returns:
+            tuple: The list of place instances (or rows) and the next page
+            cursor.
+        """
+        return self.place_repo.get_page(limit, cursor, columns)
+
+    def filter_places(self, limit, cursor=None, columns=None, min_price=None,
+                      max_price=None, bbox=None, min_rating=None):
+        """
+        Retrieve one page of the places matching every given filter,
+        ordered by creation time.
+
+        The place catalog answers when it is enabled, otherwise the filters
+        run as SQL. Both page the same way and accept each other's cursors.
+
+        Args:
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                place instances when the database answers.
+            min_price (float): The minimum price, inclusive.
+            max_price (float): The maximum price, inclusive.
+            bbox (tuple): A (min_lon, min_lat, max_lon, max_lat) box the
+                places must lie in, edges included.
+            min_rating (float): The minimum average rating.
+
+        Returns:
+            tuple: The list of place instances (or rows) and the next page
+            cursor.
 
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        filters = {"min_price": min_price, "max_price": max_price,
+                   "bbox": bbox, "min_rating": min_rating}
+        if self.place_catalog is None:
+            return self.place_repo.get_filtered_page(limit, cursor, columns, **filters)
+        place_ids, next_cursor = self.place_catalog.query(limit, cursor, **filters)
+        return self.get_places(place_ids), next_cursor
+
+    def iter_places(self, batch_size=1000, columns=None):
+        """
+        Iterate over every place without materializing the whole table.
+
+        Args:
+            batch_size (int): The number of places fetched per round trip.
+            columns (iterable): Attribute names to load instead of whole
+                place instances.
+
+        Returns:
+            iterator: The place instances (or rows), ordered by creation time.
+        """
+        return self.place_repo.iter_all(batch_size, columns)
+
+    @grouped_write
     def update_place(self, place_id, place_data):
         """
         Update a place's information.
@@ -244,7 +833,33 @@ class HBnBFacade:
             place_id (str): The ID of the place to update.
             place_data (dict): A dictionary of updated place data.
         """
-        self.place_repo.update(place_id, place_data)
+        with self.unit_of_work():
+            self.place_repo.update(place_id, place_data)
+            # Already in the session, so this does not query the database
+            place = self.place_repo.get(place_id)
+            if place is not None:
+                self._update_index(self.place_catalog, "upsert", place.id, place.created_at,
+                                   place.price, place.latitude, place.longitude)
+                self._update_index(self.nearby_index, "upsert", place.id, place.latitude,
+                                   place.longitude)
+
+    def update_places_where(self, filters, place_data):
+        """
+        Update every place matching the filters in a single statement.
+
+        Args:
+            filters (dict): Attribute names mapped to the required value(s).
+            place_data (dict): A dictionary of updated place data.
+
+        Returns:
+            int: The number of places updated.
+        """
+        updated = self.place_repo.update_where(filters, place_data)
+        if updated and {"price", "latitude", "longitude"} & set(place_data):
+            self._update_index(self.place_catalog, "invalidate")
+        if updated and {"latitude", "longitude"} & set(place_data):
+            self._update_index(self.nearby_index, "invalidate")
+        return updated
 
     def get_places_by_owner(self, owner_id):
         """
@@ -271,6 +886,69 @@ class HBnBFacade:
         """
         return self.place_repo.get_places_by_price_range(min_price, max_price)
 
+    def get_places_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Retrieve the places inside a bounding box, such as a map viewport.
+
+        Args:
+            min_lon (float): The western edge of the box.
+            min_lat (float): The southern edge of the box.
+            max_lon (float): The eastern edge of the box.
+            max_lat (float): The northern edge of the box.
+
+        Returns:
+            list: A list of Place objects located in the box, edges included.
+        """
+        return self.place_repo.get_places_in_bbox(min_lon, min_lat, max_lon, max_lat)
+
+    def get_nearby_places(self, latitude, longitude, k, max_km=None):
+        """
+        Retrieve the places closest to a point by great-circle distance.
+
+        Args:
+            latitude (float): The latitude of the point.
+            longitude (float): The longitude of the point.
+            k (int): The maximum number of places to return.
+            max_km (float): Only return places at most this many kilometres
+                away, if given.
+
+        Returns:
+            list: (Place, distance in km) tuples, closest first.
+        """
+        nearest = self.nearby_index.nearest(latitude, longitude, k, max_km)
+        places = {place.id: place for place in self.get_places([place_id for place_id, _ in nearest])}
+        return [(places[place_id], distance) for place_id, distance in nearest if place_id in places]
+
+    def search_places(self, query, limit, cursor=None, columns=None):
+        """
+        Full-text search the place titles and descriptions.
+
+        Args:
+            query (str): The search terms; a term ending with * matches
+                every word starting with it.
+            limit (int): The maximum number of places to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                place instances.
+
+        Returns:
+            tuple: The list of place instances (or rows), best matches
+            first, and the next page cursor.
+
+        Raises:
+            ValueError: If the query has no term or the cursor is malformed.
+        """
+        return self.place_repo.search_places(query, limit, cursor, columns)
+
+    def rebuild_place_search(self):
+        """
+        Rebuild the full-text search index of the places.
+
+        Returns:
+            int: The number of places indexed.
+        """
+        return self.place_repo.rebuild_search_index()
+
     def search_places_by_title(self, title_substring):
         """
         Search for places by a partial title match (case-insensitive).
@@ -285,7 +963,7 @@ class HBnBFacade:
 
     def get_average_rating_for_place(self, place_id):
         """
-        Calculate the average rating for a given place based on its reviews.
+        Get the average rating of a place from its stored review aggregates.
 
         Args:
             place_id (str): The ID of the place.
@@ -294,11 +972,58 @@ class HBnBFacade:
             float: The average rating, or None if the place has no reviews.
         """
         place = self.get_place(place_id)
-        if not place or not place.reviews:
-            return None
-        ratings = [self.review_repo.get(review.id)._rating for review in place.reviews]
-        return sum(ratings) / len(ratings) if ratings else None
+        return place.average_rating if place else None
+
+    def get_ratings_for_places(self, place_ids):
+        """
+        Get the average rating and number of reviews of several places in
+        a single query.
+
+        Args:
+            place_ids (iterable): The IDs of the places.
+
+        Returns:
+            dict: The ID of every place found mapped to an (average rating,
+            review count) tuple; the average is None without reviews.
+        """
+        return {
+            place_id: (average_rating(rating_sum, review_count), review_count)
+            for place_id, review_count, rating_sum in self.place_repo.get_rating_totals(place_ids)
+        }
+
+    def get_all_places_with_ratings(self):
+        """
+        Retrieve every place with its average rating and number of reviews.
+
+        Returns:
+            list: (place, average rating, review count) rows.
+        """
+        return self.place_repo.get_all_with_ratings()
+
+    def reconcile_place_ratings(self, place_ids=None):
+        """
+        Recompute the review aggregates stored on places from the reviews.
+
+        Args:
+            place_ids (iterable): The IDs of the places to recompute, or None
+                for every place.
+
+        Returns:
+            int: The number of places whose aggregates were wrong.
+        """
+        if place_ids is not None:
+            place_ids = set(place_ids)
+        with self.unit_of_work():
+            corrected = self.place_repo.reconcile_ratings(place_ids)
+            self.place_repo.invalidate(place_ids)
+            if place_ids is None:
+                self._update_index(self.place_catalog, "invalidate")
+            elif corrected and self.place_catalog is not None:
+                totals = self.place_repo.get_rating_totals(place_ids)
+                self._update_index(self.place_catalog, "set_ratings", totals)
+        return corrected
     
+    @grouped_write
     def delete_place(self, place_id):
         """
         Delete a place by its ID.
@@ -307,8 +1032,27 @@ class HBnBFacade:
             place_id (str): The ID of the place to delete.
         """
         self.place_repo.delete(place_id)
+        self._update_index(self.place_catalog, "remove", [place_id])
+        self._update_index(self.nearby_index, "remove", [place_id])
+
+    def delete_places(self, place_ids):
+        """
+        Delete several places in a single statement.
+
+        Args:
+            place_ids (iterable): The IDs of the places to delete.
+
+        Returns:
+            int: The number of places deleted.
+        """
+        place_ids = list(place_ids)
+        deleted = self.place_repo.delete_many(place_ids)
+        self._update_index(self.place_catalog, "remove", place_ids)
+        self._update_index(self.nearby_index, "remove", place_ids)
+        return deleted
 
 #--------------Review facade CRUD ops--------------#
+    @grouped_write
     def create_review(self, review_data):
         """
         Create a review and add it to the repository.
@@ -320,30 +1064,120 @@ class HBnBFacade:
             Review: The created review instance.
         """
         review = Review(**review_data)
-        self.review_repo.add(review)
+        place_id, rating = review.place_id, review.rating
+        with self.unit_of_work():
+            self.review_repo.add(review)
+            self._add_ratings(place_id, added=[rating])
+        self._update_index(self.place_catalog, "add_rating", place_id, rating)
         return review
 
-    def get_review(self, review_id):
+    def _add_ratings(self, place_id, added=(), removed=()):
+        """
+        Adjust the review aggregates of a place within the current unit of
+        work and drop its cached copy.
+
+        Args:
+            place_id (str): The ID of the reviewed place.
+            added (iterable): The ratings of the reviews added to the place.
+            removed (iterable): The ratings of the reviews removed from it.
+        """
+        self.place_repo.add_ratings(place_id, added, removed)
+        self.place_repo.invalidate([place_id])
+
+    def create_reviews_bulk(self, reviews_data, chunk_size=500):
+        """
+        Create many reviews, committing them in chunks.
+
+        Args:
+            reviews_data (iterable): Dictionaries containing review data.
+            chunk_size (int): The number of reviews committed per transaction.
+
+        Returns:
+            tuple: The list of created reviews and a list of per-row errors.
+        """
+        reviews_data = list(reviews_data)
+        created, errors = self._create_bulk(self.review_repo, Review, reviews_data, chunk_size)
+        # The chunks are committed separately, so the aggregates of the
+        # reviewed places are recomputed once they are all in. The place IDs
+        # come from the input rows: the committed reviews are expired, and
+        # reading them back would cost a SELECT per review
+        failed = {err["index"] for err in errors}
+        self.reconcile_place_ratings({row["place_id"] for index, row in enumerate(reviews_data)
+                                      if index not in failed})
+        return created, errors
+
+    def get_review(self, review_id, load=None):
         """
         Retrieve a review by its ID.
 
         Args:
             review_id (str): The ID of the review to retrieve.
+            load (iterable|dict): Relationships to load with the review, e.g.
+                ("user", "place").
 
         Returns:
             Review: The retrieved review instance, or None if not found.
         """
-        return self.review_repo.get(review_id)
+        return self.review_repo.get(review_id, load)
 
-    def get_all_reviews(self):
+    def get_reviews(self, review_ids, load=None):
+        """
+        Retrieve several reviews by their IDs in as few queries as possible.
+
+        Args:
+            review_ids (iterable): The IDs of the reviews to retrieve.
+            load (iterable|dict): Relationships to load with the reviews.
+
+        Returns:
+            list: The Review instances found, in the order of review_ids.
+        """
+        return self.review_repo.get_many(review_ids, load)
+
+    def get_all_reviews(self, columns=None):
         """
         Retrieve all reviews.
 
+        Args:
+            columns (iterable): Attribute names to load instead of whole
+                review instances.
+
+        Returns:
+            list: A list of all review instances, or of rows holding only the
+            requested columns.
+        """
+        return self.review_repo.get_all(columns)
+
+    def get_reviews_page(self, limit, cursor=None, columns=None):
+        """
+        Retrieve one page of reviews ordered by creation time.
+
+        Args:
+            limit (int): The maximum number of reviews to return.
+            cursor (str): The cursor returned with the previous page, if any.
+            columns (iterable): Attribute names to load instead of whole
+                review instances.
+
+        Returns:
+            tuple: The list of review instances (or rows) and the next page
+            cursor.
+        """
+        return self.review_repo.get_page(limit, cursor, columns)
+
+    def iter_reviews(self, batch_size=1000, columns=None):
+        """
+        Iterate over every review without materializing the whole table.
+
+        Args:
+            batch_size (int): The number of reviews fetched per round trip.
+            columns (iterable): Attribute names to load instead of whole
+                review instances.
+
         Returns:
-            list: A list of all review instances.
+            iterator: The review instances (or rows), ordered by creation time.
         """
-        return self.review_repo.get_all()
+        return self.review_repo.iter_all(batch_size, columns)
 
+    @grouped_write
     def update_review(self, review_id, review_data):
         """
         Update a review's information.
@@ -352,8 +1186,49 @@ class HBnBFacade:
             review_id (str): The ID of the review to update.
             review_data (dict): A dictionary of updated review data.
         """
-        self.review_repo.update(review_id, review_data)
+        if "rating" not in review_data and "place_id" not in review_data:
+            self.review_repo.update(review_id, review_data)
+            return
+        with self.unit_of_work():
+            review = self.review_repo.get(review_id)
+            if review is None:
+                return
+            old_place_id, old_rating = review.place_id, review.rating
+            self.review_repo.update(review_id, review_data)
+            review = self.review_repo.get(review_id)
+            if review.place_id == old_place_id:
+                self._add_ratings(old_place_id, added=[review.rating], removed=[old_rating])
+                self._update_index(self.place_catalog, "add_rating", old_place_id,
+                                   review.rating - old_rating, 0)
+            else:
+                self._add_ratings(old_place_id, removed=[old_rating])
+                self._add_ratings(review.place_id, added=[review.rating])
+                self._update_index(self.place_catalog, "add_rating", old_place_id, -old_rating, -1)
+                self._update_index(self.place_catalog, "add_rating", review.place_id, review.rating)
+
+    def update_reviews_where(self, filters, review_data):
+        """
+        Update every review matching the filters in a single statement.
 
+        Args:
+            filters (dict): Attribute names mapped to the required value(s).
+            review_data (dict): A dictionary of updated review data.
+
+        Returns:
+            int: The number of reviews updated.
+        """
+        if "rating" not in review_data and "place_id" not in review_data:
+            return self.review_repo.update_where(filters, review_data)
+        with self.unit_of_work():
+            place_ids = self.review_repo.get_place_ids_where(filters)
+            updated = self.review_repo.update_where(filters, review_data)
+            if "place_id" in review_data:
+                place_ids.add(review_data["place_id"])
+            if updated:
+                self.reconcile_place_ratings(place_ids)
+        return updated
+
+    @grouped_write
     def delete_review(self, review_id):
         """
         Delete a review by its ID.
@@ -361,7 +1236,33 @@ class HBnBFacade:
         Args:
             review_id (str): The ID of the review to delete.
         """
-        self.review_repo.delete(review_id)
+        with self.unit_of_work():
+            review = self.review_repo.get(review_id)
+            if review is None:
+                return
+            place_id, rating = review.place_id, review.rating
+            self.review_repo.delete(review_id)
+            self._add_ratings(place_id, removed=[rating])
+        self._update_index(self.place_catalog, "add_rating", place_id, -rating, -1)
+
+    def delete_reviews(self, review_ids):
+        """
+        Delete several reviews in a single statement.
+
+        Args:
+            review_ids (iterable): The IDs of the reviews to delete.
+
+        Returns:
+            int: The number of reviews deleted.
+        """
+        review_ids = list(review_ids)
+        if not review_ids:
+            return 0
+        with self.unit_of_work():
+            place_ids = self.review_repo.get_place_ids_where({"id": review_ids})
+            deleted = self.review_repo.delete_many(review_ids)
+            self.reconcile_place_ratings(place_ids)
+        return deleted
 
     def get_reviews_by_place(self, place_id):
         """
@@ -375,6 +1276,19 @@ class HBnBFacade:
         """
         return self.review_repo.get_reviews_by_place_id(place_id)
 
+    def get_review_by_place_and_user(self, place_id, user_id):
+        """
+        Retrieve the review a user wrote for a place.
+
+        Args:
+            place_id (str): The ID of the place.
+            user_id (str): The ID of the user.
+
+        Returns:
+            Review: The review if found, otherwise None.
+        """
+        return self.review_repo.get_review_by_place_and_user(place_id, user_id)
+
     def get_reviews_by_user(self, user_id):
         """
         Retrieve all reviews written by a specified user.
@@ -60,7 +60,7 @@ function populatePriceFilter() {
 
 // Function to fetch places data from the API
 /* Need to find a way to only fetch places if in the index.html page */
-async function fetchPlaces(token = null) {
+async function fetchPlaces(token = null, maxPrice = null) {
     try {
         const headers = {
             'Content-Type': 'application/json'
@@ -69,17 +69,33 @@ async function fetchPlaces(token = null) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch('/api/v1/places', {
-            method: 'GET',
-            headers: headers
-        });
+        // The list endpoint is paginated: follow next_cursor until the last page
+        const places = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams();
+            if (maxPrice !== null) {
+                params.set('max_price', maxPrice);
+            }
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+            const query = params.toString() ? `?${params}` : '';
+            const response = await fetch(`/api/v1/places/${query}`, {
+                method: 'GET',
+                headers: headers
+            });
+
+            if (!response.ok) {
+                console.error('Failed to fetch places:', response.statusText);
+                return;
+            }
+            const page = await response.json();
+            places.push(...page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
 
-        if (response.ok) {
-            const places = await response.json();
-            displayPlaces(places);
-        } else {
-            console.error('Failed to fetch places:', response.statusText);
-        }
+        displayPlaces(places);
     } catch (error) {
         console.error('Error fetching places:', error);
     }
@@ -113,7 +129,7 @@ function displayPlaces(places) {
     });
 }
 
-// Function to set up client-side filtering
+// Function to set up the price filter, applied by the API (max_price)
 function setupPriceFilter() {
     const priceFilter = document.getElementById('price-filter');
     if (!priceFilter) {
@@ -122,18 +138,7 @@ function setupPriceFilter() {
 
     priceFilter.addEventListener('change', (event) => {
         const selectedPrice = event.target.value;
-        const placesList = document.querySelectorAll('.place-card');
-
-        placesList.forEach(placeCard => {
-            const priceText = placeCard.querySelector('.place-price').textContent;
-            const price = parseFloat(priceText.replace('Price: $', ''));
-
-            if (selectedPrice === 'all' || price <= parseFloat(selectedPrice)) {
-                placeCard.style.display = 'block';
-            } else {
-                placeCard.style.display = 'none';
-            }
-        });
+        fetchPlaces(getCookie('token'), selectedPrice === 'all' ? null : selectedPrice);
     });
 }
 
@@ -0,0 +1,94 @@
+"""
+Time bounding-box queries through the R*Tree index against the full scan
+done by the plain coordinate range predicates.
+
+Usage:
+    python -m benchmarks.bench_bbox [--places N] [--repeat N]
+"""
+import argparse
+import random
+import statistics
+import time
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, insert_places
+
+
+# Box side lengths in degrees, from a street-level viewport to a country
+BOX_SIZES = (0.1, 1.0, 10.0)
+
+LIST_PAGE_SIZE = 50
+
+
+def boxes(size, repeat, seed=0):
+    """
+    Generate random boxes of the given side length.
+
+    Returns:
+        list: (min_lon, min_lat, max_lon, max_lat) tuples.
+    """
+    rng = random.Random(seed)
+    result = []
+    for _ in range(repeat):
+        lon = rng.uniform(-179.0, 179.0 - size)
+        lat = rng.uniform(-89.0, 89.0 - size)
+        result.append((lon, lat, lon + size, lat + size))
+    return result
+
+
+def measure(size, repeat):
+    """
+    Time get_places_in_bbox and the first page of the filtered list.
+
+    Returns:
+        tuple: The median seconds of both queries and the mean number of
+        places found per box.
+    """
+    whole, page, found = [], [], []
+    for box in boxes(size, repeat):
+        started = time.perf_counter()
+        found.append(len(facade.get_places_in_bbox(*box)))
+        whole.append(time.perf_counter() - started)
+        db.session.remove()
+
+        started = time.perf_counter()
+        facade.place_repo.get_filtered_page(LIST_PAGE_SIZE, columns=("id",), bbox=box)
+        page.append(time.perf_counter() - started)
+        db.session.remove()
+    return statistics.median(whole), statistics.median(page), statistics.mean(found)
+
+
+def run(places, repeat):
+    """
+    Seed a database, then time the boxes with the R*Tree index and again
+    after dropping it.
+
+    Args:
+        places (int): The number of places to seed.
+        repeat (int): The number of boxes timed per size.
+    """
+    with bench_app():
+        insert_places(places)
+        with_rtree = {size: measure(size, repeat) for size in BOX_SIZES}
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE places_rtree")
+        facade.place_repo._tables.clear()
+        full_scan = {size: measure(size, max(1, repeat // 10)) for size in BOX_SIZES}
+
+    print(f"{places} places, median of {repeat} boxes ({max(1, repeat // 10)} for the scan)")
+    print(f"{'box':>8} {'places':>8} {'rtree all':>10} {'scan all':>10} "
+          f"{'rtree page':>11} {'scan page':>10}")
+    for size in BOX_SIZES:
+        rtree_all, rtree_page, found = with_rtree[size]
+        scan_all, scan_page, _ = full_scan[size]
+        print(f"{size:6g}deg {found:8.1f} {rtree_all * 1e3:8.2f}ms {scan_all * 1e3:8.2f}ms "
+              f"{rtree_page * 1e3:9.2f}ms {scan_page * 1e3:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    run(args.places, args.repeat)
@@ -0,0 +1,46 @@
+"""
+Compare one-commit-per-row inserts against HBnBFacade.create_places_bulk.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert [--rows N] [--chunk-sizes 100,500,2000]
+"""
+import argparse
+from app.services import facade
+from benchmarks.common import bench_app, owner_row, place_rows, timer
+
+
+def run(rows, chunk_sizes):
+    """
+    Insert the same number of places with each strategy and print rows/sec.
+
+    Args:
+        rows (int): The number of places inserted per strategy.
+        chunk_sizes (list): The chunk sizes to benchmark the bulk path with.
+    """
+    results = {}
+    with bench_app():
+        owner = facade.create_user(owner_row())
+        data = place_rows(rows, owner.id)
+        with timer(results, "create_place (1 commit/row)"):
+            for row in data:
+                facade.create_place(row)
+
+    for chunk_size in chunk_sizes:
+        with bench_app():
+            owner = facade.create_user(owner_row())
+            data = place_rows(rows, owner.id)
+            with timer(results, f"create_places_bulk (chunk_size={chunk_size})"):
+                created, errors = facade.create_places_bulk(data, chunk_size=chunk_size)
+            assert len(created) == rows and not errors
+
+    print(f"{'strategy':<40}{'seconds':>10}{'rows/sec':>12}")
+    for label, seconds in results.items():
+        print(f"{label:<40}{seconds:>10.3f}{rows / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-sizes", default="100,500,2000")
+    args = parser.parse_args()
+    run(args.rows, [int(size) for size in args.chunk_sizes.split(",")])
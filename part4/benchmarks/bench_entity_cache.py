@@ -0,0 +1,73 @@
+"""
+Compare facade.get_place/get_user latency with the entity cache on and off.
+
+Every lookup runs in a fresh session, like one lookup per request.
+
+Usage:
+    python -m benchmarks.bench_entity_cache [--places N] [--lookups N]
+"""
+import argparse
+import random
+import statistics
+import time
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, owner_row, place_rows
+
+
+def lookup_latencies(ids, owner_id, lookups):
+    """
+    Time random place lookups, each followed by a lookup of the owner.
+
+    Args:
+        ids (list): The place IDs to pick from.
+        owner_id (str): The ID of the places' owner.
+        lookups (int): The number of lookups to time.
+
+    Returns:
+        list: The latency of each lookup in microseconds.
+    """
+    rng = random.Random(42)
+    latencies = []
+    for _ in range(lookups):
+        place_id = rng.choice(ids)
+        start = time.perf_counter()
+        facade.get_place(place_id)
+        facade.get_user(owner_id)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        db.session.remove()
+    return latencies
+
+
+def run(places, lookups):
+    """
+    Seed places and measure lookups without and with the cache.
+
+    Args:
+        places (int): The number of places to seed.
+        lookups (int): The number of lookups per run.
+    """
+    with bench_app() as app:
+        owner = facade.create_user(owner_row())
+        owner_id = owner.id
+        created, _ = facade.create_places_bulk(place_rows(places, owner_id), chunk_size=5000)
+        ids = [place.id for place in created]
+        db.session.remove()
+
+        print(f"{'cache':<10}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+        for enabled in (False, True):
+            facade.init_cache(dict(app.config, ENTITY_CACHE_ENABLED=enabled))
+            latencies = sorted(lookup_latencies(ids, owner_id, lookups))
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(f"{'on' if enabled else 'off':<10}{statistics.mean(latencies):>10.0f}"
+                  f"{statistics.median(latencies):>10.0f}{p99:>10.0f}")
+        print("cache stats:", facade.cache_stats())
+        facade.init_cache(app.config)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.places, args.lookups)
@@ -0,0 +1,123 @@
+"""
+Send concurrent review POSTs with and without the group commit writer,
+under both SQLite journal modes, and compare the write throughput.
+
+Usage:
+    python -m benchmarks.bench_group_commit [--clients N] [--reviews N] [--window-ms N]
+"""
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from app.extensions import bcrypt, db
+from app.models.user import User
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles
+from config import SQLITE_PERFORMANCE_PRAGMAS, engine_options
+
+
+PROFILES = {
+    "rollback journal": {},
+    "WAL": SQLITE_PERFORMANCE_PRAGMAS,
+}
+
+
+def insert_clients(count):
+    """
+    Insert the users posting the reviews and sign a token for each.
+
+    Returns:
+        list: The JWT access tokens.
+    """
+    password = bcrypt.generate_password_hash("benchmark").decode("utf-8")
+    now = datetime.utcnow()
+    users = [{
+        "id": str(uuid.uuid4()), "first_name": "Bench", "last_name": "Client",
+        "email": f"client{i}@example.com", "password": password, "is_admin": False,
+        "created_at": now, "updated_at": now
+    } for i in range(count)]
+    db.session.execute(db.insert(User.__table__), users)
+    db.session.commit()
+    return [create_access_token(identity=user["id"], additional_claims={"is_admin": False})
+            for user in users]
+
+
+def post_reviews(app, token, place_ids, latencies, failures, start):
+    """
+    POST a review of every place, one after the other, as one client.
+    """
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    start.wait()
+    for index, place_id in enumerate(place_ids):
+        started = time.perf_counter()
+        response = client.post("/api/v1/reviews/", headers=headers, json={
+            "text": "Benchmark review", "rating": 1 + index % 5, "place_id": place_id
+        })
+        if response.status_code == 201:
+            latencies.append(time.perf_counter() - started)
+        else:
+            failures.append(response.status_code)
+
+
+def run(clients, reviews, window_ms):
+    """
+    Time the same burst of review POSTs for every journal mode, with and
+    without group commit.
+
+    Args:
+        clients (int): The number of concurrent clients.
+        reviews (int): The number of reviews posted by each client.
+        window_ms (float): The group commit batching window.
+    """
+    results = {}
+    for profile, pragmas in PROFILES.items():
+        for grouped in (False, True):
+            # One connection per client: with group commit, the waiting
+            # clients return theirs and the writer borrows one of them
+            options = engine_options("sqlite://", clients, 0, pool_timeout=60,
+                                     pool_recycle=1800, statement_timeout_ms=0)
+            with bench_app(SQLALCHEMY_ENGINE_OPTIONS=options, SQLITE_PRAGMAS=pragmas,
+                           GROUP_COMMIT_ENABLED=grouped, GROUP_COMMIT_WINDOW_MS=window_ms,
+                           NEARBY_INDEX_PRELOAD=False) as app:
+                insert_places(reviews, review_every=reviews + 1)
+                place_ids = [place.id for place in facade.get_places_page(reviews, columns=("id",))[0]]
+                tokens = insert_clients(clients)
+                db.session.remove()
+
+                latencies, failures = [], []
+                start = threading.Barrier(clients + 1)
+                threads = [threading.Thread(target=post_reviews,
+                                            args=(app, token, place_ids, latencies, failures, start))
+                           for token in tokens]
+                for thread in threads:
+                    thread.start()
+                start.wait()
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - started
+                batches = facade.group_commit_stats()
+                if facade.group_commit:
+                    facade.group_commit.stop()
+                results[(profile, grouped)] = (latencies, failures, elapsed, batches)
+
+    print(f"{clients} clients posting {reviews} reviews each, group commit window {window_ms:g} ms")
+    print(f"{'journal':17} {'group':>5} {'reviews/s':>10} {'p50':>9} {'p99':>9} "
+          f"{'failed':>7} {'batch':>6}")
+    for (profile, grouped), (latencies, failures, elapsed, batches) in results.items():
+        p50, p99 = percentiles(latencies) if latencies else (0.0, 0.0)
+        batch = f"{batches['mean_batch_size']:6.1f}" if batches else f"{'-':>6}"
+        print(f"{profile:17} {'on' if grouped else 'off':>5} {len(latencies) / elapsed:10.0f} "
+              f"{p50:7.2f}ms {p99:7.2f}ms {len(failures):7} {batch}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--reviews", type=int, default=20)
+    parser.add_argument("--window-ms", type=float, default=2)
+    args = parser.parse_args()
+    run(args.clients, args.reviews, args.window_ms)
@@ -0,0 +1,95 @@
+"""
+Measure k-nearest-place queries on the grid index against a vectorized
+scan of every coordinate.
+
+Usage:
+    python -m benchmarks.bench_nearby [--places N] [--queries N]
+"""
+import argparse
+import math
+import random
+import time
+import numpy as np
+from app.extensions import db
+from app.persistence.nearby_index import haversine_km
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles, timer
+
+
+# (label, k, max_km) of the timed queries
+QUERIES = (
+    ("k=10", 10, None),
+    ("k=10, max_km=50", 10, 50.0),
+    ("k=100", 100, None),
+)
+
+SCAN_QUERIES = 20
+
+
+def points(count, seed=0):
+    """
+    Generate random query points, avoiding the polar caps where the grid
+    cells are narrowest.
+    """
+    rng = random.Random(seed)
+    return [(rng.uniform(-80.0, 80.0), rng.uniform(-180.0, 180.0)) for _ in range(count)]
+
+
+def run(places, queries):
+    """
+    Seed the database, build the index and time the queries.
+
+    Args:
+        places (int): The number of places to seed.
+        queries (int): The number of timed queries per kind.
+    """
+    results = {}
+    with bench_app():
+        with timer(results, "seed"):
+            insert_places(places, review_every=places + 1)
+        with timer(results, "load"):
+            facade.load_nearby_index()
+        index = facade.nearby_index
+
+        coordinates = facade.get_all_places(columns=("latitude", "longitude"))
+        latitudes = np.radians([row.latitude for row in coordinates])
+        longitudes = np.radians([row.longitude for row in coordinates])
+        db.session.remove()
+
+        print(f"{places} places, seeded in {results['seed']:.1f} s, "
+              f"index built in {results['load']:.1f} s")
+        print(f"{'query':18} {'index p50':>10} {'p99':>8} {'+places p50':>12} {'p99':>8} {'scan p50':>9}")
+        for label, k, max_km in QUERIES:
+            in_index, with_places, scanned = [], [], []
+            for latitude, longitude in points(queries):
+                started = time.perf_counter()
+                index.nearest(latitude, longitude, k, max_km)
+                in_index.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                facade.get_nearby_places(latitude, longitude, k, max_km)
+                with_places.append(time.perf_counter() - started)
+                db.session.remove()
+
+            for latitude, longitude in points(SCAN_QUERIES):
+                started = time.perf_counter()
+                distances = haversine_km(math.radians(latitude), math.radians(longitude),
+                                         latitudes, longitudes)
+                if max_km is not None:
+                    distances = distances[distances <= max_km]
+                np.sort(np.partition(distances, min(k, len(distances)) - 1)[:k])
+                scanned.append(time.perf_counter() - started)
+
+            index_p50, index_p99 = percentiles(in_index)
+            places_p50, places_p99 = percentiles(with_places)
+            scan_p50, _ = percentiles(scanned)
+            print(f"{label:18} {index_p50:8.3f}ms {index_p99:6.3f}ms "
+                  f"{places_p50:10.3f}ms {places_p99:6.3f}ms {scan_p50:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.places, args.queries)
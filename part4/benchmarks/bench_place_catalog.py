@@ -0,0 +1,92 @@
+"""
+Compare the place list filters answered by the NumPy place catalog with
+the same filters run as SQL.
+
+Usage:
+    python -m benchmarks.bench_place_catalog [--places N] [--repeat N]
+"""
+import argparse
+import random
+import time
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles, timer
+
+
+# Filter combinations timed, from unselective to very selective
+FILTERS = {
+    "price <= 100": {"max_price": 100},
+    "price 100-110 + rating >= 4": {"min_price": 100, "max_price": 110, "min_rating": 4},
+    "bbox 10x10 deg": {"bbox": (0, 0, 10, 10)},
+    "price + bbox + rating": {"min_price": 50, "max_price": 300,
+                              "bbox": (-40, -20, 40, 20), "min_rating": 3},
+}
+
+
+def time_queries(query, repeat):
+    """
+    Time a filter query on the first page and on deeper pages.
+
+    Args:
+        query (callable): A function taking a cursor and returning a page
+            and the next cursor.
+        repeat (int): The number of pages fetched.
+
+    Returns:
+        list: The duration of every page fetch, in seconds.
+    """
+    samples = []
+    cursor = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, cursor = query(cursor)
+        samples.append(time.perf_counter() - started)
+        db.session.remove()
+        if cursor is None or random.random() < 0.5:
+            cursor = None
+    return samples
+
+
+def run(places, repeat):
+    """
+    Seed the database and time every filter combination with and without
+    the catalog.
+
+    Args:
+        places (int): The number of places to seed.
+        repeat (int): The number of timed queries per combination.
+    """
+    results = {}
+    with bench_app():
+        with timer(results, "seed"):
+            insert_places(places)
+
+        facade.init_place_catalog({"PLACE_CATALOG_ENABLED": True})
+        catalog = facade.place_catalog
+        with timer(results, "load"):
+            len(catalog)
+
+        print(f"{places} places, seeded in {results['seed']:.1f} s, "
+              f"catalog loaded in {results['load']:.1f} s")
+        print(f"{'filters':30} {'catalog p50':>12} {'p99':>8} {'SQL p50':>10} {'p99':>8}")
+        for label, filters in FILTERS.items():
+            in_catalog = time_queries(
+                lambda cursor: catalog.query(50, cursor, **filters), repeat
+            )
+            in_sql = time_queries(
+                lambda cursor: facade.place_repo.get_filtered_page(50, cursor, ("id",), **filters),
+                max(1, repeat // 10)
+            )
+            catalog_p50, catalog_p99 = percentiles(in_catalog)
+            sql_p50, sql_p99 = percentiles(in_sql)
+            print(f"{label:30} {catalog_p50:10.2f}ms {catalog_p99:6.2f}ms "
+                  f"{sql_p50:8.2f}ms {sql_p99:6.2f}ms")
+        facade.place_catalog = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.places, args.repeat)
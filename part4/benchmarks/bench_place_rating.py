@@ -0,0 +1,150 @@
+"""
+Compare reading a place's average rating from its stored aggregates with
+computing it from the loaded reviews, time the ratings of a whole list
+page, and time the reconciliation.
+
+Usage:
+    python -m benchmarks.bench_place_rating [--places N] [--reviews N] [--repeat N]
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime
+from app.extensions import bcrypt, db
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles, timer
+
+
+# Page size of the place list timings
+PAGE_SIZE = 100
+
+# Columns of the place list page, with and without ?include=rating
+PAGE_COLUMNS = ("id", "title", "latitude", "longitude", "price")
+RATED_PAGE_COLUMNS = PAGE_COLUMNS + ("review_count", "rating_sum")
+
+
+def review_place(place_id, count):
+    """
+    Give a place `count` reviews from as many new users, inserted with Core
+    statements, then recompute its aggregates.
+    """
+    password = bcrypt.generate_password_hash("benchmark").decode("utf-8")
+    now = datetime.utcnow()
+    users = [{
+        "id": str(uuid.uuid4()), "first_name": "Bench", "last_name": "Reviewer",
+        "email": f"reviewer{i}@example.com", "password": password, "is_admin": False,
+        "created_at": now, "updated_at": now
+    } for i in range(count)]
+    reviews = [{
+        "id": str(uuid.uuid4()), "text": "Benchmark review", "rating": 1 + i % 5,
+        "place_id": place_id, "user_id": user["id"], "created_at": now, "updated_at": now
+    } for i, user in enumerate(users)]
+    db.session.execute(db.insert(User.__table__), users)
+    db.session.execute(db.insert(Review.__table__), reviews)
+    db.session.commit()
+    facade.reconcile_place_ratings([place_id])
+
+
+def from_reviews(place_id):
+    """
+    Compute the average rating the way it was done before the aggregates:
+    load the place with its reviews and average their ratings.
+    """
+    place = facade.get_place(place_id, load=("reviews",))
+    ratings = [review.rating for review in place.reviews]
+    return sum(ratings) / len(ratings) if ratings else None
+
+
+def time_calls(repeat, function, *args):
+    """
+    Time repeated calls of a function with a fresh session each time.
+
+    Returns:
+        list: The durations in seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - started)
+        db.session.remove()
+    return samples
+
+
+def page_per_place():
+    """
+    Load a page of places, then ask for the rating of each one.
+    """
+    page, _ = facade.get_places_page(PAGE_SIZE, columns=PAGE_COLUMNS)
+    return [facade.get_average_rating_for_place(place.id) for place in page]
+
+
+def page_batched():
+    """
+    Load a page of places, then the ratings of the page in one query.
+    """
+    page, _ = facade.get_places_page(PAGE_SIZE, columns=PAGE_COLUMNS)
+    return facade.get_ratings_for_places([place.id for place in page])
+
+
+def page_with_columns():
+    """
+    Load a page of places with the aggregate columns, as ?include=rating.
+    """
+    return facade.get_places_page(PAGE_SIZE, columns=RATED_PAGE_COLUMNS)
+
+
+def run(places, reviews, repeat):
+    """
+    Seed the database, then time the ways of reading the average ratings
+    and a full reconciliation.
+
+    Args:
+        places (int): The number of places to seed.
+        reviews (int): The number of reviews of the timed place.
+        repeat (int): The number of timed reads.
+    """
+    results = {}
+    with bench_app():
+        insert_places(places, review_every=1)
+        place_id = facade.get_places_page(1, columns=("id",))[0][0].id
+        review_place(place_id, reviews)
+
+        stored = time_calls(repeat, facade.get_average_rating_for_place, place_id)
+        loaded = time_calls(repeat, from_reviews, place_id)
+        assert facade.get_average_rating_for_place(place_id) == from_reviews(place_id)
+        pages = {
+            "per place": time_calls(repeat, page_per_place),
+            "batched": time_calls(repeat, page_batched),
+            "same query": time_calls(repeat, page_with_columns),
+        }
+
+        with timer(results, "clean"):
+            facade.reconcile_place_ratings()
+        db.session.execute(db.text("UPDATE places SET review_count = 0, rating_sum = 0"))
+        db.session.commit()
+        with timer(results, "drifted"):
+            corrected = facade.reconcile_place_ratings()
+
+    print(f"{places} places with a review each, timed place with {reviews + 1} reviews")
+    print(f"{'average rating':16} {'p50':>8} {'p99':>8}")
+    for label, samples in (("stored", stored), ("from reviews", loaded)):
+        p50, p99 = percentiles(samples)
+        print(f"{label:16} {p50:6.2f}ms {p99:6.2f}ms")
+    print(f"{'page of ' + str(PAGE_SIZE):16} {'p50':>8} {'p99':>8}")
+    for label, samples in pages.items():
+        p50, p99 = percentiles(samples)
+        print(f"{label:16} {p50:6.2f}ms {p99:6.2f}ms")
+    print(f"reconcile: {results['clean']:.2f} s when up to date, "
+          f"{results['drifted']:.2f} s to correct {corrected} places")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=200000)
+    parser.add_argument("--reviews", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.places, args.reviews, args.repeat)
@@ -0,0 +1,115 @@
+"""
+Replay bursts of concurrent requests against SQLAlchemy's default pool
+sizing and the production and benchmark profiles, and report the
+connection checkout waits and pool saturation.
+
+Usage:
+    python -m benchmarks.bench_pool [--places N] [--workers N] [--requests N] [--hold-ms N]
+"""
+import argparse
+import threading
+import time
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles
+from config import BenchmarkConfig, ProductionConfig, engine_options
+
+
+# Pool profiles compared: (pool_size, max_overflow) of each
+PROFILES = {
+    "default 5+10": (5, 10),
+    "production": (ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS["pool_size"],
+                   ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS["max_overflow"]),
+    "benchmark": (BenchmarkConfig.SQLALCHEMY_ENGINE_OPTIONS["pool_size"],
+                  BenchmarkConfig.SQLALCHEMY_ENGINE_OPTIONS["max_overflow"]),
+}
+
+PAGE_COLUMNS = ("id", "title", "latitude", "longitude", "price")
+
+
+def handle_request(app, hold):
+    """
+    Serve one simulated list request: read a page of places, then keep the
+    session, and so its connection, for the rest of the request.
+
+    Returns:
+        float: The duration of the request in seconds.
+    """
+    started = time.perf_counter()
+    with app.app_context():
+        facade.get_places_page(20, columns=PAGE_COLUMNS)
+        time.sleep(hold)
+        db.session.remove()
+    return time.perf_counter() - started
+
+
+def burst(app, workers, requests, hold):
+    """
+    Run the requests on `workers` threads started at once.
+
+    Returns:
+        list: The request durations in seconds.
+    """
+    durations = []
+    lock = threading.Lock()
+    start = threading.Barrier(workers)
+
+    def worker(count):
+        start.wait()
+        for _ in range(count):
+            duration = handle_request(app, hold)
+            with lock:
+                durations.append(duration)
+
+    threads = [threading.Thread(target=worker, args=(requests // workers + (i < requests % workers),))
+               for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return durations
+
+
+def run(places, workers, requests, hold_ms):
+    """
+    Time the same burst against every pool profile.
+
+    Args:
+        places (int): The number of places to seed.
+        workers (int): The number of concurrent workers.
+        requests (int): The total number of requests of the burst.
+        hold_ms (int): The milliseconds each request keeps its connection
+            after its query.
+    """
+    results = {}
+    for label, (pool_size, max_overflow) in PROFILES.items():
+        options = engine_options("sqlite://", pool_size, max_overflow, pool_timeout=60,
+                                 pool_recycle=1800, statement_timeout_ms=0)
+        with bench_app(SQLALCHEMY_ENGINE_OPTIONS=options, NEARBY_INDEX_PRELOAD=False) as app:
+            insert_places(places)
+            db.session.remove()
+            db.engine.pool.metrics.reset()
+            started = time.perf_counter()
+            durations = burst(app, workers, requests, hold_ms / 1e3)
+            elapsed = time.perf_counter() - started
+            results[label] = (pool_size + max_overflow, durations, elapsed, facade.pool_stats())
+
+    print(f"{places} places, {workers} workers, {requests} requests holding "
+          f"their connection {hold_ms} ms")
+    print(f"{'pool':13} {'cap':>4} {'req/s':>7} {'req p50':>9} {'req p99':>9} "
+          f"{'wait mean':>10} {'wait p99':>9} {'wait max':>9} {'peak':>5}")
+    for label, (capacity, durations, elapsed, stats) in results.items():
+        p50, p99 = percentiles(durations)
+        print(f"{label:13} {capacity:4} {len(durations) / elapsed:7.0f} {p50:7.2f}ms {p99:7.2f}ms "
+              f"{stats['wait_ms_total'] / stats['checkouts']:8.2f}ms {stats['wait_ms_p99']:7.2f}ms "
+              f"{stats['wait_ms_max']:7.2f}ms {stats['peak_saturation']:5.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=48)
+    # At most WAIT_SAMPLES requests, so that the wait p99 covers the burst
+    parser.add_argument("--requests", type=int, default=960)
+    parser.add_argument("--hold-ms", type=int, default=20)
+    args = parser.parse_args()
+    run(args.places, args.workers, args.requests, args.hold_ms)
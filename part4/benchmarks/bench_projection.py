@@ -0,0 +1,71 @@
+"""
+Compare full ORM hydration against column projection for the place list.
+
+Usage:
+    python -m benchmarks.bench_projection [--rows N]
+"""
+import argparse
+import tracemalloc
+from sqlalchemy import event
+from app.extensions import db
+from app.services import facade
+from app.api.v1.places import PLACE_SUMMARY_COLUMNS, place_summary
+from benchmarks.common import bench_app, owner_row, place_rows, timer
+
+
+def measure(results, label, load):
+    """
+    Run load() and record its duration, peak traced memory and query count.
+
+    Args:
+        results (dict): The dictionary to store the measurements in.
+        label (str): The name of the strategy being measured.
+        load (callable): Loads and serializes the place list.
+    """
+    queries = []
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    db.session.expire_all()
+    tracemalloc.start()
+    timings = {}
+    with timer(timings, label):
+        load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    event.remove(db.engine, "before_cursor_execute", count_query)
+    db.session.remove()
+    results[label] = (timings[label], peak, len(queries))
+
+
+def run(rows):
+    """
+    Seed the places table and measure both ways of listing it.
+
+    Args:
+        rows (int): The number of places to seed.
+    """
+    results = {}
+    with bench_app():
+        owner = facade.create_user(owner_row())
+        facade.create_places_bulk(place_rows(rows, owner.id), chunk_size=5000)
+        db.session.remove()
+
+        measure(results, "get_all() (full objects)",
+                lambda: [place_summary(place) for place in facade.get_all_places()])
+        measure(results, "get_all(columns=...)",
+                lambda: [place_summary(row) for row in facade.get_all_places(PLACE_SUMMARY_COLUMNS)])
+
+    print(f"{rows} places")
+    print(f"{'strategy':<30}{'seconds':>10}{'peak MB':>10}{'queries':>10}")
+    for label, (seconds, peak, queries) in results.items():
+        print(f"{label:<30}{seconds:>10.3f}{peak / 1e6:>10.1f}{queries:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,161 @@
+"""
+Show the query plans and timings of the indexed lookups before and after
+upgrade_sqlite_indexes.py runs on a database that lacks the indexes.
+
+Usage:
+    python -m benchmarks.bench_query_plans [--places N] [--users N]
+"""
+import argparse
+import time
+from sqlalchemy import event
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, place_rows
+from upgrade_sqlite_indexes import upgrade
+
+
+# The indexes a database created before they were declared is missing
+SECONDARY_INDEXES = (
+    "ix_places_owner_id",
+    "ix_places_price",
+    "uq_reviews_place_id_user_id",
+    "ix_reviews_user_id",
+)
+
+REPEAT = 20
+
+
+def seed(places, users):
+    """
+    Create users, places spread over them and one review per place.
+
+    Args:
+        places (int): The number of places to create.
+        users (int): The number of users owning and reviewing the places.
+
+    Returns:
+        tuple: The IDs of a user and of a place to look up.
+    """
+    created, _ = facade.create_users_bulk([{
+        "first_name": "Bench",
+        "last_name": f"User {i}",
+        "email": f"bench.user{i}@example.com",
+        "password": "benchmark"
+    } for i in range(users)])
+    user_ids = [user.id for user in created]
+
+    rows = place_rows(places, None)
+    for i, row in enumerate(rows):
+        row["owner_id"] = user_ids[i % users]
+    created, _ = facade.create_places_bulk(rows, chunk_size=5000)
+    place_ids = [place.id for place in created]
+
+    facade.create_reviews_bulk([{
+        "text": "Benchmark review",
+        "rating": 1 + i % 5,
+        "place_id": place_id,
+        "user_id": user_ids[(i + 1) % users]
+    } for i, place_id in enumerate(place_ids)], chunk_size=5000)
+    db.session.remove()
+    return user_ids[0], place_ids[0]
+
+
+def lookups(user_id, place_id):
+    """
+    Build the repository lookups that filter on the indexed columns.
+
+    Returns:
+        dict: Labels mapped to functions running one lookup.
+    """
+    return {
+        "get_places_by_owner": lambda: facade.get_places_by_owner(user_id),
+        "get_places_by_price_range": lambda: facade.get_places_by_price_range(100, 101),
+        "get_reviews_by_place": lambda: facade.get_reviews_by_place(place_id),
+        "get_reviews_by_user": lambda: facade.get_reviews_by_user(user_id),
+        "get_review_by_place_and_user": lambda: facade.get_review_by_place_and_user(place_id, user_id),
+    }
+
+
+def explain(lookup):
+    """
+    Run a lookup once, capturing its SQL, and return SQLite's plan for it.
+
+    Args:
+        lookup (callable): A function issuing a single SELECT.
+
+    Returns:
+        str: The plan details, one step per line.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    lookup()
+    event.remove(db.engine, "before_cursor_execute", capture)
+    statement, parameters = captured[-1]
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def measure(user_id, place_id):
+    """
+    Collect the plan and mean duration of every lookup.
+
+    Returns:
+        dict: Labels mapped to (plan, mean seconds).
+    """
+    results = {}
+    for label, lookup in lookups(user_id, place_id).items():
+        plan = explain(lookup)
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            lookup()
+            db.session.remove()
+        results[label] = (plan, (time.perf_counter() - start) / REPEAT)
+    return results
+
+
+def run(places, users):
+    """
+    Seed a database, drop the secondary indexes, then measure the lookups
+    before and after the upgrade script restores them.
+
+    Args:
+        places (int): The number of places to seed.
+        users (int): The number of users to seed.
+    """
+    with bench_app():
+        user_id, place_id = seed(places, users)
+        with db.engine.begin() as conn:
+            for name in SECONDARY_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+            conn.exec_driver_sql("ANALYZE")
+        before = measure(user_id, place_id)
+
+        db.session.remove()
+        connection = db.engine.raw_connection()
+        try:
+            upgrade(connection.driver_connection)
+        finally:
+            connection.close()
+        after = measure(user_id, place_id)
+
+    print(f"{places} places, {places} reviews, {users} users")
+    for label in before:
+        plan_before, seconds_before = before[label]
+        plan_after, seconds_after = after[label]
+        print(f"\n{label}: {seconds_before * 1e3:.2f} ms -> {seconds_after * 1e3:.2f} ms")
+        print("  before: " + plan_before.replace("\n", "\n          "))
+        print("  after:  " + plan_after.replace("\n", "\n          "))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    run(args.places, args.users)
@@ -0,0 +1,99 @@
+"""
+Compare the FTS5 place search with the ILIKE scan it replaces.
+
+Usage:
+    python -m benchmarks.bench_search [--places N] [--queries N]
+"""
+import argparse
+import random
+import time
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles
+
+
+VOCABULARY_SIZE = 5000
+TITLE_WORDS = 3
+DESCRIPTION_WORDS = 30
+
+
+def vocabulary(seed=0):
+    """
+    Build a vocabulary of made-up words.
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return sorted({"".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(VOCABULARY_SIZE)})
+
+
+def describer(words):
+    """
+    Build a function giving every place a title and a description drawn
+    from the vocabulary with a Zipf-like skew, as in natural text.
+    """
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+
+    def describe(index):
+        rng = random.Random(index)
+        title = " ".join(rng.choices(words, weights, k=TITLE_WORDS))
+        description = " ".join(rng.choices(words, weights, k=DESCRIPTION_WORDS))
+        return title.capitalize(), description.capitalize() + "."
+
+    return describe
+
+
+def time_search(queries, limit):
+    """
+    Time the first page of every query.
+
+    Returns:
+        list: The durations in seconds.
+    """
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        facade.search_places(query, limit, columns=("id", "title"))
+        samples.append(time.perf_counter() - started)
+        db.session.remove()
+    return samples
+
+
+def run(places, queries):
+    """
+    Seed the database and time the same queries with and without FTS5.
+
+    Args:
+        places (int): The number of places to seed.
+        queries (int): The number of timed queries per kind.
+    """
+    words = vocabulary()
+    rng = random.Random(1)
+    kinds = {
+        "common word": [rng.choice(words[:20]) for _ in range(queries)],
+        "rare word": [rng.choice(words[-1000:]) for _ in range(queries)],
+        "two words": [f"{rng.choice(words[:200])} {rng.choice(words[:200])}" for _ in range(queries)],
+        "prefix": [rng.choice(words[:500])[:3] + "*" for _ in range(queries)],
+    }
+    with bench_app():
+        insert_places(places, review_every=places + 1, describe=describer(words))
+        with_fts = {kind: time_search(batch, 20) for kind, batch in kinds.items()}
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE places_fts")
+        facade.place_repo._tables.clear()
+        scan = {kind: time_search(batch[:max(1, queries // 10)], 20) for kind, batch in kinds.items()}
+
+    print(f"{places} places, first page of 20 results")
+    print(f"{'query':12} {'FTS5 p50':>10} {'p99':>8} {'ILIKE p50':>10} {'p99':>8}")
+    for kind in kinds:
+        fts_p50, fts_p99 = percentiles(with_fts[kind])
+        scan_p50, scan_p99 = percentiles(scan[kind])
+        print(f"{kind:12} {fts_p50:8.2f}ms {fts_p99:6.2f}ms {scan_p50:8.2f}ms {scan_p99:6.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    run(args.places, args.queries)
@@ -0,0 +1,118 @@
+"""
+Run concurrent readers and writers against SQLite with the default rollback
+journal and with the performance profile, and compare throughput, latency
+and "database is locked" errors.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile [--places N] [--readers N] [--writers N] [--seconds N]
+"""
+import argparse
+import random
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.services import facade
+from benchmarks.common import bench_app, insert_places, percentiles
+from config import SQLITE_PERFORMANCE_PRAGMAS, engine_options
+
+
+PROFILES = {
+    "rollback journal": {},
+    "performance": SQLITE_PERFORMANCE_PRAGMAS,
+}
+
+PAGE_COLUMNS = ("id", "title", "latitude", "longitude", "price")
+
+
+def read(app, rng, place_ids):
+    """
+    Serve a list page, then a place detail.
+    """
+    with app.app_context():
+        facade.get_places_page(20, columns=PAGE_COLUMNS)
+        facade.get_place(rng.choice(place_ids))
+        db.session.remove()
+
+
+def write(app, rng, place_ids):
+    """
+    Update the price of a random place.
+    """
+    with app.app_context():
+        try:
+            facade.update_place(rng.choice(place_ids), {"price": float(rng.randint(10, 500))})
+        finally:
+            db.session.remove()
+
+
+def hammer(app, operation, seed, place_ids, deadline, samples, errors):
+    """
+    Repeat an operation until the deadline, recording its durations and
+    the lock errors it raised.
+    """
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            operation(app, rng, place_ids)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+            continue
+        samples.append(time.perf_counter() - started)
+
+
+def run(places, readers, writers, seconds):
+    """
+    Time the same concurrent workload under both profiles.
+
+    Args:
+        places (int): The number of places to seed.
+        readers (int): The number of reading threads.
+        writers (int): The number of writing threads.
+        seconds (float): The duration of each run.
+    """
+    results = {}
+    for label, pragmas in PROFILES.items():
+        options = engine_options("sqlite://", readers + writers, 0, pool_timeout=30,
+                                 pool_recycle=1800, statement_timeout_ms=0)
+        with bench_app(SQLALCHEMY_ENGINE_OPTIONS=options, SQLITE_PRAGMAS=pragmas,
+                       NEARBY_INDEX_PRELOAD=False) as app:
+            insert_places(places)
+            place_ids = [place.id for place in facade.get_places_page(places, columns=("id",))[0]]
+            db.session.remove()
+
+            read_samples, write_samples, errors = [], [], []
+            deadline = time.perf_counter() + seconds
+            threads = [threading.Thread(target=hammer, args=(app, read, i, place_ids, deadline,
+                                                             read_samples, errors))
+                       for i in range(readers)]
+            threads += [threading.Thread(target=hammer, args=(app, write, readers + i, place_ids,
+                                                              deadline, write_samples, errors))
+                        for i in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+            results[label] = (journal, read_samples, write_samples, errors)
+
+    print(f"{places} places, {readers} readers and {writers} writers for {seconds:g} s")
+    print(f"{'profile':17} {'journal':>8} {'reads/s':>8} {'read p50':>9} {'read p99':>9} "
+          f"{'writes/s':>9} {'write p50':>10} {'write p99':>10} {'locked':>7}")
+    for label, (journal, read_samples, write_samples, errors) in results.items():
+        read_p50, read_p99 = percentiles(read_samples) if read_samples else (0.0, 0.0)
+        write_p50, write_p99 = percentiles(write_samples) if write_samples else (0.0, 0.0)
+        print(f"{label:17} {journal:>8} {len(read_samples) / seconds:8.0f} {read_p50:7.2f}ms "
+              f"{read_p99:7.2f}ms {len(write_samples) / seconds:9.0f} {write_p50:8.2f}ms "
+              f"{write_p99:8.2f}ms {len(errors):7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=10000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    run(args.places, args.readers, args.writers, args.seconds)
@@ -0,0 +1,120 @@
+"""
+Compare the trigram user search with the ILIKE scan it replaces.
+
+Usage:
+    python -m benchmarks.bench_user_search [--users N] [--queries N]
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from app.extensions import bcrypt, db
+from app.models.user import User
+from app.services import facade
+from benchmarks.common import bench_app, percentiles
+
+
+SYLLABLES = ("an", "bel", "car", "dri", "el", "fa", "gor", "hal", "is", "jo", "ka", "lin",
+             "mar", "ne", "or", "pet", "qui", "ros", "sa", "ti", "ul", "ve", "wen", "ya", "zo")
+DOMAINS = ("example.com", "mail.example.org", "corp.example.net", "uni.example.edu")
+
+
+def make_name(rng, parts):
+    """
+    Build a made-up name of the given number of syllables.
+    """
+    return "".join(rng.choices(SYLLABLES, k=parts)).capitalize()
+
+
+def insert_users(count, chunk_size=50000):
+    """
+    Insert users with Core executemany statements, sharing one password
+    hash since hashing dominates the model path.
+
+    Returns:
+        list: (first_name, last_name, email) of every user.
+    """
+    rng = random.Random(0)
+    password = bcrypt.generate_password_hash("benchmark").decode("utf-8")
+    start = datetime(2024, 1, 1)
+    people = []
+    for first in range(0, count, chunk_size):
+        rows = []
+        for index in range(first, min(first + chunk_size, count)):
+            first_name = make_name(rng, rng.randint(2, 3))
+            last_name = make_name(rng, rng.randint(2, 4))
+            email = f"{first_name.lower()}.{last_name.lower()}{index}@{rng.choice(DOMAINS)}"
+            created_at = start + timedelta(seconds=index)
+            rows.append({
+                "id": str(uuid.uuid4()), "first_name": first_name, "last_name": last_name,
+                "email": email, "password": password, "is_admin": False,
+                "created_at": created_at, "updated_at": created_at
+            })
+            people.append((first_name, last_name, email))
+        db.session.execute(db.insert(User.__table__), rows)
+        db.session.commit()
+    db.session.remove()
+    return people
+
+
+def time_search(queries, limit):
+    """
+    Time the first page of every query.
+
+    Returns:
+        list: The durations in seconds.
+    """
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        facade.search_users(query, limit, columns=("id", "first_name", "last_name", "email"))
+        samples.append(time.perf_counter() - started)
+        db.session.remove()
+    return samples
+
+
+def run(users, queries):
+    """
+    Seed the database and time the same queries with and without the
+    trigram index.
+
+    Args:
+        users (int): The number of users to seed.
+        queries (int): The number of timed queries per kind.
+    """
+    rng = random.Random(1)
+    with bench_app():
+        started = time.perf_counter()
+        people = insert_users(users)
+        seeded = time.perf_counter() - started
+
+        samples = rng.sample(people, min(queries, len(people)))
+        kinds = {
+            "full last name": [last for _, last, _ in samples],
+            "name fragment": [last[1:5] for _, last, _ in samples],
+            "first + last": [f"{first[:4]} {last[-4:]}" for first, last, _ in samples],
+            "email": [email.split("@")[0] for _, _, email in samples],
+            "common trigram": [rng.choice(SYLLABLES) + rng.choice("aeiou") for _ in samples],
+        }
+        with_index = {kind: time_search(batch, 20) for kind, batch in kinds.items()}
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE users_search")
+        facade.user_repo._tables.clear()
+        scan = {kind: time_search(batch[:max(1, queries // 10)], 20) for kind, batch in kinds.items()}
+
+    print(f"{users} users, seeded in {seeded:.1f} s, first page of 20 results")
+    print(f"{'query':15} {'trigram p50':>12} {'p99':>8} {'ILIKE p50':>10} {'p99':>8}")
+    for kind in kinds:
+        index_p50, index_p99 = percentiles(with_index[kind])
+        scan_p50, scan_p99 = percentiles(scan[kind])
+        print(f"{kind:15} {index_p50:10.2f}ms {index_p99:6.2f}ms {scan_p50:8.2f}ms {scan_p99:6.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    run(args.users, args.queries)
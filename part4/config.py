@@ -1,6 +1,59 @@
 import os
 
 
+# Connection settings of the SQLite performance profile. Write-ahead
+# logging lets readers proceed while a commit is written, and with
+# synchronous=NORMAL only checkpoints wait for fsync. busy_timeout comes
+# first so that switching the journal mode waits for other connections.
+SQLITE_PERFORMANCE_PRAGMAS = {
+    'busy_timeout': 5000,             # milliseconds
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,   # bytes
+    'cache_size': -16 * 1024,         # negative: KiB per connection
+    'temp_store': 'MEMORY'
+}
+
+
+def engine_options(database_uri, pool_size, max_overflow, pool_timeout,
+                   pool_recycle, statement_timeout_ms):
+    """
+    Build the SQLALCHEMY_ENGINE_OPTIONS of a pooled deployment.
+
+    Args:
+        database_uri (str): The database URI, whose dialect decides how the
+            statement timeout is passed to the server.
+        pool_size (int): The connections kept open by the pool.
+        max_overflow (int): The extra connections opened under burst load,
+            closed once returned.
+        pool_timeout (int): The seconds a request waits for a connection
+            before failing. Flask-SQLAlchemy creates the engine with
+            engine_from_config, which truncates it to an integer.
+        pool_recycle (int): The age in seconds after which a connection is
+            replaced, below the server's idle timeout.
+        statement_timeout_ms (int): The longest a statement may run, 0 for
+            no limit. SQLite has no server-side timeout; create_app installs
+            one on its connections instead.
+
+    Returns:
+        dict: The engine options.
+    """
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True
+    }
+    if statement_timeout_ms and database_uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+    elif statement_timeout_ms and database_uri.startswith('mysql'):
+        options['connect_args'] = {
+            'init_command': f'SET SESSION max_execution_time={statement_timeout_ms}'
+        }
+    return options
+
+
 class Config:
     """
     Base configuration class. Contains default configuration settings.
@@ -8,6 +61,47 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
 
+    # Read-through entity cache in front of the repositories
+    ENTITY_CACHE_ENABLED = os.getenv('ENTITY_CACHE_ENABLED', 'false').lower() == 'true'
+    ENTITY_CACHE_SIZE = int(os.getenv('ENTITY_CACHE_SIZE', '10000'))
+    ENTITY_CACHE_TTL = 60  # seconds, for models without an override below
+    ENTITY_CACHE_MODEL_TTLS = {
+        'User': 300,
+        'Amenity': 600,
+        'Place': 60,
+        'Review': 30
+    }
+
+    # NumPy copy of the filtered place columns answering the list filters
+    PLACE_CATALOG_ENABLED = os.getenv('PLACE_CATALOG_ENABLED', 'false').lower() == 'true'
+
+    # Build the nearby places index when the app starts instead of on the
+    # first /places/nearby request. Off by default: the build scans every
+    # place, which CLI commands and short-lived processes do not need
+    NEARBY_INDEX_PRELOAD = os.getenv('NEARBY_INDEX_PRELOAD', 'false').lower() == 'true'
+
+    # Longest a statement may run, in milliseconds, 0 for no limit
+    DB_STATEMENT_TIMEOUT_MS = 0
+
+    # PRAGMAs applied to every new SQLite connection
+    SQLITE_PRAGMAS = (SQLITE_PERFORMANCE_PRAGMAS
+                      if os.getenv('SQLITE_PERFORMANCE', 'false').lower() == 'true' else {})
+    # Seconds between two background WAL checkpoints and PRAGMA optimize
+    # runs on SQLite, 0 to disable
+    SQLITE_MAINTENANCE_INTERVAL = int(os.getenv('SQLITE_MAINTENANCE_INTERVAL', '0'))
+
+    # Single writer thread committing the place, amenity and review writes
+    # of concurrent requests in batches, for SQLite's single-writer lock
+    GROUP_COMMIT_ENABLED = os.getenv('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', '2'))
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv('GROUP_COMMIT_MAX_BATCH', '64'))
+
+    # Read replica answering the SELECTs of the repositories, e.g. a second
+    # SQLite file refreshed with `flask replica sync`
+    SQLALCHEMY_BINDS = {'replica': os.getenv('READ_REPLICA_URL')} if os.getenv('READ_REPLICA_URL') else {}
+    # Seconds during which a client that wrote keeps reading from the primary
+    READ_REPLICA_PIN_SECONDS = int(os.getenv('READ_REPLICA_PIN_SECONDS', '5'))
+
 
 class DevelopmentConfig(Config):
     """
@@ -19,7 +113,49 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
+class ProductionConfig(Config):
+    """
+    Production configuration class. Reads the database URI from
+    DATABASE_URL, sizes the connection pool for concurrent workers and, on
+    SQLite, enables the performance profile and its periodic maintenance,
+    every setting being overridable from the environment.
+    """
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000'))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.getenv('DB_POOL_SIZE', '10')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS
+    )
+    SQLITE_PRAGMAS = (SQLITE_PERFORMANCE_PRAGMAS
+                      if os.getenv('SQLITE_PERFORMANCE', 'true').lower() == 'true' else {})
+    SQLITE_MAINTENANCE_INTERVAL = int(os.getenv('SQLITE_MAINTENANCE_INTERVAL', '300'))
+
+
+class BenchmarkConfig(ProductionConfig):
+    """
+    Benchmark configuration class. Like production, with a pool large
+    enough for the load generators and a longer checkout timeout so that
+    saturation shows up as wait time rather than errors.
+    """
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///benchmark.db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.getenv('DB_POOL_SIZE', '32')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '32')),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        statement_timeout_ms=ProductionConfig.DB_STATEMENT_TIMEOUT_MS
+    )
+
+
 config = {
     'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
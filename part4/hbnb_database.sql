@@ -12,7 +12,8 @@ CREATE TABLE IF NOT EXISTS users (
     is_admin BOOLEAN DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY(id)
+    PRIMARY KEY(id),
+    INDEX ix_users_created_at_id (created_at, id)
 );
 
 -- Places table
@@ -24,9 +25,20 @@ CREATE TABLE IF NOT EXISTS places (
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
     owner_id CHAR(36) NOT NULL,
+    -- Review aggregates, kept up to date with every review write
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_count_1 INT NOT NULL DEFAULT 0,
+    rating_count_2 INT NOT NULL DEFAULT 0,
+    rating_count_3 INT NOT NULL DEFAULT 0,
+    rating_count_4 INT NOT NULL DEFAULT 0,
+    rating_count_5 INT NOT NULL DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY(id),
+    INDEX ix_places_created_at_id (created_at, id),
+    INDEX ix_places_owner_id (owner_id),
+    INDEX ix_places_price (price),
     FOREIGN KEY(owner_id) REFERENCES users(id)
 );
 
@@ -40,6 +52,10 @@ CREATE TABLE IF NOT EXISTS reviews (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY(id),
+    INDEX ix_reviews_created_at_id (created_at, id),
+    -- One review per user and place; also serves lookups by place_id alone
+    UNIQUE KEY uq_reviews_place_id_user_id (place_id, user_id),
+    INDEX ix_reviews_user_id (user_id),
     FOREIGN KEY(user_id) REFERENCES users(id),
     FOREIGN KEY(place_id) REFERENCES places(id),
     CHECK (rating BETWEEN 1 AND 5)
@@ -51,7 +67,8 @@ CREATE TABLE IF NOT EXISTS amenities (
     name VARCHAR(50) NOT NULL UNIQUE,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY(id)
+    PRIMARY KEY(id),
+    INDEX ix_amenities_created_at_id (created_at, id)
 );
 
 -- Place_Amenities association table
@@ -59,6 +76,8 @@ CREATE TABLE IF NOT EXISTS place_amenities (
     place_id CHAR(36) NOT NULL,
     amenity_id CHAR(36) NOT NULL,
     PRIMARY KEY(place_id, amenity_id),
+    -- The primary key serves lookups by place_id; this one serves amenity_id
+    INDEX ix_place_amenities_amenity_id (amenity_id),
     FOREIGN KEY(place_id) REFERENCES places(id),
     FOREIGN KEY(amenity_id) REFERENCES amenities(id)
 );
@@ -0,0 +1,84 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+# Edges of the box searched by the tests; the coordinates are not exactly
+# representable as the 32-bit floats stored by the R*Tree
+BOX = (2.3456789, 48.8123456, 2.4012345, 48.9012345)
+
+
+class TestBoundingBoxSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        min_lon, min_lat, max_lon, max_lat = BOX
+        self.places = {}
+        for name, lon, lat in (("south-west corner", min_lon, min_lat),
+                               ("north-east corner", max_lon, max_lat),
+                               ("west edge", min_lon, 48.85),
+                               ("center", 2.37, 48.86),
+                               ("just west", min_lon - 1e-7, 48.85),
+                               ("just north", 2.37, max_lat + 1e-7),
+                               ("far away", -73.98, 40.75)):
+            self.places[name] = facade.create_place({
+                "title": name, "description": "A nice place to stay", "price": 100.0,
+                "latitude": lat, "longitude": lon, "owner_id": "owner"
+            }).id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def titles_in_box(self, box=BOX):
+        return sorted(place.title for place in facade.get_places_in_bbox(*box))
+
+    def test_uses_rtree(self):
+        self.assertTrue(facade.place_repo._has_table("places_rtree"))
+        count = db.session.execute(db.text("SELECT count(*) FROM places_rtree")).scalar()
+        self.assertEqual(count, len(self.places))
+
+    def test_edges_are_included(self):
+        self.assertEqual(self.titles_in_box(),
+                         ["center", "north-east corner", "south-west corner", "west edge"])
+
+    def test_degenerate_box_matches_a_point(self):
+        min_lon, min_lat = BOX[:2]
+        self.assertEqual(self.titles_in_box((min_lon, min_lat, min_lon, min_lat)),
+                         ["south-west corner"])
+
+    def test_follows_updates_and_deletes(self):
+        facade.update_place(self.places["far away"], {"latitude": 48.86, "longitude": 2.38})
+        facade.update_place(self.places["center"], {"latitude": 0.0, "longitude": 0.0})
+        facade.delete_place(self.places["west edge"])
+        self.assertEqual(self.titles_in_box(),
+                         ["far away", "north-east corner", "south-west corner"])
+
+    def test_list_endpoint_filter(self):
+        bbox = ",".join(str(value) for value in BOX)
+        response = self.client.get(f'/api/v1/places/?bbox={bbox}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(place["title"] for place in response.json["items"]),
+                         ["center", "north-east corner", "south-west corner", "west edge"])
+
+    def test_invalid_bbox_returns_400(self):
+        for bbox in ("1,2,3", "a,b,c,d", "10,0,5,1", "0,10,1,5", "-181,0,0,1"):
+            response = self.client.get(f'/api/v1/places/?bbox={bbox}')
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.extensions import db
+from app.persistence.repository import unit_of_work
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+def user_row(i, email=None):
+    return {"first_name": "Test", "last_name": f"User{i}",
+            "email": email or f"user{i}@example.com", "password": "password"}
+
+
+class TestBulkInserts(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.commits = 0
+        event.listen(db.engine, "commit", self.count_commit)
+
+    def tearDown(self):
+        event.remove(db.engine, "commit", self.count_commit)
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def count_commit(self, connection):
+        self.commits += 1
+
+    def emails(self):
+        db.session.expire_all()
+        return sorted(user.email for user in facade.get_users_all())
+
+    def test_commits_once_per_chunk(self):
+        created, errors = facade.create_users_bulk([user_row(i) for i in range(5)], chunk_size=2)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(created), 5)
+        self.assertEqual(self.commits, 3)
+        self.assertEqual(len(self.emails()), 5)
+
+    def test_failing_row_is_replayed_alone(self):
+        rows = [user_row(0), user_row(1), user_row(2, email="user0@example.com"), user_row(3)]
+        created, errors = facade.create_users_bulk(rows, chunk_size=10)
+        self.assertEqual([error["index"] for error in errors], [2])
+        self.assertIn("UNIQUE", errors[0]["error"])
+        self.assertEqual(len(created), 3)
+        self.assertEqual(self.emails(), ["user0@example.com", "user1@example.com",
+                                         "user3@example.com"])
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [user_row(0), user_row(1, email="not an email"), {"first_name": 1}, user_row(3)]
+        created, errors = facade.create_users_bulk(rows, chunk_size=10)
+        self.assertEqual([error["index"] for error in errors], [1, 2])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(self.emails(), ["user0@example.com", "user3@example.com"])
+
+    def test_errors_keep_input_order(self):
+        rows = [user_row(0), user_row(1, email="user0@example.com"), {"first_name": 1}]
+        _, errors = facade.create_users_bulk(rows, chunk_size=1)
+        self.assertEqual([error["index"] for error in errors], [1, 2])
+
+    def test_rejects_invalid_chunk_size(self):
+        for chunk_size in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                facade.create_users_bulk([user_row(0)], chunk_size=chunk_size)
+
+    def test_database_error_rolls_back_unit_of_work(self):
+        rows = [user_row(0), user_row(1, email="user0@example.com")]
+        with self.assertRaises(IntegrityError):
+            with unit_of_work():
+                facade.create_users_bulk(rows, chunk_size=1)
+        self.assertEqual(self.emails(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
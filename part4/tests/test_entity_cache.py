@@ -0,0 +1,87 @@
+import unittest
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.persistence.repository import unit_of_work
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    ENTITY_CACHE_ENABLED = True
+
+
+def place_row(i):
+    return {"title": f"Place {i}", "description": "A nice place to stay", "price": 100.0,
+            "latitude": 37.7749, "longitude": -122.4194, "owner_id": "owner"}
+
+
+class TestEntityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self.record)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self.record)
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def record(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split()[0])
+
+    def test_bulk_insert_does_not_refresh_rows(self):
+        for enabled in (True, False):
+            facade.init_cache({"ENTITY_CACHE_ENABLED": enabled})
+            self.statements.clear()
+            created, errors = facade.create_places_bulk([place_row(i) for i in range(20)])
+            self.assertEqual((len(created), errors), (20, []))
+            self.assertEqual(self.statements, ["INSERT"])
+
+    def test_bulk_reviews_do_not_refresh_rows(self):
+        places, _ = facade.create_places_bulk([place_row(i) for i in range(2)])
+        place_ids = [place.id for place in places]
+        rows = [{"text": "Great", "rating": 1 + i % 5, "user_id": f"user{i}",
+                 "place_id": place_ids[i % 2]} for i in range(20)]
+        self.statements.clear()
+        created, errors = facade.create_reviews_bulk(rows)
+        self.assertEqual((len(created), errors), (20, []))
+        self.assertEqual(self.statements.count("INSERT"), 1)
+        self.assertNotIn("SELECT", self.statements)
+        db.session.remove()
+        self.assertEqual(facade.get_place(place_ids[0]).review_count, 10)
+
+    def test_delete_invalidates_entry(self):
+        amenity = facade.create_amenity({"name": "WiFi"})
+        amenity_id = amenity.id
+        db.session.remove()
+        self.assertEqual(facade.get_amenity(amenity_id).name, "WiFi")
+        self.assertEqual(facade.cache_stats()["size"], 1)
+        db.session.remove()
+        facade.delete_amenity(amenity_id)
+        self.assertEqual(facade.cache_stats()["size"], 0)
+        db.session.remove()
+        self.assertIsNone(facade.get_amenity(amenity_id))
+
+    def test_unit_of_work_reads_bypass_cache(self):
+        amenity_id = facade.create_amenity({"name": "WiFi"}).id
+        db.session.remove()
+        facade.get_amenity(amenity_id)
+        db.session.remove()
+        with unit_of_work():
+            facade.update_amenity(amenity_id, {"name": "Fast WiFi"})
+            self.assertEqual(facade.get_amenity(amenity_id).name, "Fast WiFi")
+        db.session.remove()
+        self.assertEqual(facade.get_amenity(amenity_id).name, "Fast WiFi")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import bcrypt, db
+from app.models.user import User
+from app.services import facade
+from config import Config, SQLITE_PERFORMANCE_PRAGMAS, engine_options
+
+
+class TestGroupCommit(unittest.TestCase):
+
+    POOL_SIZE = 2
+    CLIENTS = 6
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        uri = f"sqlite:///{os.path.join(self.tmpdir.name, 'hbnb.db')}"
+
+        class TestConfig(Config):
+            TESTING = True
+            JWT_SECRET_KEY = 'test'
+            SQLALCHEMY_DATABASE_URI = uri
+            SQLALCHEMY_TRACK_MODIFICATIONS = False
+            # Fewer connections than concurrent writers, and no overflow
+            SQLALCHEMY_ENGINE_OPTIONS = engine_options(uri, self.POOL_SIZE, 0, pool_timeout=3,
+                                                       pool_recycle=1800, statement_timeout_ms=0)
+            SQLITE_PRAGMAS = SQLITE_PERFORMANCE_PRAGMAS
+            GROUP_COMMIT_ENABLED = True
+            GROUP_COMMIT_WINDOW_MS = 5
+
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            # The primary only: the extension keeps the replica bind's metadata
+            # once an app has configured one
+            db.create_all(bind_key=None)
+            password = bcrypt.generate_password_hash("test").decode("utf-8")
+            now = datetime.utcnow()
+            users = [{
+                "id": str(uuid.uuid4()), "first_name": "Test", "last_name": "User",
+                "email": f"user{i}@example.com", "password": password, "is_admin": False,
+                "created_at": now, "updated_at": now
+            } for i in range(self.CLIENTS + 1)]
+            db.session.execute(db.insert(User.__table__), users)
+            db.session.commit()
+            self.place_id = facade.create_place({
+                "title": "Cozy Apartment", "description": "A nice place to stay", "price": 100.0,
+                "latitude": 37.7749, "longitude": -122.4194, "owner_id": users[0]["id"]
+            }).id
+            self.tokens = [create_access_token(identity=user["id"],
+                                               additional_claims={"is_admin": False})
+                           for user in users[1:]]
+            db.session.remove()
+
+    def tearDown(self):
+        facade.group_commit.stop()
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        self.tmpdir.cleanup()
+
+    def post_reviews(self, ratings):
+        statuses = [None] * len(ratings)
+        start = threading.Barrier(len(ratings))
+
+        def post(index):
+            client = self.app.test_client()
+            start.wait()
+            response = client.post('/api/v1/reviews/', json={
+                "text": "Great stay", "rating": ratings[index], "place_id": self.place_id
+            }, headers={"Authorization": f"Bearer {self.tokens[index]}"})
+            statuses[index] = response.status_code
+
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(len(ratings))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def test_more_concurrent_writers_than_connections(self):
+        ratings = [1 + i % 5 for i in range(self.CLIENTS)]
+        statuses = self.post_reviews(ratings)
+        self.assertEqual(statuses, [201] * self.CLIENTS)
+        with self.app.app_context():
+            place = facade.get_place(self.place_id)
+            self.assertEqual(place.review_count, self.CLIENTS)
+            self.assertEqual(place.rating_sum, sum(ratings))
+        self.assertEqual(facade.group_commit_stats()["writes"], self.CLIENTS + 1)
+
+    def test_failed_write_does_not_fail_its_batch(self):
+        ratings = [1 + i % 5 for i in range(self.CLIENTS)]
+        ratings[0] = 6
+        statuses = self.post_reviews(ratings)
+        self.assertEqual(statuses, [400] + [201] * (self.CLIENTS - 1))
+        with self.app.app_context():
+            place = facade.get_place(self.place_id)
+            self.assertEqual(place.review_count, self.CLIENTS - 1)
+            self.assertEqual(place.rating_sum, sum(ratings[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import math
+import random
+import unittest
+from app import create_app
+from app.extensions import db
+from app.persistence.nearby_index import EARTH_RADIUS_KM
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class TestNearbyPlaces(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        # The index outlives the apps created by the other tests
+        facade.nearby_index.invalidate()
+        self.coordinates = {}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def add_place(self, title, latitude, longitude):
+        place_id = facade.create_place({
+            "title": title, "description": "A nice place to stay", "price": 100.0,
+            "latitude": latitude, "longitude": longitude, "owner_id": "owner"
+        }).id
+        self.coordinates[place_id] = (latitude, longitude)
+        return place_id
+
+    def brute_force(self, latitude, longitude, k, max_km=None):
+        distances = sorted((distance_km(latitude, longitude, *coordinates), place_id)
+                           for place_id, coordinates in self.coordinates.items())
+        if max_km is not None:
+            distances = [item for item in distances if item[0] <= max_km]
+        return [place_id for _, place_id in distances[:k]]
+
+    def nearest_ids(self, latitude, longitude, k, max_km=None):
+        return [place.id for place, _ in facade.get_nearby_places(latitude, longitude, k, max_km)]
+
+    def test_matches_brute_force(self):
+        rng = random.Random(17)
+        for i in range(300):
+            self.add_place(f"Place {i}", rng.uniform(-89.0, 89.0), rng.uniform(-180.0, 180.0))
+        for _ in range(30):
+            latitude, longitude = rng.uniform(-90.0, 90.0), rng.uniform(-180.0, 180.0)
+            for k, max_km in ((1, None), (10, None), (10, 2000.0)):
+                with self.subTest(lat=latitude, lon=longitude, k=k, max_km=max_km):
+                    self.assertEqual(self.nearest_ids(latitude, longitude, k, max_km),
+                                     self.brute_force(latitude, longitude, k, max_km))
+
+    def test_wraps_around_the_antimeridian(self):
+        east = self.add_place("East of the antimeridian", -16.5, 179.9)
+        west = self.add_place("West of the antimeridian", -16.5, -179.9)
+        self.add_place("Same meridian, farther", -14.0, 179.95)
+        nearest = facade.get_nearby_places(-16.5, -179.95, 2)
+        self.assertEqual({place.id for place, _ in nearest}, {east, west})
+        for _, distance in nearest:
+            self.assertLess(distance, 20.0)
+
+    def test_max_km_excludes_farther_places(self):
+        near = self.add_place("Near", 48.8566, 2.3522)
+        self.add_place("Far", 51.5074, -0.1278)
+        self.assertEqual(self.nearest_ids(48.86, 2.35, 10, max_km=50.0), [near])
+        self.assertEqual(self.nearest_ids(48.86, 2.35, 10, max_km=0.0), [])
+        self.assertEqual(len(self.nearest_ids(48.86, 2.35, 10, max_km=500.0)), 2)
+
+    def test_follows_writes(self):
+        first = self.add_place("First", 10.0, 10.0)
+        second = self.add_place("Second", 20.0, 20.0)
+        self.assertEqual(self.nearest_ids(19.0, 19.0, 1), [second])
+        facade.update_place(first, {"latitude": 19.0, "longitude": 19.0})
+        self.assertEqual(self.nearest_ids(19.0, 19.0, 1), [first])
+        facade.delete_place(first)
+        self.assertEqual(self.nearest_ids(19.0, 19.0, 5), [second])
+
+    def test_endpoint(self):
+        near = self.add_place("Near", 48.8566, 2.3522)
+        self.add_place("Far", 51.5074, -0.1278)
+        response = self.client.get('/api/v1/places/nearby?lat=48.86&lon=2.35&k=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([place["id"] for place in response.json["items"]], [near])
+        self.assertLess(response.json["items"][0]["distance_km"], 1.0)
+        for query in ("lon=2.35", "lat=91&lon=0", "lat=0&lon=0&k=0", "lat=0&lon=0&max_km=-1"):
+            response = self.client.get(f'/api/v1/places/nearby?{query}')
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
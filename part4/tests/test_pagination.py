@@ -0,0 +1,93 @@
+import unittest
+from datetime import datetime
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.persistence.repository import decode_cursor, encode_cursor
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+class TestPagination(unittest.TestCase):
+
+    AMENITIES = 12
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all(bind_key=None)
+            for i in range(self.AMENITIES):
+                facade.create_amenity({"name": f"Amenity {i}"})
+            # Half of the amenities share a creation time, so only the id
+            # breaks the tie between them
+            shared = datetime(2024, 1, 1)
+            tied = [amenity.id for amenity in facade.get_all_amenities()][::2]
+            db.session.execute(db.update(Amenity).where(Amenity.id.in_(tied)).values(created_at=shared))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all(bind_key=None)
+
+    def walk(self, limit, follow_link=False):
+        pages = []
+        url = f'/api/v1/amenities/?limit={limit}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json
+            pages.append([amenity["id"] for amenity in body["items"]])
+            if body["next_cursor"] is None:
+                self.assertNotIn("Link", response.headers)
+                break
+            link = response.headers["Link"]
+            self.assertTrue(link.endswith('>; rel="next"'))
+            if follow_link:
+                url = link[1:link.index(">")]
+            else:
+                url = f'/api/v1/amenities/?limit={limit}&cursor={body["next_cursor"]}'
+        return pages
+
+    def test_pages_cover_every_object_once(self):
+        for limit in (1, 2, 5, self.AMENITIES, 100):
+            pages = self.walk(limit)
+            ids = [amenity_id for page in pages for amenity_id in page]
+            self.assertEqual(len(ids), self.AMENITIES)
+            self.assertEqual(len(set(ids)), self.AMENITIES)
+            self.assertTrue(all(len(page) <= limit for page in pages))
+
+    def test_link_header_leads_to_next_page(self):
+        self.assertEqual(self.walk(5, follow_link=True), self.walk(5))
+
+    def test_pages_follow_creation_order(self):
+        with self.app.app_context():
+            amenities = sorted(facade.get_all_amenities(), key=lambda a: (a.created_at, a.id))
+            expected = [amenity.id for amenity in amenities]
+        pages = self.walk(3)
+        self.assertEqual([amenity_id for page in pages for amenity_id in page], expected)
+
+    def test_malformed_cursor_returns_400(self):
+        for cursor in ("not-a-cursor", "e30", encode_cursor(datetime(2024, 1, 1), "x")[:-4]):
+            response = self.client.get(f'/api/v1/amenities/?cursor={cursor}')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json)
+
+    def test_invalid_limit_returns_400(self):
+        for limit in ("0", "-1", "abc", "501"):
+            response = self.client.get(f'/api/v1/amenities/?limit={limit}')
+            self.assertEqual(response.status_code, 400)
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2024, 1, 1, 12, 30, 15, 123456)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, "abc")), (created_at, "abc"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import random
+import unittest
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PLACE_CATALOG_ENABLED = True
+
+
+FILTERS = [
+    {"min_price": 50.0},
+    {"max_price": 120.0},
+    {"min_price": 80.0, "max_price": 80.0},
+    {"bbox": (-10.0, -10.0, 10.0, 10.0)},
+    {"min_rating": 3.5},
+    {"min_price": 60.0, "max_price": 150.0, "bbox": (-20.0, -5.0, 5.0, 30.0), "min_rating": 2.0},
+    {"min_price": 1000.0},
+]
+
+
+class TestPlaceCatalog(unittest.TestCase):
+
+    PLACES = 120
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        rng = random.Random(4)
+        places, errors = facade.create_places_bulk([{
+            "title": f"Place {i}", "description": "A nice place to stay",
+            # Whole prices and coordinates so some places sit on the bounds
+            "price": float(rng.randint(1, 20) * 10),
+            "latitude": float(rng.randint(-30, 30)), "longitude": float(rng.randint(-30, 30)),
+            "owner_id": "owner"
+        } for i in range(self.PLACES)], chunk_size=50)
+        self.assertEqual(errors, [])
+        self.place_ids = [place.id for place in facade.get_all_places(columns=("id",))]
+        reviews = [{"text": "Review", "rating": rng.randint(1, 5), "place_id": place_id,
+                    "user_id": f"user-{n}"}
+                   for place_id in self.place_ids[::2] for n in range(rng.randint(1, 3))]
+        _, errors = facade.create_reviews_bulk(reviews)
+        self.assertEqual(errors, [])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def walk(self, limit, **filters):
+        ids = []
+        cursor = None
+        while True:
+            places, cursor = facade.filter_places(limit, cursor, ("id",), **filters)
+            ids.extend(place.id for place in places)
+            if not cursor:
+                return ids
+
+    def sql_results(self, limit, **filters):
+        catalog = facade.place_catalog
+        facade.place_catalog = None
+        try:
+            return self.walk(limit, **filters)
+        finally:
+            facade.place_catalog = catalog
+
+    def assert_matches_sql(self):
+        for filters in FILTERS:
+            for limit in (7, 500):
+                with self.subTest(filters=filters, limit=limit):
+                    self.assertEqual(self.walk(limit, **filters), self.sql_results(limit, **filters))
+
+    def test_filters_match_sql(self):
+        self.assertIsNotNone(facade.place_catalog)
+        self.assert_matches_sql()
+        self.assertTrue(self.sql_results(500, min_price=80.0, max_price=80.0))
+
+    def test_follows_writes(self):
+        self.walk(10, min_price=0.0)
+        facade.update_place(self.place_ids[0], {"price": 80.0, "latitude": 0.0, "longitude": 0.0})
+        facade.delete_place(self.place_ids[1])
+        review = facade.create_review({"text": "Review", "rating": 5, "place_id": self.place_ids[3],
+                                       "user_id": "user-new"})
+        facade.update_review(review.id, {"rating": 1})
+        facade.create_place({"title": "New place", "description": "A nice place to stay",
+                             "price": 80.0, "latitude": 1.0, "longitude": 1.0, "owner_id": "owner"})
+        self.assert_matches_sql()
+
+    def test_cursors_are_interchangeable(self):
+        _, cursor = facade.filter_places(10, None, ("id",), min_price=50.0)
+        from_catalog, _ = facade.filter_places(10, cursor, ("id",), min_price=50.0)
+        facade.place_catalog, catalog = None, facade.place_catalog
+        try:
+            from_sql, _ = facade.filter_places(10, cursor, ("id",), min_price=50.0)
+        finally:
+            facade.place_catalog = catalog
+        self.assertEqual([place.id for place in from_catalog], [place.id for place in from_sql])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+class TestPlaceRatings(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.place_ids = [facade.create_place({
+            "title": f"Place {i}", "description": "A nice place to stay", "price": 100.0,
+            "latitude": 48.85, "longitude": 2.35, "owner_id": "owner"
+        }).id for i in range(3)]
+        self.review_ids = [facade.create_review({
+            "text": "Review", "rating": rating, "place_id": self.place_ids[place],
+            "user_id": f"user-{n}"
+        }).id for n, (place, rating) in enumerate(((0, 5), (0, 4), (0, 2), (1, 3)))]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def listed_ratings(self):
+        response = self.client.get('/api/v1/places/?include=rating&limit=100')
+        self.assertEqual(response.status_code, 200)
+        return {place["id"]: (place["rating"], place["review_count"])
+                for place in response.json["items"]}
+
+    def review_ratings(self):
+        """The average rating and review count of every place, from its reviews."""
+        rows = db.session.execute(
+            db.select(Place.id, db.func.avg(Review.rating), db.func.count(Review.id))
+            .outerjoin(Review, Review.place_id == Place.id)
+            .group_by(Place.id)
+        ).all()
+        return {place_id: (average, count) for place_id, average, count in rows}
+
+    def assert_consistent(self):
+        self.assertEqual(facade.reconcile_place_ratings(), 0)
+        listed = self.listed_ratings()
+        self.assertEqual(listed, self.review_ratings())
+        for place_id, (rating, _) in listed.items():
+            self.assertEqual(facade.get_average_rating_for_place(place_id), rating)
+
+    def test_include_rating(self):
+        listed = self.listed_ratings()
+        self.assertEqual(listed[self.place_ids[0]], (11 / 3, 3))
+        self.assertEqual(listed[self.place_ids[1]], (3.0, 1))
+        self.assertEqual(listed[self.place_ids[2]], (None, 0))
+        self.assert_consistent()
+
+    def test_consistent_after_review_writes(self):
+        facade.create_review({"text": "Review", "rating": 1, "place_id": self.place_ids[2],
+                              "user_id": "user-9"})
+        self.assert_consistent()
+        facade.update_review(self.review_ids[0], {"rating": 1})
+        self.assert_consistent()
+        facade.update_review(self.review_ids[3], {"place_id": self.place_ids[0]})
+        self.assert_consistent()
+        facade.delete_review(self.review_ids[1])
+        self.assert_consistent()
+        _, errors = facade.create_reviews_bulk([
+            {"text": "Review", "rating": 4, "place_id": place_id, "user_id": "user-8"}
+            for place_id in self.place_ids
+        ])
+        self.assertEqual(errors, [])
+        self.assert_consistent()
+
+    def test_reconcile_repairs_drifted_aggregates(self):
+        db.session.execute(db.update(Place).where(Place.id == self.place_ids[0])
+                           .values(rating_sum=0, review_count=7))
+        db.session.commit()
+        self.assertNotEqual(self.listed_ratings(), self.review_ratings())
+        self.assertEqual(facade.reconcile_place_ratings(), 1)
+        self.assert_consistent()
+
+
+if __name__ == '__main__':
+    unittest.main()
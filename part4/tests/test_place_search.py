@@ -0,0 +1,112 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+class TestPlaceSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.places = {}
+        for title, description in (("Beach house", "Quiet rooms near the sea"),
+                                   ("City loft", "Ten minutes from the beach"),
+                                   ("Mountain cabin", "Wood stove and a view"),
+                                   ("Beachfront villa", "A pool and a garden")):
+            self.places[title] = self.create_place(title, description)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def create_place(self, title, description):
+        return facade.create_place({
+            "title": title, "description": description, "price": 100.0,
+            "latitude": 48.85, "longitude": 2.35, "owner_id": "owner"
+        }).id
+
+    def search(self, query, limit=20):
+        places, _ = facade.search_places(query, limit)
+        return [place.title for place in places]
+
+    def test_uses_fts(self):
+        self.assertTrue(facade.place_repo._has_table("places_fts"))
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self.search("beach"), ["Beach house", "City loft"])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("beach sea"), ["Beach house"])
+        self.assertEqual(self.search("beach desert"), [])
+
+    def test_prefix_term(self):
+        self.assertEqual(sorted(self.search("beach*")),
+                         ["Beach house", "Beachfront villa", "City loft"])
+
+    def test_pages_cover_every_match_once(self):
+        for index in range(7):
+            self.create_place(f"Garden flat {index}", "A small garden")
+        expected = self.search("garden")
+        self.assertEqual(len(expected), 8)
+
+        titles, cursor = [], None
+        while True:
+            places, cursor = facade.search_places("garden", 3, cursor)
+            self.assertLessEqual(len(places), 3)
+            titles.extend(place.title for place in places)
+            if cursor is None:
+                break
+        self.assertEqual(titles, expected)
+
+    def test_index_follows_update_and_delete(self):
+        facade.update_place(self.places["Mountain cabin"], {"title": "Beach cabin"})
+        self.assertIn("Beach cabin", self.search("beach"))
+        self.assertEqual(self.search("mountain"), [])
+
+        facade.delete_place(self.places["Beach house"])
+        self.assertEqual(self.search("beach"), ["Beach cabin", "City loft"])
+        self.assertEqual(self.search("sea"), [])
+
+    def test_rebuild_restores_index(self):
+        db.session.execute(db.text("DELETE FROM places_fts"))
+        db.session.commit()
+        self.assertEqual(self.search("beach"), [])
+        self.assertEqual(facade.rebuild_place_search(), len(self.places))
+        self.assertEqual(self.search("beach"), ["Beach house", "City loft"])
+
+    def test_blank_query_is_rejected(self):
+        with self.assertRaises(ValueError):
+            facade.search_places("  *! ", 20)
+
+    def test_endpoint(self):
+        response = self.client.get('/api/v1/places/search?q=beach&limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([place["title"] for place in response.json["items"]], ["Beach house"])
+        self.assertIsNotNone(response.json["next_cursor"])
+
+        response = self.client.get('/api/v1/places/search?q=beach&limit=1&cursor='
+                                   + response.json["next_cursor"])
+        self.assertEqual([place["title"] for place in response.json["items"]], ["City loft"])
+        self.assertIsNone(response.json["next_cursor"])
+
+    def test_endpoint_rejects_blank_query(self):
+        response = self.client.get('/api/v1/places/search?q=')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/search?q=beach&cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
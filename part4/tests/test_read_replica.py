@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+import uuid
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db, bcrypt
+from app.models.user import User
+from app.persistence.routing import PIN_COOKIE
+from app.services import facade
+from config import Config
+
+
+class TestReadReplica(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        primary = f"sqlite:///{os.path.join(self.tmpdir.name, 'primary.db')}"
+        replica = f"sqlite:///{os.path.join(self.tmpdir.name, 'replica.db')}"
+
+        class TestConfig(Config):
+            TESTING = True
+            JWT_SECRET_KEY = 'test'
+            SQLALCHEMY_DATABASE_URI = primary
+            SQLALCHEMY_BINDS = {'replica': replica}
+            SQLALCHEMY_TRACK_MODIFICATIONS = False
+            READ_REPLICA_PIN_SECONDS = 60
+
+        self.app = create_app(TestConfig)
+        with self.app.app_context():
+            # The replica gets the tables with the first sync
+            db.create_all(bind_key=None)
+            password = bcrypt.generate_password_hash("test").decode("utf-8")
+            now = datetime.utcnow()
+            users = [{
+                "id": str(uuid.uuid4()), "first_name": "Test", "last_name": "User",
+                "email": f"user{i}@example.com", "password": password, "is_admin": False,
+                "created_at": now, "updated_at": now
+            } for i in range(2)]
+            db.session.execute(db.insert(User.__table__), users)
+            db.session.commit()
+            self.place_id = facade.create_place({
+                "title": "Cozy Apartment", "description": "A nice place to stay", "price": 100.0,
+                "latitude": 37.7749, "longitude": -122.4194, "owner_id": users[0]["id"]
+            }).id
+            self.token = create_access_token(identity=users[1]["id"],
+                                             additional_claims={"is_admin": False})
+            facade.sync_replica()
+
+    def tearDown(self):
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        self.tmpdir.cleanup()
+
+    def post_review(self, client):
+        response = client.post('/api/v1/reviews/', json={
+            "text": "Great stay", "rating": 5, "place_id": self.place_id
+        }, headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 201)
+        return response.json["id"]
+
+    def test_writer_reads_its_own_writes(self):
+        writer = self.app.test_client()
+        review_id = self.post_review(writer)
+        self.assertIsNotNone(writer.get_cookie(PIN_COOKIE))
+        self.assertEqual(writer.get(f'/api/v1/reviews/{review_id}').status_code, 200)
+
+    def test_other_clients_read_the_replica(self):
+        review_id = self.post_review(self.app.test_client())
+        reader = self.app.test_client()
+        self.assertEqual(reader.get(f'/api/v1/reviews/{review_id}').status_code, 404)
+        self.assertIsNone(reader.get_cookie(PIN_COOKIE))
+        with self.app.app_context():
+            facade.sync_replica()
+        self.assertEqual(reader.get(f'/api/v1/reviews/{review_id}').status_code, 200)
+
+    def test_expired_pin_reads_the_replica(self):
+        writer = self.app.test_client()
+        review_id = self.post_review(writer)
+        writer.set_cookie(PIN_COOKIE, "0")
+        self.assertEqual(writer.get(f'/api/v1/reviews/{review_id}').status_code, 404)
+
+    def test_write_request_checks_the_primary(self):
+        # Without the pin cookie, the duplicate review check still runs on
+        # the primary, where the first review already is
+        client = self.app.test_client()
+        self.post_review(client)
+        client.delete_cookie(PIN_COOKIE)
+        response = client.post('/api/v1/reviews/', json={
+            "text": "Again", "rating": 4, "place_id": self.place_id
+        }, headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
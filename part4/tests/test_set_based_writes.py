@@ -0,0 +1,94 @@
+import time
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.place_amenities import place_amenities
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class TestSetBasedWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.owner = facade.create_user({"first_name": "Owner", "last_name": "User",
+                                         "email": "owner@example.com", "password": "password"})
+        self.wifi = facade.create_amenity({"name": "WiFi"})
+        self.pool = facade.create_amenity({"name": "Pool"})
+        self.place = facade.create_place({
+            "title": "Cozy Apartment", "description": "A nice place to stay", "price": 100.0,
+            "latitude": 37.7749, "longitude": -122.4194, "owner_id": self.owner.id,
+            "amenities": [self.wifi.id, self.pool.id]
+        })
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def association_rows(self):
+        return db.session.execute(db.select(place_amenities)).all()
+
+    def test_update_where_updates_matching_rows(self):
+        count = facade.update_amenities_where({"name": ["WiFi", "Sauna"]}, {"name": "Fast WiFi"})
+        self.assertEqual(count, 1)
+        self.assertEqual(facade.get_amenity(self.wifi.id).name, "Fast WiFi")
+        self.assertEqual(facade.get_amenity(self.pool.id).name, "Pool")
+
+    def test_update_where_stamps_updated_at(self):
+        before = facade.get_place(self.place.id).updated_at
+        time.sleep(0.01)
+        facade.update_places_where({"id": self.place.id}, {"price": 120.0})
+        place = facade.get_place(self.place.id)
+        self.assertEqual(place.price, 120.0)
+        self.assertGreater(place.updated_at, before)
+
+    def test_update_where_runs_validators(self):
+        with self.assertRaises(ValueError):
+            facade.update_amenities_where({"name": "WiFi"}, {"name": ""})
+        for values in ({"price": -5.0}, {"latitude": 91.0}):
+            with self.assertRaises(ValueError):
+                facade.update_places_where({"id": self.place.id}, values)
+        self.assertEqual(facade.get_amenity(self.wifi.id).name, "WiFi")
+        self.assertEqual(facade.get_place(self.place.id).price, 100.0)
+
+    def test_update_where_rejects_invalid_keys(self):
+        for values in ({"id": "other"}, {"reviews": []}, {"unknown": 1}, {}):
+            with self.assertRaises(ValueError):
+                facade.update_places_where({"id": self.place.id}, values)
+        with self.assertRaises(ValueError):
+            facade.update_places_where({}, {"price": 120.0})
+        with self.assertRaises(ValueError):
+            facade.update_places_where({"unknown": 1}, {"price": 120.0})
+
+    def test_update_where_rejects_read_only_attributes(self):
+        with self.assertRaises(ValueError):
+            facade.update_users_where({"id": self.owner.id}, {"is_admin": True})
+        self.assertFalse(facade.get_user(self.owner.id).is_admin)
+
+    def test_delete_many_clears_association_rows(self):
+        self.assertEqual(len(self.association_rows()), 2)
+        self.assertEqual(facade.delete_amenities([self.wifi.id]), 1)
+        self.assertEqual([row.amenity_id for row in self.association_rows()], [self.pool.id])
+        place_id = self.place.id
+        self.assertEqual(facade.delete_places([place_id]), 1)
+        self.assertEqual(self.association_rows(), [])
+        self.assertIsNone(facade.get_place(place_id))
+        self.assertIsNotNone(facade.get_amenity(self.pool.id))
+
+    def test_delete_many_with_no_ids(self):
+        self.assertEqual(facade.delete_amenities([]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
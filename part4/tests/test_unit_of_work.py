@@ -0,0 +1,115 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.persistence.repository import in_unit_of_work, on_commit, savepoint, unit_of_work
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    NEARBY_INDEX_PRELOAD = False
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        # The primary only: the extension keeps the replica bind's metadata
+        # once an app has configured one
+        db.create_all(bind_key=None)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def amenity_names(self):
+        db.session.expire_all()
+        return sorted(amenity.name for amenity in facade.get_all_amenities())
+
+    def test_commits_on_exit(self):
+        with unit_of_work():
+            facade.create_amenity({"name": "WiFi"})
+            facade.create_amenity({"name": "Pool"})
+            self.assertTrue(in_unit_of_work())
+        self.assertFalse(in_unit_of_work())
+        db.session.remove()
+        self.assertEqual(self.amenity_names(), ["Pool", "WiFi"])
+
+    def test_rolls_back_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                facade.create_amenity({"name": "WiFi"})
+                raise RuntimeError("abort")
+        self.assertFalse(in_unit_of_work())
+        self.assertEqual(self.amenity_names(), [])
+
+    def test_nested_block_joins_outer_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                with unit_of_work():
+                    facade.create_amenity({"name": "WiFi"})
+                raise RuntimeError("abort")
+        self.assertEqual(self.amenity_names(), [])
+
+    def test_savepoint_rolls_back_alone(self):
+        with unit_of_work():
+            facade.create_amenity({"name": "WiFi"})
+            with self.assertRaises(RuntimeError):
+                with savepoint():
+                    facade.create_amenity({"name": "Sauna"})
+                    raise RuntimeError("abort")
+            facade.create_amenity({"name": "Pool"})
+        db.session.remove()
+        self.assertEqual(self.amenity_names(), ["Pool", "WiFi"])
+
+    def test_nested_savepoint_rolls_back_alone(self):
+        with unit_of_work():
+            with savepoint():
+                facade.create_amenity({"name": "WiFi"})
+                with self.assertRaises(RuntimeError):
+                    with unit_of_work(), savepoint():
+                        facade.create_amenity({"name": "Sauna"})
+                        raise RuntimeError("abort")
+                facade.create_amenity({"name": "Pool"})
+        db.session.remove()
+        self.assertEqual(self.amenity_names(), ["Pool", "WiFi"])
+
+    def test_on_commit_runs_after_commit(self):
+        calls = []
+        with unit_of_work():
+            on_commit(lambda: calls.append("committed"))
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ["committed"])
+
+    def test_on_commit_dropped_on_rollback(self):
+        calls = []
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                on_commit(lambda: calls.append("committed"))
+                raise RuntimeError("abort")
+        self.assertEqual(calls, [])
+
+    def test_on_commit_dropped_with_savepoint(self):
+        calls = []
+        with unit_of_work():
+            on_commit(lambda: calls.append("kept"))
+            with self.assertRaises(RuntimeError):
+                with savepoint():
+                    on_commit(lambda: calls.append("dropped"))
+                    raise RuntimeError("abort")
+        self.assertEqual(calls, ["kept"])
+
+    def test_on_commit_runs_immediately_outside(self):
+        calls = []
+        on_commit(lambda: calls.append("committed"))
+        self.assertEqual(calls, ["committed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class TestUserSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all(bind_key=None)
+        self.users = {}
+        for first_name, last_name, email in (("John", "Smith", "john@example.com"),
+                                             ("Anna", "Lee", "blacksmith@example.com"),
+                                             ("Jo", "Brown", "jo.brown@example.com"),
+                                             ("Admin", "User", "admin@example.com")):
+            self.users[email] = facade.create_user({
+                "first_name": first_name, "last_name": last_name,
+                "email": email, "password": "password"
+            }).id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        self.ctx.pop()
+
+    def search(self, query, limit=20):
+        users, _ = facade.search_users(query, limit)
+        return [user.email for user in users]
+
+    def test_uses_trigram_index(self):
+        self.assertTrue(facade.user_repo._has_table("users_search"))
+
+    def test_substring_match(self):
+        self.assertEqual(sorted(self.search("mit")),
+                         ["blacksmith@example.com", "john@example.com"])
+        self.assertEqual(self.search("SMITH")[0], "john@example.com")
+
+    def test_name_match_ranks_above_email_match(self):
+        self.assertEqual(self.search("smith"), ["john@example.com", "blacksmith@example.com"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search("john smith"), ["john@example.com"])
+        self.assertEqual(self.search("anna smith"), ["blacksmith@example.com"])
+        self.assertEqual(self.search("smith brown"), [])
+
+    def test_short_words(self):
+        self.assertEqual(sorted(self.search("jo")),
+                         ["jo.brown@example.com", "john@example.com"])
+        self.assertEqual(self.search("jo brown"), ["jo.brown@example.com"])
+
+    def test_pages_cover_every_match_once(self):
+        for index in range(7):
+            facade.create_user({"first_name": "Sam", "last_name": f"Tester{index}",
+                                "email": f"sam{index}@example.com", "password": "password"})
+        expected = self.search("example")
+        self.assertEqual(len(expected), 11)
+
+        emails, cursor = [], None
+        while True:
+            users, cursor = facade.search_users("example", 3, cursor)
+            self.assertLessEqual(len(users), 3)
+            emails.extend(user.email for user in users)
+            if cursor is None:
+                break
+        self.assertEqual(emails, expected)
+
+    def test_index_follows_update_and_delete(self):
+        facade.update_user(self.users["jo.brown@example.com"], {"last_name": "Goldsmith"})
+        self.assertIn("jo.brown@example.com", self.search("smith"))
+
+        facade.delete_user(self.users["john@example.com"])
+        self.assertEqual(self.search("john"), [])
+        self.assertNotIn("john@example.com", self.search("smith"))
+
+    def test_blank_query_is_rejected(self):
+        with self.assertRaises(ValueError):
+            facade.search_users("   ", 20)
+
+    def test_endpoint_requires_admin(self):
+        admin_id = self.users["admin@example.com"]
+        token = create_access_token(identity=admin_id, additional_claims={"is_admin": True})
+        response = self.client.get('/api/v1/admin/users/search?q=smith&limit=1',
+                                   headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user["email"] for user in response.json["items"]],
+                         ["john@example.com"])
+        self.assertIsNotNone(response.json["next_cursor"])
+
+        response = self.client.get('/api/v1/admin/users/search?q=',
+                                   headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 400)
+
+        token = create_access_token(identity=admin_id, additional_claims={"is_admin": False})
+        response = self.client.get('/api/v1/admin/users/search?q=smith',
+                                   headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
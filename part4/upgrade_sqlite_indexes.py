@@ -0,0 +1,115 @@
+"""
+Add the secondary indexes to an existing SQLite database.
+
+Databases created before the indexes were declared only have the primary
+keys and unique columns indexed. This script creates the missing indexes
+in place, and creates or rebuilds the R*Tree index of the place
+coordinates (needed after a VACUUM, which may renumber its rowids). It
+also adds the review aggregate columns of places and computes them from
+the reviews. It is safe to run more than once.
+
+Usage:
+    python upgrade_sqlite_indexes.py instance/development.db
+"""
+import sqlite3
+from sys import argv
+
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users(created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places(created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places(owner_id)",
+    "CREATE INDEX IF NOT EXISTS ix_places_price ON places(price)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_created_at_id ON reviews(created_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_reviews_place_id_user_id ON reviews(place_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_user_id ON reviews(user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_amenities_created_at_id ON amenities(created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_place_amenities_amenity_id ON place_amenities(amenity_id)",
+)
+
+# Same statements as PLACES_RTREE_DDL in app/models/place.py
+PLACES_RTREE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree"
+    " USING rtree(id, min_lon, max_lon, min_lat, max_lat)",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_insert AFTER INSERT ON places BEGIN"
+    " INSERT INTO places_rtree VALUES"
+    " (NEW.rowid, NEW.longitude, NEW.longitude, NEW.latitude, NEW.latitude); END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_update AFTER UPDATE OF latitude, longitude ON places BEGIN"
+    " UPDATE places_rtree SET min_lon = NEW.longitude, max_lon = NEW.longitude,"
+    " min_lat = NEW.latitude, max_lat = NEW.latitude WHERE id = NEW.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_delete AFTER DELETE ON places BEGIN"
+    " DELETE FROM places_rtree WHERE id = OLD.rowid; END",
+    "DELETE FROM places_rtree",
+    "INSERT INTO places_rtree SELECT rowid, longitude, longitude, latitude, latitude FROM places",
+)
+
+# Review aggregate columns of places, see Place.review_count
+PLACE_RATING_COLUMNS = ("review_count", "rating_sum", "rating_count_1", "rating_count_2",
+                        "rating_count_3", "rating_count_4", "rating_count_5")
+
+COMPUTE_PLACE_RATINGS = """
+    UPDATE places SET review_count = totals.review_count, rating_sum = totals.rating_sum,
+        rating_count_1 = totals.rating_count_1, rating_count_2 = totals.rating_count_2,
+        rating_count_3 = totals.rating_count_3, rating_count_4 = totals.rating_count_4,
+        rating_count_5 = totals.rating_count_5
+    FROM (
+        SELECT place_id, COUNT(*) AS review_count, SUM(rating) AS rating_sum,
+            SUM(rating = 1) AS rating_count_1, SUM(rating = 2) AS rating_count_2,
+            SUM(rating = 3) AS rating_count_3, SUM(rating = 4) AS rating_count_4,
+            SUM(rating = 5) AS rating_count_5
+        FROM reviews GROUP BY place_id
+    ) AS totals
+    WHERE places.id = totals.place_id
+"""
+
+DUPLICATE_REVIEWS = """
+    SELECT place_id, user_id, COUNT(*) FROM reviews
+    GROUP BY place_id, user_id HAVING COUNT(*) > 1
+"""
+
+
+def upgrade(connection):
+    """
+    Create the missing indexes, rebuild the R*Tree index, add the review
+    aggregate columns and refresh the planner statistics.
+
+    Args:
+        connection (sqlite3.Connection): An open connection to the database.
+
+    Raises:
+        ValueError: If a user reviewed the same place more than once, which
+            the unique review index does not allow. Nothing is changed.
+    """
+    duplicates = connection.execute(DUPLICATE_REVIEWS).fetchall()
+    if duplicates:
+        lines = [f"  place {place_id}, user {user_id}: {count} reviews"
+                 for place_id, user_id, count in duplicates]
+        raise ValueError("Remove the duplicate reviews first:\n" + "\n".join(lines))
+
+    with connection:
+        for statement in INDEXES + PLACES_RTREE:
+            connection.execute(statement)
+        existing = {row[1] for row in connection.execute("PRAGMA table_info(places)")}
+        missing = [name for name in PLACE_RATING_COLUMNS if name not in existing]
+        for name in missing:
+            connection.execute(f"ALTER TABLE places ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+        if missing:
+            connection.execute(COMPUTE_PLACE_RATINGS)
+    connection.execute("ANALYZE")
+
+
+if __name__ == "__main__":
+    if len(argv) != 2:
+        print("Usage: python upgrade_sqlite_indexes.py <database file>")
+        exit(1)
+
+    connection = sqlite3.connect(argv[1])
+    try:
+        upgrade(connection)
+    except ValueError as e:
+        print(e)
+        exit(1)
+    finally:
+        connection.close()
+
+    print(f"Indexes are up to date in {argv[1]}")